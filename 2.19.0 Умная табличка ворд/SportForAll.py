@@ -1,51 +1,61 @@
 # sport.py
 
-import tkinter as tk
-import tkinter.messagebox as messagebox
 import traceback
 import sys
+import multiprocessing
 
-# Импортируем разделенные модули
-try:
-    from error_handler import log_and_show_error, setup_global_exception_handler
-    from gui_utils import SafeCTk, bind_entry_shortcuts, create_context_menu
-    from custom_widgets import CustomEntry
-    from auth_utils import ask_password  # APP_PASSWORD теперь внутри auth_utils
-    from data_persistence import load_memory, save_memory, get_template_memory, MEMORY_FILE
-    from excel_export import export_document_data_to_excel
-    from text_utils import number_to_ukrainian_text  # Нужен для авто-заполнения "сума прописом"
-    import koshtorys  # Для вызова fill_koshtorys и доступа к его настройкам
-
-    from globals import FIELDS, EXAMPLES, version, document_blocks
-    from generation import generate_documents_word
-
-except ImportError as e:
-    # Это критическая ошибка, приложение не сможет работать
-    error_message = (f"Критична помилка імпорту в sport.py: {e}.\n"
-                     f"Переконайтеся, що всі файли (.py) знаходяться в одній директорії.\n"
-                     f"Трасування: {traceback.format_exc()}")
-    print(error_message)
-    # Попытка показать messagebox, если Tkinter инициализирован
+# Воркери пулу генерації (generation_scheduler) імпортують цей файл як __mp_main__:
+# модулі GUI, обробник помилок і перевірка Word завантажуються лише в основному процесі
+if __name__ == "__main__":
+    # Потрібно для пулу процесів генерації у зібраному .exe (до імпорту GUI)
+    multiprocessing.freeze_support()
+
+    import tkinter as tk
+    import tkinter.messagebox as messagebox
+
+    # Импортируем разделенные модули
+    try:
+        from error_handler import log_and_show_error, setup_global_exception_handler
+        from gui_utils import SafeCTk, bind_entry_shortcuts, create_context_menu
+        from custom_widgets import CustomEntry
+        from auth_utils import ask_password  # APP_PASSWORD теперь внутри auth_utils
+        from data_persistence import load_memory, save_memory, get_template_memory, MEMORY_FILE
+        from excel_export import export_document_data_to_excel
+        from text_utils import number_to_ukrainian_text  # Нужен для авто-заполнения "сума прописом"
+        import koshtorys  # Для вызова fill_koshtorys и доступа к его настройкам
+
+        from globals import FIELDS, EXAMPLES, version, document_blocks
+        from generation import generate_documents_word
+
+    except ImportError as e:
+        # Это критическая ошибка, приложение не сможет работать
+        error_message = (f"Критична помилка імпорту в sport.py: {e}.\n"
+                         f"Переконайтеся, що всі файли (.py) знаходяться в одній директорії.\n"
+                         f"Трасування: {traceback.format_exc()}")
+        print(error_message)
+        # Попытка показать messagebox, если Tkinter инициализирован
+        try:
+            root_temp = tk.Tk()
+            root_temp.withdraw()  # Скрыть временное окно
+            messagebox.showerror("Критична помилка імпорту", error_message)
+            root_temp.destroy()
+        except:
+            pass  # Если GUI не работает, сообщение уже выведено в консоль
+        sys.exit(1)
+
+    # Устанавливаем глобальный обработчик ошибок
+    setup_global_exception_handler()
+
+    # Попытка импорта win32com
     try:
-        root_temp = tk.Tk()
-        root_temp.withdraw()  # Скрыть временное окно
-        messagebox.showerror("Критична помилка імпорту", error_message)
-        root_temp.destroy()
-    except:
-        pass  # Если GUI не работает, сообщение уже выведено в консоль
-    sys.exit(1)
-
-# Устанавливаем глобальный обработчик ошибок
-setup_global_exception_handler()
-
-# Попытка импорта win32com
-try:
-    import win32com.client as win32
-except ImportError:
-    log_and_show_error(ImportError,
-                       "Не вдалося імпортувати модуль win32com.client.\nУстановіть його командою: pip install pywin32",
-                       None)
-    sys.exit(1)
+        import win32com.client as win32
+    except ImportError:
+        log_and_show_error(ImportError,
+                           "Не вдалося імпортувати модуль win32com.client.\nУстановіть його командою: pip install pywin32",
+                           None)
+        sys.exit(1)
+
+    from app import launch_main_app
 
 # Глобальные переменные для GUI основного приложения
 main_app_root = None
@@ -79,9 +89,6 @@ def on_app_close():
 
 # ---------------- ОСНОВНИЙ ІНТЕРФЕЙС ----------------
 
-from error_handler import log_and_show_error
-from app import launch_main_app
-
 # --- Точка входа в программу ---
 if __name__ == "__main__":
     try:
@@ -92,6 +99,10 @@ if __name__ == "__main__":
         def on_success():
             global tabview, main_app_root
 
+            # Сканування шаблонів у фоні, поки будується інтерфейс
+            from template_loader import warm_up_placeholder_cache
+            warm_up_placeholder_cache()
+
             main_app_root, tabview = launch_main_app()
 
             # Запускаємо перевірку оновлень через after, щоб mainloop вже працював
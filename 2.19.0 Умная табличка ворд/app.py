@@ -15,9 +15,10 @@ from events import add_event, remove_tab
 from document_block import create_document_fields_block
 import koshtorys
 from excel_export import export_document_data_to_excel
-from generation import generate_documents_word
+from generation import generate_documents_word, generate_event_zip
 from template_loader import get_available_templates
 from people_selector_widget import PeopleSelectorButton
+from people_directory import people_directory
 from document_block import create_products_table_widget  # Импортируем функцию товаров
 
 # === ДОДАНО ДЛЯ АВТОМАТИЧНИХ ОНОВЛЕНЬ ===
@@ -465,6 +466,10 @@ def launch_main_app():
                   command=lambda: generate_documents_word(tabview),
                   width=180).pack(side="left", padx=5)
 
+    ctk.CTkButton(first_row, text="🗜 ZIP заходу",
+                  command=lambda: generate_event_zip(tabview),
+                  fg_color="#795548", width=110).pack(side="left", padx=5)
+
     ctk.CTkButton(first_row, text="💰 Кошторис",
                   command=lambda: koshtorys.fill_koshtorys(document_blocks),
                   fg_color="#FF9800", width=120).pack(side="left", padx=5)
@@ -549,6 +554,10 @@ def launch_main_app():
 
     setup_auto_save(main_app_root, document_blocks, tabview)
 
+    # Без people.json список людей порожній - показуємо це користувачу, а не лише в консолі
+    if people_directory.load_error:
+        main_app_root.after(500, lambda: messagebox.showwarning("Довідник людей", people_directory.load_error))
+
     return main_app_root, tabview
 
 
@@ -0,0 +1,284 @@
+# batch_generate.py
+# -*- coding: utf-8 -*-
+"""
+Пакетна генерація договорів заходу з командного рядка (без GUI).
+
+Бере збережений стан програми (app_state.json), рендерить усі договори заходу
+через OOXML, а також витяг з бази даних і кошторис у вказану папку. Модуль і
+все, що він імпортує, не використовує tkinter/customtkinter, тому працює на
+сервері без дисплея (нічні пакети, бенчмарки).
+
+    python batch_generate.py --out вихід                 # поточний захід зі стану
+    python batch_generate.py --event 3 --out вихід       # захід за номером
+    python batch_generate.py --tab "Захід 1" --zip --out вихід
+    python batch_generate.py --all-koshtorys --out кошториси   # кошториси всіх заходів
+
+Коди завершення:
+    0 - усе згенеровано
+    1 - частина документів не згенерована
+    2 - помилка аргументів або стану (захід не знайдено)
+    3 - не згенеровано жодного договору
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import traceback
+import multiprocessing
+
+EXIT_OK = 0
+EXIT_PARTIAL = 1
+EXIT_USAGE = 2
+EXIT_FAILED = 3
+
+
+def load_state(state_path):
+    """Читає app_state.json; кидає ValueError, якщо файл недоступний"""
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except Exception as e:
+        raise ValueError(f"Не вдалося прочитати стан {state_path}: {e}")
+
+
+def select_event(state, event_number=None, tab_name=None):
+    """
+    Повертає (назва вкладки, номер заходу). Без параметрів - поточна вкладка стану.
+    Кидає ValueError, якщо захід не знайдено.
+    """
+    tabs = state.get("tabs", [])
+
+    if tab_name is not None:
+        for tab in tabs:
+            if tab.get("name") == tab_name:
+                return tab_name, tab.get("event_number")
+        raise ValueError(f"Захід '{tab_name}' не знайдено у стані")
+
+    if event_number is not None:
+        for tab in tabs:
+            if str(tab.get("event_number")) == str(event_number):
+                return tab.get("name"), tab.get("event_number")
+        raise ValueError(f"Захід з номером {event_number} не знайдено у стані")
+
+    for tab in tabs:
+        if tab.get("is_current"):
+            return tab.get("name"), tab.get("event_number")
+    if tabs:
+        return tabs[0].get("name"), tabs[0].get("event_number")
+    raise ValueError("У стані немає жодного заходу")
+
+
+def get_state_blocks(state, tab_name, event_number=None, base_dir=""):
+    """
+    Блоки договорів заходу зі стану у форматі document_blocks (значення - рядки).
+    Загальні дані заходу (захід, дата, адреса) підставляються в порожні поля.
+    Товари таблиці товарів беруться зі списку "products" блоку; у стані, збереженому
+    старішою версією програми, його немає - такий блок не має ключа "items".
+    """
+    common_data = state.get("event_common_data", {}).get(tab_name, {})
+    blocks = []
+
+    for block_data in state.get("document_blocks", []):
+        if block_data.get("tab_name", "").strip() != tab_name.strip():
+            continue
+
+        template_path = block_data.get("path", "")
+        if not template_path:
+            continue
+        if not os.path.isabs(template_path):
+            template_path = os.path.join(base_dir, template_path)
+
+        entries = {}
+        for key, value in common_data.items():
+            if isinstance(value, str):
+                entries[key] = value
+        for key, value in block_data.get("entries", {}).items():
+            if isinstance(value, str) and (value.strip() or key not in entries):
+                entries[key] = value
+
+        block = {
+            "path": template_path,
+            "title": os.path.splitext(os.path.basename(template_path))[0],
+            "tab_name": tab_name,
+            "event_number": event_number if event_number is not None else "",
+            "entries": entries,
+        }
+        if isinstance(block_data.get("products"), list):
+            block["items"] = block_data["products"]
+        blocks.append(block)
+
+    return blocks
+
+
+def generate_contracts(blocks, out_dir, people_replacements, workers=None):
+    """Рендерить договори в out_dir. Повертає (кількість успішних, список помилок)"""
+    from contract_renderer import prepare_contract, get_contract_names, get_block_placeholders, TABLE_FIELD
+    from generation_scheduler import make_job, run_generation_jobs
+
+    failed = []
+    jobs = []
+    for block, contract_name in zip(blocks, get_contract_names(blocks)):
+        try:
+            if ("items" not in block and os.path.exists(block["path"])
+                    and TABLE_FIELD in get_block_placeholders(block)):
+                raise ValueError("у файлі стану немає товарів (його збережено старішою версією програми) - "
+                                 "відкрийте захід у програмі і закрийте її, щоб зберегти товари")
+            contract = prepare_contract(block, people_replacements)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"[ERROR] {block['title']}: {e}")
+            failed.append(f"{block['title']}: {e}")
+            continue
+        jobs.append(make_job(contract, os.path.join(out_dir, contract_name)))
+
+    generated = 0
+    for result in run_generation_jobs(jobs, "ooxml", workers):
+        if result["success"]:
+            generated += 1
+            print(f"[SUCCESS] {result['save_path']}")
+        else:
+            failed.append(f"{result['title']}: {result['error']}")
+        if result["pdf_error"]:
+            failed.append(f"{result['title']}: PDF не створено ({result['pdf_error']})")
+
+    return generated, failed
+
+
+def export_excel(blocks, out_dir, event_number):
+    from excel_export import export_event_extract
+    from event_package import EXCEL_EXTRACT_NAME, get_blocks_fields
+
+    output_path = os.path.join(out_dir, EXCEL_EXTRACT_NAME)
+    export_event_extract(blocks, get_blocks_fields(blocks), output_path, event_number)
+    print(f"[SUCCESS] {output_path}")
+
+
+def export_koshtorys(blocks, out_dir):
+    from event_package import KOSHTORYS_NAME, get_event_koshtorys_data, write_event_koshtorys
+
+    data = get_event_koshtorys_data(blocks)
+    if data is None:
+        return False
+    output_path = os.path.join(out_dir, KOSHTORYS_NAME)
+    write_event_koshtorys(output_path, data)
+    print(f"[SUCCESS] {output_path}")
+    return True
+
+
+def export_all_koshtorys(state, out_dir, base_dir, name_pattern, workers=None):
+    """Кошториси всіх заходів стану в out_dir одним пакетом. Повертає звіт save_koshtorys_batch"""
+    import koshtorys
+
+    events = []
+    for tab in state.get("tabs", []):
+        tab_name = tab.get("name", "")
+        events.append({"назва": tab_name, "номер": tab.get("event_number") or "",
+                       "blocks": get_state_blocks(state, tab_name, tab.get("event_number"), base_dir)})
+    return koshtorys.save_koshtorys_batch(events, out_dir, name_pattern, workers)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Пакетна генерація договорів, кошторису та витягу з бази даних без GUI")
+    parser.add_argument("--state", default="app_state.json", help="файл стану програми (за замовчуванням app_state.json)")
+    selector = parser.add_mutually_exclusive_group()
+    selector.add_argument("--event", help="номер заходу зі стану")
+    selector.add_argument("--tab", help="назва вкладки заходу")
+    parser.add_argument("--out", required=True, help="папка для результатів")
+    parser.add_argument("--zip", action="store_true", help="запакувати все в один ZIP-архів у папці --out")
+    parser.add_argument("--workers", type=int, default=None, help="кількість процесів рендеру (0 - авто)")
+    parser.add_argument("--no-excel", action="store_true", help="не створювати витяг з бази даних")
+    parser.add_argument("--no-koshtorys", action="store_true", help="не створювати кошторис")
+    parser.add_argument("--all-koshtorys", action="store_true",
+                        help="створити тільки кошториси всіх заходів стану (без договорів)")
+    parser.add_argument("--koshtorys-pattern", default=None,
+                        help="шаблон імені кошторису для --all-koshtorys: {номер}, {дата}, {назва}")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    started = time.perf_counter()
+
+    try:
+        state = load_state(args.state)
+        if args.all_koshtorys:
+            tab_name, event_number = None, None
+        else:
+            tab_name, event_number = select_event(state, args.event, args.tab)
+    except ValueError as e:
+        print(f"[ERROR] {e}")
+        return EXIT_USAGE
+
+    base_dir = os.path.dirname(os.path.abspath(args.state))
+
+    if args.all_koshtorys:
+        import koshtorys
+
+        report = export_all_koshtorys(state, args.out, base_dir,
+                                      args.koshtorys_pattern or koshtorys.KOSHTORYS_NAME_PATTERN, args.workers)
+        print(f"[INFO] Створено кошторисів: {len(report['files'])} за {time.perf_counter() - started:.2f} с")
+        for item in report["failed"]:
+            print(f"[ERROR] • {item}")
+        if not report["files"]:
+            return EXIT_FAILED
+        return EXIT_PARTIAL if report["failed"] else EXIT_OK
+
+    blocks = get_state_blocks(state, tab_name, event_number, base_dir)
+    if not blocks:
+        print(f"[ERROR] У заході '{tab_name}' немає договорів з шаблонами")
+        return EXIT_USAGE
+
+    print(f"[INFO] Захід '{tab_name}' (№{event_number}), договорів: {len(blocks)}")
+    os.makedirs(args.out, exist_ok=True)
+
+    from people_manager import people_manager
+    people_replacements = people_manager.generate_replacements()
+
+    failed = []
+    try:
+        if args.zip:
+            from event_package import write_event_zip
+            from contract_renderer import get_safe_title
+
+            zip_path = os.path.join(args.out, f"{get_safe_title({'title': tab_name}, 'захід')}.zip")
+            report = write_event_zip(zip_path, blocks, None, event_number or "", people_replacements,
+                                     include_excel=not args.no_excel, include_koshtorys=not args.no_koshtorys)
+            failed.extend(report["failed"])
+            generated = sum(1 for name in report["files"] if name.endswith(".docx"))
+        else:
+            generated, contract_failures = generate_contracts(blocks, args.out, people_replacements, args.workers)
+            failed.extend(contract_failures)
+
+            if not args.no_excel:
+                try:
+                    export_excel(blocks, args.out, event_number or "")
+                except Exception as e:
+                    traceback.print_exc()
+                    failed.append(f"Excel: {e}")
+
+            if not args.no_koshtorys:
+                try:
+                    export_koshtorys(blocks, args.out)
+                except Exception as e:
+                    traceback.print_exc()
+                    failed.append(f"Кошторис: {e}")
+
+    except Exception as e:
+        print(f"[ERROR] Критична помилка пакетної генерації: {e}")
+        traceback.print_exc()
+        return EXIT_FAILED
+
+    print(f"[INFO] Згенеровано договорів: {generated} з {len(blocks)} за {time.perf_counter() - started:.2f} с")
+    for item in failed:
+        print(f"[ERROR] • {item}")
+
+    if generated == 0:
+        return EXIT_FAILED
+    return EXIT_PARTIAL if failed else EXIT_OK
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,162 @@
+# contract_renderer.py
+# -*- coding: utf-8 -*-
+"""
+Програмний API генерації договорів у пам'ять (без діалогів і без запису на диск).
+
+    data = render_contract(block)                    # байти .docx одного договору
+    for name, data in iter_event_contracts(blocks):  # договори заходу по одному
+        ...
+
+Модуль не імпортує tkinter/customtkinter: ним користуються GUI (generation.py),
+пакувальник ZIP, CLI та інші пакетні інструменти.
+"""
+
+import os
+
+from ooxml_renderer import snapshot_block_entries, get_block_items, render_document_bytes
+from render_plan import get_render_plan
+from placeholder_cache import get_cached_placeholders
+from placeholder_scanner import extract_placeholders
+from people_manager import people_manager
+
+TABLE_FIELD = "таблиця_товарів"
+
+
+def validate_items_data(items_data):
+    """
+    Перевірка даних товарів
+    """
+    if not items_data or len(items_data) == 0:
+        raise ValueError("Будь ласка, заповніть поле для товару чи товарів")
+
+    # Перевіряємо, що всі товари мають необхідні поля
+    for i, item in enumerate(items_data, 1):
+        if not item.get("товар", "").strip():
+            raise ValueError(f"Товар №{i}: не заповнено найменування")
+        if not item.get("дк", "").strip():
+            raise ValueError(f"Товар №{i}: не заповнено код ДК-021:2015")
+        if not item.get("кількість", "").strip():
+            raise ValueError(f"Товар №{i}: не заповнено кількість")
+        if not item.get("ціна", "").strip():
+            raise ValueError(f"Товар №{i}: не заповнено ціну за одиницю")
+
+        # Перевіряємо, що кількість та ціна - це числа
+        try:
+            qty_str = item.get("кількість", "0").replace(",", ".")
+            float(qty_str)
+        except (ValueError, TypeError):
+            raise ValueError(f"Товар №{i}: кількість має бути числом")
+
+        try:
+            price_str = item.get("ціна", "0").replace(",", ".")
+            float(price_str)
+        except (ValueError, TypeError):
+            raise ValueError(f"Товар №{i}: ціна має бути числом")
+
+    return True
+
+
+def get_safe_title(block, fallback="document"):
+    """Назва договору, придатна для імені файлу"""
+    safe_title = "".join(
+        c for c in block.get("title", "document") if c.isalnum() or c in (' ', '-', '_')).rstrip()
+    return safe_title or fallback
+
+
+def get_contract_names(blocks, extension=".docx"):
+    """Унікальні імена файлів для договорів заходу (однакові назви отримують суфікс _1, _2...)"""
+    names = []
+    used = set()
+    for index, block in enumerate(blocks, 1):
+        safe_title = get_safe_title(block, f"document_{index}")
+        name = f"{safe_title}{extension}"
+        counter = 1
+        while name in used:
+            name = f"{safe_title}_{counter}{extension}"
+            counter += 1
+        used.add(name)
+        names.append(name)
+    return names
+
+
+def get_block_placeholders(block):
+    """Плейсхолдери шаблону блоку (з block["placeholders"] або з кешу сканера)"""
+    placeholders = block.get("placeholders")
+    if placeholders is None:
+        placeholders = set(get_cached_placeholders(block["path"], extract_placeholders, kind="zip"))
+        block["placeholders"] = placeholders
+    return placeholders
+
+
+def prepare_contract(block, people_replacements=None, current_fields=None):
+    """
+    Знімає всі дані договору у звичайний словник (без віджетів), придатний
+    для передачі в інший процес.
+
+    Raises:
+        FileNotFoundError: шаблон не знайдено
+        ValueError: некоректні дані товарів (текст помилки - для користувача)
+    """
+    template_path = block.get("path", "")
+    if not template_path or not os.path.exists(template_path):
+        raise FileNotFoundError(f"Шаблон не знайдено: {template_path}")
+
+    if current_fields is not None:
+        placeholders = block.get("placeholders", current_fields)
+    else:
+        placeholders = get_block_placeholders(block)
+
+    # Таблиця товарів вставляється тільки якщо шаблон містить <таблиця_товарів>
+    items = None
+    if TABLE_FIELD in placeholders:
+        items = get_block_items(block)
+        validate_items_data(items)
+
+    if people_replacements is None:
+        people_replacements = people_manager.generate_replacements()
+
+    return {
+        "title": block.get("title", "Невідомий"),
+        "template_path": os.path.abspath(template_path),
+        "entries": snapshot_block_entries(block),
+        "items": items,
+        "people_replacements": people_replacements,
+        "placeholders": sorted(placeholders),
+    }
+
+
+def render_prepared_contract(contract, hits=None):
+    """Рендерить підготовлений договір (prepare_contract) і повертає байти .docx"""
+    return render_document_bytes(
+        contract["template_path"],
+        contract["entries"],
+        contract["items"],
+        contract["people_replacements"],
+        contract["placeholders"],
+        hits,
+        get_render_plan(contract["template_path"])
+    )
+
+
+def render_contract(block, people_replacements=None):
+    """Рендерить договір блоку в пам'ять і повертає байти .docx"""
+    return render_prepared_contract(prepare_contract(block, people_replacements))
+
+
+def iter_event_contracts(blocks, people_replacements=None, failed=None):
+    """
+    Послідовно рендерить договори заходу і повертає пари (ім'я файлу, байти).
+    У пам'яті одночасно знаходиться лише один договір.
+    Помилки окремих договорів не зупиняють генерацію: вони додаються в failed
+    (якщо передано) у форматі "назва: помилка".
+    """
+    if people_replacements is None:
+        people_replacements = people_manager.generate_replacements()
+
+    for block, name in zip(blocks, get_contract_names(blocks)):
+        try:
+            yield name, render_contract(block, people_replacements)
+        except Exception as e:
+            print(f"[ERROR] Не вдалося згенерувати '{block.get('title', name)}': {e}")
+            if failed is not None:
+                failed.append(f"{block.get('title', 'Невідомий')}: {e}")
@@ -9,7 +9,7 @@ import json
 from globals import EXAMPLES, document_blocks
 from gui_utils import bind_entry_shortcuts, create_context_menu
 from custom_widgets import CustomEntry
-from text_utils import number_to_ukrainian_text
+from koshtorys_totals import calculate_totals
 from data_persistence import get_template_memory, load_memory
 from state_manager import save_current_state
 from event_common_fields import fill_common_fields_for_new_contract, COMMON_FIELDS
@@ -119,27 +119,11 @@ def create_products_table_widget(parent_frame, products_data=None):
     context_menu = create_context_menu(products_frame)
 
     def calculate_row_total(row_index):
-        """Перераховує суму для рядка товару"""
+        """Перераховує суму для рядка товару (суми рядків і загальна сума рахуються разом)"""
         try:
             if row_index >= len(product_rows):
                 return
 
-            row_data = product_rows[row_index]
-            qty_text = row_data["entries"]["кількість"].get().replace(",", ".").strip()
-            price_text = row_data["entries"]["ціна за одиницю"].get().replace(",", ".").strip()
-
-            qty = float(qty_text) if qty_text else 0
-            price = float(price_text) if price_text else 0
-            total = qty * price
-
-            # Оновлюємо поле суми для рядка
-            sum_entry = row_data["entries"]["сума"]
-            sum_entry.configure(state="normal")
-            sum_entry.delete(0, "end")
-            sum_entry.insert(0, f"{total:.2f}")
-            sum_entry.configure(state="readonly")
-
-            # Перераховуємо загальну суму
             update_total_display()
 
         except (ValueError, AttributeError):
@@ -265,22 +249,33 @@ def create_products_table_widget(parent_frame, products_data=None):
     # Прив'язуємо контекстне меню до поля загальної суми
     bind_entry_shortcuts(total_entry, context_menu)
 
+    # Обробники зміни сум (поля "разом", "сума прописом" блоку договору); отримують результат calculate_totals
+    total_listeners = []
+
     def update_total_display():
-        """Оновлює відображення загальної суми"""
-        total_sum = 0
-        for row_data in product_rows:
-            try:
-                sum_text = row_data["entries"]["сума"].get().replace(",", ".").strip()
-                if sum_text:
-                    total_sum += float(sum_text)
-            except (ValueError, AttributeError):
-                pass
+        """Перераховує суми всіх рядків і загальну суму одним викликом (Decimal)"""
+        totals = calculate_totals(
+            [row_data["entries"]["кількість"].get() for row_data in product_rows],
+            [row_data["entries"]["ціна за одиницю"].get() for row_data in product_rows]
+        )
+
+        for row_data, line_sum in zip(product_rows, totals["line_sums"]):
+            sum_entry = row_data["entries"]["сума"]
+            sum_text = f"{line_sum:.2f}"
+            if sum_entry.get() != sum_text:
+                sum_entry.configure(state="normal")
+                sum_entry.delete(0, "end")
+                sum_entry.insert(0, sum_text)
+                sum_entry.configure(state="readonly")
 
         total_entry.configure(state="normal")
         total_entry.delete(0, "end")
-        total_entry.insert(0, f"{total_sum:.2f}")
+        total_entry.insert(0, totals["total_text"])
         total_entry.configure(state="readonly")
-        return total_sum
+
+        for listener in total_listeners:
+            listener(totals)
+        return totals["total"]
 
     def get_products_data():
         """Повертає дані всіх товарів у вигляді списку словників"""
@@ -332,6 +327,7 @@ def create_products_table_widget(parent_frame, products_data=None):
         "total_entry": total_entry,
         "update_total": update_total_display,
         "get_total_sum": get_total_sum,
+        "total_listeners": total_listeners,
         "product_rows": product_rows,
         "context_menu": context_menu
     }
@@ -501,42 +497,29 @@ def create_document_fields_block(parent_frame, tabview=None, template_path=None)
             hint_button.grid(row=i, column=2, padx=(0, 5), pady=3, sticky="e")
 
         # Функция для обновления общих полей на основе данных таблицы товаров
-        def update_summary_fields():
-            if not products_widget:
-                return
-
-            total_sum = products_widget["update_total"]()
-
+        def update_summary_fields(totals):
             # Обновляем поля общей суммы
             summary_fields = ["разом", "загальна сума", "всього"]
             for field_name in summary_fields:
                 if field_name in current_block_entries:
                     entry = current_block_entries[field_name]
                     entry.configure(state="normal")
-                    entry.set_text(f"{total_sum:.2f}")
+                    entry.set_text(totals["total_text"])
                     entry.configure(state="readonly")
 
-            # Обновляем поле "сума прописом"
+            # Обновляем поле "сума прописом" (строка из кеша calculate_totals)
             if "сума прописом" in current_block_entries:
                 entry = current_block_entries["сума прописом"]
                 entry.configure(state="normal")
-                if total_sum > 0:
-                    entry.set_text(number_to_ukrainian_text(total_sum).capitalize())
+                if totals["total"] > 0:
+                    entry.set_text(totals["words"])
                 else:
                     entry.set_text("")
                 entry.configure(state="readonly")
 
-        # Привязываем обновление сводных полей к изменениям в таблице товаров
+        # Привязываем обновление сводных полей к каждому пересчету таблицы товаров
         if products_widget:
-            # Перехватываем функцию обновления таблицы
-            original_update = products_widget["update_total"]
-
-            def enhanced_update():
-                result = original_update()
-                update_summary_fields()
-                return result
-
-            products_widget["update_total"] = enhanced_update
+            products_widget["total_listeners"].append(update_summary_fields)
 
         # Робимо readonly поля, які автоматично обчислюються
         readonly_fields = ["сума прописом", "разом", "загальна сума", "всього"]
@@ -646,6 +629,11 @@ def create_document_fields_block(parent_frame, tabview=None, template_path=None)
         "has_products_table": has_products_table
     }
 
+    # Актуальные товары таблицы (get_block_items, сохранение и восстановление состояния)
+    if products_widget:
+        block_dict["items"] = products_widget["get_data"]
+        block_dict["set_items"] = products_widget["set_data"]
+
     # Добавляем блок в глобальный список
     document_blocks.append(block_dict)
 
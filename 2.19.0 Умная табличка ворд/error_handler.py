@@ -1,4 +1,3 @@
-import tkinter.messagebox as messagebox
 import traceback
 import datetime
 import sys
@@ -18,6 +17,8 @@ def log_and_show_error(exc_type, exc_value, exc_traceback, error_log_file=ERROR_
     """Логирует ошибку и показывает сообщение пользователю."""
     log_error_to_file(exc_type, exc_value, exc_traceback, error_log_file)
     try:
+        # tkinter імпортується тільки тут, щоб модуль працював і без GUI (CLI)
+        import tkinter.messagebox as messagebox
         messagebox.showerror("Ошибка", f"Произошла ошибка: {str(exc_value)}\nПодробности в файле {error_log_file}")
     except Exception as mb_ex:
         print(f"Ошибка при показе messagebox: {mb_ex}")
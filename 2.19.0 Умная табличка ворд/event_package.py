@@ -0,0 +1,125 @@
+# event_package.py
+# -*- coding: utf-8 -*-
+"""
+Пакування заходу в один ZIP-архів для бухгалтерії.
+
+Договори рендеряться в пам'ять (contract_renderer) і записуються в архів по
+одному, одразу після рендеру; витяг з бази даних і кошторис пишуться
+безпосередньо в запис архіву. Файли в папку збереження не створюються, а в
+пам'яті одночасно знаходиться лише один документ.
+
+Архів спочатку пишеться у тимчасовий файл поруч і замінює цільовий тільки після
+успішного завершення - недописаний архів не залишається під кінцевим ім'ям.
+"""
+
+import os
+import zipfile
+import traceback
+
+from contract_renderer import iter_event_contracts, get_block_placeholders
+
+# Імена службових файлів в архіві
+EXCEL_EXTRACT_NAME = "база_даних.xlsx"
+KOSHTORYS_NAME = "кошторис.xlsx"
+
+
+def get_blocks_fields(blocks):
+    """Усі плейсхолдери шаблонів заходу (поля для витягу з бази даних)"""
+    fields = set()
+    for block in blocks:
+        if block.get("path") and os.path.exists(block["path"]):
+            fields.update(get_block_placeholders(block))
+    return sorted(fields)
+
+
+def _write_excel_extract(zf, blocks, fields_list, event_number):
+    from excel_export import export_event_extract
+
+    with zf.open(EXCEL_EXTRACT_NAME, "w", force_zip64=True) as dest:
+        export_event_extract(blocks, fields_list, dest, event_number)
+
+
+def get_event_koshtorys_data(blocks):
+    """Дані кошторису заходу (koshtorys.get_koshtorys_data) або None, якщо немає товарів чи шаблону"""
+    import koshtorys
+
+    if not koshtorys.EXCEL_AVAILABLE or not os.path.exists(koshtorys.KOSHTORYS_TEMPLATE_PATH):
+        print(f"[WARNING] Шаблон кошторису {koshtorys.KOSHTORYS_TEMPLATE_PATH} недоступний")
+        return None
+
+    data = koshtorys.get_koshtorys_data(blocks)
+    if data is None:
+        print("[WARNING] Немає товарів для кошторису")
+        return None
+
+    return data
+
+
+def write_event_koshtorys(output, data):
+    """Записує кошторис з даними get_event_koshtorys_data в output (шлях або файловий об'єкт)"""
+    import koshtorys
+
+    koshtorys.write_koshtorys_file(output, data["захід"], data["адреса"], data["дата"], data["товари"],
+                                   data["загальна_сума"])
+
+
+def _write_koshtorys(zf, blocks):
+    """Повертає False, якщо кошторис не створено (немає товарів або шаблону)"""
+    data = get_event_koshtorys_data(blocks)
+    if data is None:
+        return False
+
+    with zf.open(KOSHTORYS_NAME, "w", force_zip64=True) as dest:
+        write_event_koshtorys(dest, data)
+    return True
+
+
+def write_event_zip(zip_path, blocks, fields_list=None, event_number="", people_replacements=None,
+                    include_excel=True, include_koshtorys=True):
+    """
+    Записує договори, витяг з бази даних і кошторис заходу в ZIP-архів.
+
+    Returns:
+        {"files": [імена в архіві], "failed": ["назва: помилка", ...]}
+    """
+    report = {"files": [], "failed": []}
+    tmp_path = zip_path + ".tmp"
+
+    try:
+        with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            # Договори: рендер і запис по одному
+            for name, data in iter_event_contracts(blocks, people_replacements, report["failed"]):
+                zf.writestr(name, data)
+                report["files"].append(name)
+                print(f"[DEBUG] Додано в архів: {name}")
+
+            if include_excel:
+                try:
+                    if fields_list is None:
+                        fields_list = get_blocks_fields(blocks)
+                    _write_excel_extract(zf, blocks, fields_list, event_number)
+                    report["files"].append(EXCEL_EXTRACT_NAME)
+                except Exception as e:
+                    print(f"[ERROR] Не вдалося додати витяг з бази даних: {e}")
+                    traceback.print_exc()
+                    report["failed"].append(f"{EXCEL_EXTRACT_NAME}: {e}")
+
+            if include_koshtorys:
+                try:
+                    if _write_koshtorys(zf, blocks):
+                        report["files"].append(KOSHTORYS_NAME)
+                except Exception as e:
+                    print(f"[ERROR] Не вдалося додати кошторис: {e}")
+                    traceback.print_exc()
+                    report["failed"].append(f"{KOSHTORYS_NAME}: {e}")
+
+        os.replace(tmp_path, zip_path)
+        print(f"[SUCCESS] Архів заходу збережено: {zip_path}")
+        return report
+
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
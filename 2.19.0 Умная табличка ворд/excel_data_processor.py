@@ -8,18 +8,27 @@ import re
 from openpyxl import Workbook, load_workbook
 from excel_config import get_ordered_headers, get_headers_config
 from excel_formatters import format_headers, apply_column_widths
+from template_cache import template_cache
+from excel_row_index import get_row_index, notify_row_changed
 
 
 def ensure_file_structure(filename, fields_list):
     """
     Проверяет существование файла и создает его со структурой заголовков если нужно
     Возвращает рабочий лист
+
+    Книга, сохраненная в этой сессии (template_cache.put после wb.save), берется из
+    кеша без повторного чтения, если файл с тех пор не менялся.
     """
     headers = get_ordered_headers(fields_list)
 
     if os.path.exists(filename):
         try:
-            wb = load_workbook(filename)
+            wb = template_cache.take(filename)
+            if wb is None:
+                wb = load_workbook(filename)
+            else:
+                print(f"[DEBUG] Книга {filename} взята из кеша (файл не изменялся)")
             ws = wb.active
 
             # Проверяем, есть ли заголовки
@@ -50,8 +59,8 @@ def ensure_file_structure(filename, fields_list):
         return create_new_file(filename, fields_list)
 
 
-def create_new_file(filename, fields_list):
-    """Создает новый файл с заголовками"""
+def build_new_workbook(fields_list):
+    """Создает в памяти новую книгу с заголовками (без сохранения)"""
     headers = get_ordered_headers(fields_list)
     wb = Workbook()
     ws = wb.active
@@ -61,6 +70,12 @@ def create_new_file(filename, fields_list):
     ws.append(headers)
     format_headers(ws, headers)
     apply_column_widths(ws, fields_list)
+    return wb, ws
+
+
+def create_new_file(filename, fields_list):
+    """Создает новый файл с заголовками"""
+    wb, ws = build_new_workbook(fields_list)
 
     wb.save(filename)
     print(f"[INFO] Создан новый файл: {filename}")
@@ -84,37 +99,23 @@ def find_event_product_row(ws, event_number, product_name, headers):
     if ws.max_row < 2:  # Нет данных, только заголовки или пустой лист
         return None
 
-    # Находим индексы нужных колонок
-    event_number_col = None
-    product_col = None
-
-    for col_idx, header in enumerate(headers, 1):
-        if header.lower() == "номер заходу":
-            event_number_col = col_idx
-        elif header.lower() == "товар":
-            product_col = col_idx
-
-    if event_number_col is None:
+    row_index = get_row_index(ws, headers)
+    if row_index.event_col is None:
         print(f"[ERROR] Не найдена колонка 'Номер заходу'")
         return None
 
-    # Ищем строку с совпадающим номером события и товаром
-    for row in range(2, ws.max_row + 1):  # Начинаем с 2-й строки (после заголовков)
-        event_cell_value = ws.cell(row=row, column=event_number_col).value
-
-        # Проверяем номер события
-        if str(event_cell_value) == str(event_number):
-            # Если есть колонка товара, проверяем и её
-            if product_col is not None and product_name:
-                product_cell_value = ws.cell(row=row, column=product_col).value
-                if str(product_cell_value or "").lower() == str(product_name or "").lower():
-                    print(
-                        f"[DEBUG] Найдена существующая запись для события {event_number}, товар '{product_name}' в строке {row}")
-                    return row
-            else:
-                # Если нет колонки товара или товар не указан, берем первое совпадение по событию
-                print(f"[DEBUG] Найдена существующая запись для события {event_number} в строке {row}")
-                return row
+    # Если есть колонка товара и товар указан - ищем по товару (без учета регистра), иначе первая строка события
+    if row_index.product_col is not None and product_name:
+        row = row_index.find_product_row(event_number, product_name, exact=True)
+        if row is not None:
+            print(
+                f"[DEBUG] Найдена существующая запись для события {event_number}, товар '{product_name}' в строке {row}")
+        return row
+
+    event_rows = row_index.event_rows(event_number)
+    if event_rows:
+        print(f"[DEBUG] Найдена существующая запись для события {event_number} в строке {event_rows[0]}")
+        return event_rows[0]
 
     return None
 
@@ -131,24 +132,7 @@ def find_all_event_rows(ws, event_number, headers):
     if ws.max_row < 2:
         return []
 
-    # Находим индекс колонки с номером события
-    event_number_col = None
-    for col_idx, header in enumerate(headers, 1):
-        if header.lower() == "номер заходу":
-            event_number_col = col_idx
-            break
-
-    if event_number_col is None:
-        return []
-
-    # Ищем все строки с этим номером события
-    matching_rows = []
-    for row in range(2, ws.max_row + 1):
-        event_cell_value = ws.cell(row=row, column=event_number_col).value
-        if str(event_cell_value) == str(event_number):
-            matching_rows.append(row)
-
-    return matching_rows
+    return get_row_index(ws, headers).event_rows(event_number)
 
 
 def update_existing_row(ws, row_number, row_data, headers):
@@ -166,6 +150,8 @@ def update_existing_row(ws, row_number, row_data, headers):
                 header_name = headers[col_num - 1] if col_num <= len(headers) else f"Колонка_{col_num}"
                 print(f"[DEBUG] Обновлено '{header_name}': '{old_value}' -> '{value}'")
 
+    notify_row_changed(ws, row_number)
+
 
 def add_new_row(ws, row_data):
     """
@@ -177,6 +163,7 @@ def add_new_row(ws, row_data):
     for col_num, value in enumerate(row_data, 1):
         ws.cell(row=new_row, column=col_num, value=value)
 
+    notify_row_changed(ws, new_row)
     return new_row
 
 
@@ -5,13 +5,14 @@
 
 import re
 import traceback
-import tkinter.messagebox as messagebox
 
 # Импорты из наших модулей
+from template_cache import template_cache
+from excel_row_index import build_row_index
 from excel_config import get_headers_config, get_ordered_headers, get_headers_mapping, is_numeric_field, \
     convert_to_number
 from excel_data_processor import (
-    ensure_file_structure, create_new_file, add_new_row, update_existing_row,
+    ensure_file_structure, create_new_file, build_new_workbook, add_new_row, update_existing_row,
     get_product_name_from_row_data
 )
 
@@ -36,11 +37,66 @@ except ImportError:
         print(f"Error (logging stub): {exc_value}")
         traceback.print_exception(exc_type, exc_value, exc_traceback)
         try:
+            import tkinter.messagebox as messagebox
             messagebox.showerror("Помилка (Excel Export)", f"Сталася помилка: {str(exc_value)}")
         except:
             pass
 
 
+# ----------------------------------------------------------------------------------------------------------------------
+# Подготовка строк
+def build_row_data(block, fields_list, event_number=""):
+    """Формирует строку базы данных для блока документа согласно конфигурации заголовков"""
+    tab_name = block.get("tab_name", "")
+    entries = block.get("entries", {})
+    row_data = []
+
+    for header_config in get_headers_config(fields_list):
+        key = header_config["key"]
+
+        if key == "event_number":
+            value = event_number if event_number is not None else ""
+        elif key == "event_name":
+            value = tab_name
+        else:
+            # Ищем значение в entries по ключу из fields_list
+            entry_widget_or_value = entries.get(key)
+            if hasattr(entry_widget_or_value, 'get'):
+                value = entry_widget_or_value.get()
+            else:
+                value = entry_widget_or_value if entry_widget_or_value is not None else ""
+
+        # Обрабатываем числовые поля
+        if is_numeric_field(key) and value != "":
+            converted_value = convert_to_number(value)
+            print(
+                f"[DEBUG] Числовое поле '{key}': '{value}' -> {converted_value} (тип: {type(converted_value)})")
+            row_data.append(converted_value)
+        else:
+            row_data.append(value)
+            print(f"[DEBUG] Поле '{key}': '{value}'")
+
+    return row_data
+
+
+def export_event_extract(document_blocks, fields_list, output, event_number=""):
+    """
+    Выгрузка данных одного мероприятия в отдельную книгу (без основной базы данных).
+
+    Args:
+        document_blocks: блоки документов мероприятия
+        fields_list: список полей
+        output: путь к файлу или файловый объект (например, запись в ZIP-архиве)
+        event_number: номер мероприятия (если в блоке нет 'event_number')
+    """
+    wb, ws = build_new_workbook(fields_list)
+    for block in document_blocks:
+        add_new_row(ws, build_row_data(block, fields_list, block.get('event_number', event_number)))
+    wb.save(output)
+    wb.close()
+    return len(document_blocks)
+
+
 # ----------------------------------------------------------------------------------------------------------------------
 # Основная функция экспорта
 def export_document_data_to_excel(document_blocks,
@@ -103,6 +159,8 @@ def export_document_data_to_excel(document_blocks,
         # Подготавливаем файл
         if update_mode:
             wb, ws = ensure_file_structure(output_filename, fields_list)
+            # Индекс строк по событию и товару - один проход по листу на весь экспорт
+            build_row_index(ws, headers)
         else:
             # Режим перезаписи - создаем новый файл
             wb, ws = create_new_file(output_filename, fields_list)
@@ -134,34 +192,7 @@ def export_document_data_to_excel(document_blocks,
                 event_number = event_numbers_map.get(tab_name, "")
 
             # Подготавливаем данные для строки
-            entries = block.get("entries", {})
-            row_data = []
-
-            # Заполняем данные согласно конфигурации заголовков
-            for header_config in get_headers_config(fields_list):
-                key = header_config["key"]
-
-                if key == "event_number":
-                    value = event_number if event_number is not None else ""
-                elif key == "event_name":
-                    value = tab_name
-                else:
-                    # Ищем значение в entries по ключу из fields_list
-                    entry_widget_or_value = entries.get(key)
-                    if hasattr(entry_widget_or_value, 'get'):
-                        value = entry_widget_or_value.get()
-                    else:
-                        value = entry_widget_or_value if entry_widget_or_value is not None else ""
-
-                # Обрабатываем числовые поля
-                if is_numeric_field(key) and value != "":
-                    converted_value = convert_to_number(value)
-                    print(
-                        f"[DEBUG] Числовое поле '{key}': '{value}' -> {converted_value} (тип: {type(converted_value)})")
-                    row_data.append(converted_value)
-                else:
-                    row_data.append(value)
-                    print(f"[DEBUG] Поле '{key}': '{value}'")
+            row_data = build_row_data(block, fields_list, event_number)
 
             # Получаем название товара для логики обновления
             product_name = get_product_name_from_row_data(row_data, headers)
@@ -220,6 +251,8 @@ def export_document_data_to_excel(document_blocks,
         # Сохраняем файл
         try:
             wb.save(output_filename)
+            # Следующий экспорт в этой сессии возьмет книгу из памяти, если файл не изменят
+            template_cache.put(output_filename, wb)
             print(f"[SUCCESS] ✅ Файл сохранен: {output_filename}")
         except Exception as e:
             print(f"[ERROR] ❌ Ошибка сохранения файла: {e}")
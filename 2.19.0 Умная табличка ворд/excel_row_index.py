@@ -0,0 +1,203 @@
+# excel_row_index.py
+"""
+Индекс строк листа базы данных для поиска без полного прохода по листу.
+
+Строится одним проходом по листу в начале экспорта:
+- номер события -> список строк (по возрастанию);
+- (номер события, нормализованный товар) -> первая строка с таким товаром
+  (normalize_text: "A-4" и "A4" - один товар, как в find_best_matching_row);
+- (номер события, товар в нижнем регистре) -> первая строка с таким товаром
+  (точное сравнение, как в find_event_product_row).
+
+add_new_row и update_existing_row (excel_data_processor) обновляют индекс
+листа сразу после записи, поэтому каждый поиск - обращение к словарю, а
+экспорт больше не проходит по всем строкам для каждого блока.
+
+    row_index = build_row_index(ws, headers)
+    row_index.event_rows(3)                 # [2, 5, 9]
+    row_index.find_product_row(3, "Папір")  # 5
+"""
+
+import re
+import weakref
+
+# Варианты заголовков колонок номера события и товара
+EVENT_NUMBER_HEADERS = ("номер заходу", "номер события", "event_number")
+PRODUCT_HEADERS = ("товар", "товару", "product", "продукт")
+
+# Индексы листов (лист -> SheetRowIndex); удаляются вместе с книгой
+_row_indexes = weakref.WeakKeyDictionary()
+
+
+def normalize_text(text):
+    """
+    Нормализует текст для сравнения:
+    - Убирает лишние пробелы
+    - Приводит к нижнему регистру
+    - Убирает знаки препинания
+    - Обрабатывает украинские символы
+    """
+    if not text or text == "":
+        return ""
+
+    # Приводим к строке
+    text = str(text).strip().lower()
+
+    # Убираем множественные пробелы
+    text = re.sub(r'\s+', ' ', text)
+
+    # Убираем некоторые знаки препинания в конце/начале
+    text = text.strip('.,!?;:-()[]{}\"\'')
+
+    # Убираем дополнительные символы которые могут мешать сравнению
+    text = re.sub(r'[^\w\s\u0400-\u04FF]', '', text)  # Оставляем только буквы, цифры, пробелы и кириллицу
+
+    return text
+
+
+def event_key(value):
+    """Ключ номера события (значение ячейки и номер из блока сравниваются как строки)"""
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+def exact_product_key(value):
+    """Ключ точного сравнения товара (без учета регистра)"""
+    return str(value or "").lower()
+
+
+def find_column(headers, names):
+    """Номер колонки (с 1) с одним из заголовков names или None"""
+    for col_idx, header in enumerate(headers, 1):
+        if str(header).lower() in names:
+            return col_idx
+    return None
+
+
+class SheetRowIndex:
+    """Индекс строк листа по номеру события и товару"""
+
+    def __init__(self, ws, headers):
+        # Слабая ссылка: индекс хранится в _row_indexes и не должен удерживать лист
+        self._ws = weakref.ref(ws)
+        self.headers = tuple(headers)
+        self.event_col = find_column(headers, EVENT_NUMBER_HEADERS)
+        self.product_col = find_column(headers, PRODUCT_HEADERS)
+        self._rows_by_event = {}
+        self._row_by_product = {}
+        self._row_by_exact_product = {}
+        # Строка -> (ключ события, нормализованный товар, точный товар), чтобы переиндексировать строку
+        self._row_keys = {}
+
+        if self.event_col is None:
+            return
+
+        last_col = max(self.event_col, self.product_col or 0)
+        for row_number, values in enumerate(
+                ws.iter_rows(min_row=2, max_col=last_col, values_only=True), 2):
+            self._add(row_number, values[self.event_col - 1],
+                      values[self.product_col - 1] if self.product_col else None)
+
+    def _add(self, row_number, event_value, product_value):
+        key = event_key(event_value)
+        if not key:
+            return
+        product_key = normalize_text(product_value)
+        exact_key = exact_product_key(product_value)
+        self._row_keys[row_number] = (key, product_key, exact_key)
+
+        rows = self._rows_by_event.setdefault(key, [])
+        if not rows or rows[-1] < row_number:
+            rows.append(row_number)
+        else:
+            rows.insert(next(i for i, row in enumerate(rows) if row > row_number), row_number)
+
+        for products, product in ((self._row_by_product, product_key), (self._row_by_exact_product, exact_key)):
+            existing = products.get((key, product))
+            if existing is None or row_number < existing:
+                products[(key, product)] = row_number
+
+    def _remove(self, row_number):
+        keys = self._row_keys.pop(row_number, None)
+        if keys is None:
+            return
+        key = keys[0]
+        rows = self._rows_by_event[key]
+        rows.remove(row_number)
+        if not rows:
+            del self._rows_by_event[key]
+
+        for products, position in ((self._row_by_product, 1), (self._row_by_exact_product, 2)):
+            product_key = (key, keys[position])
+            if products.get(product_key) == row_number:
+                # Первая из оставшихся строк с тем же товаром
+                replacement = next((row for row in rows if self._row_keys[row][position] == keys[position]), None)
+                if replacement is None:
+                    del products[product_key]
+                else:
+                    products[product_key] = replacement
+
+    @property
+    def ws(self):
+        return self._ws()
+
+    @property
+    def row_count(self):
+        """Количество проиндексированных строк (с номером события)"""
+        return len(self._row_keys)
+
+    @property
+    def event_count(self):
+        """Количество разных номеров событий"""
+        return len(self._rows_by_event)
+
+    def update_row(self, row_number):
+        """Переиндексирует строку после добавления или изменения"""
+        if self.event_col is None:
+            return
+        self._remove(row_number)
+        self._add(row_number, self.ws.cell(row=row_number, column=self.event_col).value,
+                  self.ws.cell(row=row_number, column=self.product_col).value if self.product_col else None)
+
+    def event_rows(self, event_number):
+        """Строки с номером события (по возрастанию)"""
+        return list(self._rows_by_event.get(event_key(event_number), ()))
+
+    def find_product_row(self, event_number, product_name, exact=False):
+        """
+        Первая строка события с тем же товаром или None.
+        exact=False - товары сравниваются после normalize_text, exact=True - без учета регистра.
+        """
+        if exact:
+            return self._row_by_exact_product.get((event_key(event_number), exact_product_key(product_name)))
+        return self._row_by_product.get((event_key(event_number), normalize_text(product_name)))
+
+    def product_value(self, row_number):
+        """Товар строки из листа (для сравнения по схожести)"""
+        if self.product_col is None:
+            return None
+        return self.ws.cell(row=row_number, column=self.product_col).value
+
+
+def build_row_index(ws, headers):
+    """Строит индекс листа заново и привязывает его к листу"""
+    row_index = SheetRowIndex(ws, headers)
+    _row_indexes[ws] = row_index
+    print(f"[DEBUG] Индекс листа: {row_index.row_count} строк, {row_index.event_count} событий")
+    return row_index
+
+
+def get_row_index(ws, headers):
+    """Индекс листа (строится при первом обращении или при других заголовках)"""
+    row_index = _row_indexes.get(ws)
+    if row_index is None or row_index.headers != tuple(headers):
+        row_index = build_row_index(ws, headers)
+    return row_index
+
+
+def notify_row_changed(ws, row_number):
+    """Обновляет индекс листа (если он построен) после записи строки"""
+    row_index = _row_indexes.get(ws)
+    if row_index is not None:
+        row_index.update_row(row_number)
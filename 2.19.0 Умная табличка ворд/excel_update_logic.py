@@ -7,7 +7,8 @@
 """
 
 import difflib
-import re
+
+from excel_row_index import get_row_index, normalize_text
 
 # Попытка импорта RapidFuzz, если не установлена - используем fallback
 try:
@@ -20,32 +21,6 @@ except ImportError:
     print("[INFO] Для установки выполните: pip install rapidfuzz")
 
 
-def normalize_text(text):
-    """
-    Нормализует текст для сравнения:
-    - Убирает лишние пробелы
-    - Приводит к нижнему регистру
-    - Убирает знаки препинания
-    - Обрабатывает украинские символы
-    """
-    if not text or text == "":
-        return ""
-
-    # Приводим к строке
-    text = str(text).strip().lower()
-
-    # Убираем множественные пробелы
-    text = re.sub(r'\s+', ' ', text)
-
-    # Убираем некоторые знаки препинания в конце/начале
-    text = text.strip('.,!?;:-()[]{}\"\'')
-
-    # Убираем дополнительные символы которые могут мешать сравнению
-    text = re.sub(r'[^\w\s\u0400-\u04FF]', '', text)  # Оставляем только буквы, цифры, пробелы и кириллицу
-
-    return text
-
-
 def calculate_similarity_score(text1, text2):
     """
     Вычисляет коэффициент схожести между двумя текстами
@@ -120,30 +95,16 @@ def find_best_matching_row(ws, event_number, product_name, headers, similarity_t
     if ws.max_row < 2:
         return None, 0
 
-    # Находим индексы нужных колонок
-    event_number_col = None
-    product_col = None
-
-    for col_idx, header in enumerate(headers, 1):
-        if header.lower() in ["номер заходу", "номер события", "event_number"]:
-            event_number_col = col_idx
-        elif header.lower() in ["товар", "товару", "product", "продукт"]:
-            product_col = col_idx
-
-    if event_number_col is None:
+    # Строки события берутся из индекса листа (без прохода по всему листу)
+    row_index = get_row_index(ws, headers)
+    if row_index.event_col is None:
         print(f"[ERROR] Не найдена колонка номера события")
         return None, 0
 
     best_row = None
     best_similarity = 0
 
-    # Ищем все строки с совпадающим номером события
-    matching_rows = []
-    for row in range(2, ws.max_row + 1):
-        event_cell_value = ws.cell(row=row, column=event_number_col).value
-        if str(event_cell_value).strip() == str(event_number).strip():
-            matching_rows.append(row)
-
+    matching_rows = row_index.event_rows(event_number)
     if not matching_rows:
         print(f"[DEBUG] Не найдено строк с номером события '{event_number}'")
         return None, 0
@@ -151,13 +112,19 @@ def find_best_matching_row(ws, event_number, product_name, headers, similarity_t
     print(f"[DEBUG] Найдено {len(matching_rows)} строк с номером события '{event_number}'")
 
     # Если нет колонки товара или товар не указан
-    if product_col is None or not product_name:
+    if row_index.product_col is None or not product_name:
         print(f"[DEBUG] Нет колонки товара или товар не указан, возвращаем первую найденную строку")
         return matching_rows[0], 100
 
-    # Сравниваем товары в найденных строках
+    # Тот же товар (после нормализации) - схожесть 100%, сравнивать остальные не нужно
+    exact_row = row_index.find_product_row(event_number, product_name)
+    if exact_row is not None:
+        print(f"[INFO] Найдена строка {exact_row} с тем же товаром '{product_name}'")
+        return exact_row, 100
+
+    # Сравниваем товары в строках события
     for row in matching_rows:
-        existing_product = ws.cell(row=row, column=product_col).value
+        existing_product = row_index.product_value(row)
         if existing_product is None:
             existing_product = ""
 
@@ -0,0 +1,88 @@
+# generation_manifest.py
+# -*- coding: utf-8 -*-
+"""
+Маніфест генерації для папки збереження договорів.
+
+Для кожного договору зберігається хеш його вхідних даних: SHA-256 шаблону,
+значення полів, товари, заміни людей (вибрані люди та спеціальні ролі),
+бекенд і налаштування PDF. При повторній генерації в ту ж папку договори з
+незмінним хешем і наявним файлом пропускаються, а змінені перезаписуються
+на місці, без створення копій _1, _2.
+"""
+
+import os
+import json
+import hashlib
+
+from placeholder_cache import file_sha256
+from pdf_export import get_pdf_path
+
+MANIFEST_FILE_NAME = ".generation_manifest.json"
+MANIFEST_VERSION = 1
+
+
+class GenerationManifest:
+    """Маніфест однієї папки збереження"""
+
+    def __init__(self, save_dir):
+        self.path = os.path.join(save_dir, MANIFEST_FILE_NAME)
+        self.contracts = {}
+        self._template_hashes = {}
+        self.load()
+
+    def load(self):
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == MANIFEST_VERSION:
+                    self.contracts = data.get('contracts', {})
+        except Exception as e:
+            print(f"[WARNING] Не вдалося прочитати маніфест генерації, усі договори буде згенеровано: {e}")
+            self.contracts = {}
+
+    def save(self):
+        """Атомарно записує маніфест"""
+        try:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': MANIFEST_VERSION, 'contracts': self.contracts}, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"[WARNING] Не вдалося зберегти маніфест генерації: {e}")
+
+    def _template_hash(self, template_path):
+        if template_path not in self._template_hashes:
+            self._template_hashes[template_path] = file_sha256(template_path)
+        return self._template_hashes[template_path]
+
+    def job_hash(self, job, backend):
+        """Хеш усіх вхідних даних договору"""
+        payload = {
+            "template": self._template_hash(job["template_path"]),
+            "entries": job["entries"],
+            "items": job["items"],
+            "people": job["people_replacements"],
+            "placeholders": job["placeholders"],
+            "backend": backend,
+            "export_pdf": job["export_pdf"],
+        }
+        data = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def is_unchanged(self, key, job, job_hash):
+        """True - договір вже згенеровано з тими самими даними і файли на місці"""
+        entry = self.contracts.get(key)
+        if not entry or entry.get("hash") != job_hash:
+            return False
+        if not os.path.exists(job["save_path"]):
+            return False
+        if job["export_pdf"] and not os.path.exists(get_pdf_path(job["save_path"])):
+            return False
+        return True
+
+    def record(self, key, job_hash, save_path):
+        self.contracts[key] = {"hash": job_hash, "file": os.path.basename(save_path)}
+
+    def forget(self, key):
+        self.contracts.pop(key, None)
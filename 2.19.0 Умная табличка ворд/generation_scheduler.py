@@ -0,0 +1,229 @@
+# generation_scheduler.py
+# -*- coding: utf-8 -*-
+"""
+Паралельна генерація договорів заходу в пулі процесів.
+
+GUI-процес готує для кожного договору "завдання" - знімок даних без віджетів
+(текст полів, товари, заміни людей, шлях збереження), а воркери рендерять їх:
+- бекенд "ooxml": звичайні процеси без Word;
+- бекенд "word": кожен воркер має власний COM-апартамент і власний Word з word_pool.
+
+Результати повертаються в порядку завдань; помилка одного договору не зупиняє інші.
+
+Пул процесів один на весь час роботи програми (get_executor): воркери не
+перезапускаються при кожній генерації, тому Word-сесія воркера (word_pool)
+переживає між запусками. Пул закривається при виході (atexit). Воркер імпортує
+лише word_renderer / contract_renderer - без модулів GUI.
+
+Якщо увімкнено EXPORT_PDF, поруч з кожним .docx створюється PDF: у Word-воркері -
+через ExportAsFixedFormat поки документ відкритий, для OOXML - через LibreOffice
+у фоновому потоці (pdf_export.PdfExporter), паралельно з рендером наступних договорів.
+"""
+
+import os
+import time
+import atexit
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from globals import GENERATION_WORKERS, EXPORT_PDF
+from pdf_export import PdfExporter, get_pdf_path
+
+# Константа Word wdExportFormatPDF
+WD_EXPORT_FORMAT_PDF = 17
+
+# Верхня межа воркерів при автоматичному виборі (кожен Word-воркер - окремий WINWORD.EXE)
+MAX_AUTO_WORKERS = 4
+
+# Спільний пул процесів генерації (створюється при першій паралельній генерації)
+_executor = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def make_job(contract, save_path, export_pdf=None):
+    """Створює завдання генерації з підготовленого договору (contract_renderer.prepare_contract)"""
+    job = dict(contract)
+    job["save_path"] = save_path
+    job["export_pdf"] = EXPORT_PDF if export_pdf is None else export_pdf
+    return job
+
+
+def get_worker_count(jobs_count, workers=None):
+    """Кількість воркерів: з налаштувань або автоматично за кількістю ядер"""
+    if workers is None:
+        workers = GENERATION_WORKERS
+    if not workers or workers < 1:
+        workers = min(os.cpu_count() or 1, MAX_AUTO_WORKERS)
+    return max(1, min(workers, jobs_count))
+
+
+def get_executor(workers):
+    """
+    Спільний пул процесів генерації. Пул створюється заново лише якщо потрібно
+    більше воркерів, ніж у наявному, або попередній пул аварійно зламався.
+    """
+    global _executor, _executor_workers
+
+    with _executor_lock:
+        if _executor is not None and (_executor_workers < workers or getattr(_executor, "_broken", False)):
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=workers)
+            _executor_workers = workers
+            print(f"[DEBUG] Пул генерації запущено: {workers} воркерів")
+        return _executor
+
+
+def shutdown_executor():
+    """Закриває спільний пул процесів (воркери закривають свої Word-сесії через atexit word_pool)"""
+    global _executor, _executor_workers
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+            _executor_workers = 0
+
+
+atexit.register(shutdown_executor)
+
+
+def _render_job_ooxml(job):
+    """Рендер договору без Word: байти з contract_renderer записуються у файл"""
+    from contract_renderer import render_prepared_contract
+
+    hits = {}
+    data = render_prepared_contract(job, hits)
+    with open(job["save_path"], "wb") as f:
+        f.write(data)
+    print(f"[DEBUG] OOXML: виконано замін: {sum(hits.values())}")
+    return True
+
+
+def _render_job_word(job, result):
+    """
+    Рендер договору через Word з пулу поточного процесу.
+    Помилка PDF не скасовує вже збережений .docx - вона записується в result["pdf_error"].
+    """
+    from word_renderer import process_document_content
+    from word_pool import word_pool
+
+    block = {
+        "path": job["template_path"],
+        "entries": job["entries"],
+        "items": job["items"],
+        "placeholders": job["placeholders"],
+    }
+
+    with word_pool.session() as word_app:
+        doc = word_app.Documents.Open(job["template_path"])
+        try:
+            if not process_document_content(doc, block, job["placeholders"], job["people_replacements"]):
+                return False
+            doc.SaveAs2(job["save_path"])
+
+            if job["export_pdf"]:
+                pdf_path = get_pdf_path(job["save_path"])
+                try:
+                    doc.ExportAsFixedFormat(pdf_path, WD_EXPORT_FORMAT_PDF)
+                    result["pdf_path"] = pdf_path
+                    print(f"[DEBUG] PDF створено: {pdf_path}")
+                except Exception as e:
+                    print(f"[ERROR] Не вдалося створити PDF для '{job['title']}': {e}")
+                    result["pdf_error"] = str(e)
+            return True
+        finally:
+            # Документ вже збережено (або він не потрібен) - закриваємо без запитів
+            doc.Close(False)
+
+
+def run_job(job, backend):
+    """
+    Виконує одне завдання. Викликається у воркері, тому ніколи не кидає виняток:
+    помилка повертається в результаті, як запис для failed_documents.
+    """
+    started = time.perf_counter()
+    result = {"title": job["title"], "save_path": job["save_path"], "success": False, "error": None,
+              "pdf_path": None, "pdf_error": None}
+
+    try:
+        if backend == "ooxml":
+            result["success"] = _render_job_ooxml(job)
+        else:
+            result["success"] = _render_job_word(job, result)
+        if not result["success"]:
+            result["error"] = "Помилка обробки вмісту"
+    except Exception as e:
+        print(f"[ERROR] Помилка при генерації '{job['title']}': {e}")
+        traceback.print_exc()
+        result["error"] = f"Помилка при генерації документу: {str(e)}"
+
+    print(f"[DEBUG] '{job['title']}' оброблено за {time.perf_counter() - started:.2f} с")
+    return result
+
+
+def run_generation_jobs(jobs, backend, workers=None):
+    """
+    Виконує завдання генерації і повертає результати в тому ж порядку, що й jobs.
+    При одному воркері все виконується в поточному процесі (без накладних витрат на запуск).
+    """
+    if not jobs:
+        return []
+
+    workers = get_worker_count(len(jobs), workers)
+    print(f"[DEBUG] Генерація {len(jobs)} договорів, воркерів: {workers}, бекенд: {backend}")
+
+    # PDF для OOXML конвертується у фоні, поки рендеряться наступні договори
+    pdf_exporter = None
+    if backend == "ooxml" and any(job["export_pdf"] for job in jobs):
+        pdf_exporter = PdfExporter()
+        if not pdf_exporter.available:
+            print("[WARNING] LibreOffice не знайдено - PDF не буде створено")
+
+    def collect(job, result):
+        if pdf_exporter is not None and job["export_pdf"] and result["success"]:
+            pdf_exporter.submit(result["save_path"])
+        results.append(result)
+
+    results = []
+    if workers == 1:
+        for job in jobs:
+            collect(job, run_job(job, backend))
+    else:
+        executor = get_executor(workers)
+        try:
+            futures = [executor.submit(run_job, job, backend) for job in jobs]
+        except BrokenProcessPool:
+            # Пул зламався між запусками - піднімаємо новий
+            print("[WARNING] Пул генерації зламаний, запускаємо новий")
+            shutdown_executor()
+            executor = get_executor(workers)
+            futures = [executor.submit(run_job, job, backend) for job in jobs]
+
+        for job, future in zip(jobs, futures):
+            try:
+                collect(job, future.result())
+            except Exception as e:
+                # Воркер впав (наприклад, BrokenProcessPool) - ізолюємо помилку на рівні договору
+                print(f"[ERROR] Воркер генерації завершився аварійно для '{job['title']}': {e}")
+                collect(job, {
+                    "title": job["title"],
+                    "save_path": job["save_path"],
+                    "success": False,
+                    "error": f"Помилка процесу генерації: {str(e)}",
+                    "pdf_path": None,
+                    "pdf_error": None,
+                })
+
+    if pdf_exporter is not None:
+        pdf_results = pdf_exporter.finish()
+        for result in results:
+            if result["save_path"] in pdf_results:
+                result["pdf_path"], result["pdf_error"] = pdf_results[result["save_path"]]
+
+    return results
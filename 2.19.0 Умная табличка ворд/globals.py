@@ -4,6 +4,27 @@
 
 version = "v2.19.0"
 name_prog = "SportForAll "
+
+# Бекенд генерації договорів:
+#   "word"  - через Microsoft Word (COM), потребує встановленого Office
+#   "ooxml" - напряму через XML шаблону (ooxml_renderer.py), працює без Word і на Linux
+GENERATION_BACKEND = "word"
+
+# Пул сесій Word (word_pool.py)
+WORD_POOL_SIZE = 1             # максимум одночасних екземплярів Word на потік
+WORD_POOL_IDLE_TIMEOUT = 300   # закрити Word після стількох секунд простою
+WORD_POOL_HANG_TIMEOUT = 180   # вважати Word завислим, якщо один документ обробляється довше
+
+# Кількість процесів для паралельної генерації договорів (generation_scheduler.py)
+# 0 - автоматично за кількістю ядер процесора, 1 - послідовно в поточному процесі
+GENERATION_WORKERS = 0
+
+# Експорт PDF поруч з кожним договором (pdf_export.py)
+EXPORT_PDF = False
+LIBREOFFICE_PATH = ""  # шлях до soffice для бекенду OOXML; порожньо - шукати автоматично
+
+# Докладний вивід повного тексту документа на кожному кроці обробки людей (people_manager.py)
+PEOPLE_TEXT_DEBUG = False
 # Поля для заповнення
 FIELDS = [
     "товар", "дк", "захід", "дата", "адреса", "пдв", "кількість", "ціна за одиницю",
@@ -30,101 +51,4 @@ EXAMPLES = {
 document_blocks = []  # Список блоків договорів
 main_app_root = None
 scroll_frame_main = None
-main_context_menu = None
-
-
-# from globals import SPECIAL_ROLES, PEOPLE_CONF
-# Конфігурація людей з рангами для сортування та склоненнями
-PEOPLE_CONFIG = {
-    "mokina": {
-        "name": "Ольга МОКІНА",
-        "position": "Головний спеціаліст\r\nфізкультурно-оздоровчої роботи\r\nсеред ветеранів війни",
-        "display_name": "Ольга МОКІНА (Головний спеціаліст)",
-        "rank": 2,
-        "position_dative": "Головному спеціалісту фізкультурно-оздоровчої роботи серед ветеранів війни",
-        "name_dative": "Ользі МОКІНІЙ",
-
-        # 🔽 Добавленные поля
-        "name_accusative": "Ольгу МОКІНУ",
-        "position_accusative": "головного спеціаліста фізкультурно-оздоровчої роботи серед ветеранів війни",
-        "accusative_block": "Ольгу МОКІНУ – головного спеціаліста фізкультурно-оздоровчої роботи серед ветеранів війни",
-
-        "placeholders": {
-            "full_block": "{{PERSON_MOKINA}}",
-            "name_only": "{{MOKINA_NAME}}",
-            "position_only": "{{MOKINA_POSITION}}",
-            "accusative_block": "{{MOKINA_ACCUSATIVE_BLOCK}}"
-        }
-    },
-    "bulavko": {
-        "name": "Костянтин БУЛАВКО",
-        "position": "Провідний спеціаліст\r\nфізкультурно-оздоровчої роботи\r\nсеред ветеранів війни",
-        "display_name": "Костянтин БУЛАВКО (Провідний спеціаліст)",
-        "rank": 4,
-        "position_dative": "Провідному спеціалісту фізкультурно-оздоровчої роботи серед ветеранів війни",
-        "name_dative": "Костянтину БУЛАВКО",
-
-        # 🔽 Добавленные поля
-        "name_accusative": "Костянтина БУЛАВКО",
-        "position_accusative": "провідного спеціаліста фізкультурно-оздоровчої роботи серед ветеранів війни",
-        "accusative_block": "Костянтина БУЛАВКО – провідного спеціаліста фізкультурно-оздоровчої роботи серед ветеранів війни",
-
-        "placeholders": {
-            "full_block": "{{PERSON_BULAVKO}}",
-            "name_only": "{{BULAVKO_NAME}}",
-            "position_only": "{{BULAVKO_POSITION}}",
-            "accusative_block": "{{BULAVKO_ACCUSATIVE_BLOCK}}"
-        }
-    },
-    "basai": {
-        "name": "Микола БАСАЙ",
-        "position": "Завідуючий сектором\r\nфізкультурно-оздоровчої роботи\r\nсеред ветеранів війни",
-        "display_name": "Микола БАСАЙ (Завідуючий сектором)",
-        "rank": 1,
-        "position_dative": "Завідувачу сектору фізкультурно-оздоровчої роботи серед ветеранів війни",
-        "name_dative": "Миколі БАСАЮ",
-
-        # 🔽 Добавленные поля
-        "name_accusative": "Миколу БАСАЯ",
-        "position_accusative": "завідуючого сектором фізкультурно-оздоровчої роботи серед ветеранів війни",
-        "accusative_block": "Миколу БАСАЯ – завідуючого сектором фізкультурно-оздоровчої роботи серед ветеранів війни",
-
-        "placeholders": {
-            "full_block": "{{PERSON_BASAI}}",
-            "name_only": "{{BASAI_NAME}}",
-            "position_only": "{{BASAI_POSITION}}",
-            "accusative_block": "{{BASAI_ACCUSATIVE_BLOCK}}"
-        }
-    },
-    "gordeeva": {
-        "name": "Вікторія ГОРДЄЄВА",
-        "position": "Провідний спеціаліст сектору\r\nфізкультурно-оздоровчої\r\nта спортивно-масової роботи",
-        "display_name": "Вікторія ГОРДЄЄВА (Провідний спеціаліст)",
-        "rank": 3,
-        "position_dative": "Провідному спеціалісту сектору фізкультурно-оздоровчої та спортивно-масової роботи",
-        "name_dative": "Вікторії ГОРДЄЄВІЙ",
-
-        # 🔽 Добавленные поля
-        "name_accusative": "Вікторію ГОРДЄЄВУ",
-        "position_accusative": "провідного спеціаліста сектору фізкультурно-оздоровчої та спортивно-масової роботи",
-        "accusative_block": "Вікторію ГОРДЄЄВУ – провідного спеціаліста сектору фізкультурно-оздоровчої та спортивно-масової роботи",
-
-        "placeholders": {
-            "full_block": "{{PERSON_GORDEEVA}}",
-            "name_only": "{{GORDEEVA_NAME}}",
-            "position_only": "{{GORDEEVA_POSITION}}",
-            "accusative_block": "{{GORDEEVA_ACCUSATIVE_BLOCK}}"
-        }
-    }
-}
-
-
-# Спеціальні ролі
-SPECIAL_ROLES = {
-    "material_responsible": {
-        "title": "Матеріально-відповідальна особа",
-        "placeholder": "{{MATERIAL_RESPONSIBLE}}",
-        "options": ["mokina", "bulavko", "basai", "gordeeva", None],
-        "default": "basai"
-    }
-}
\ No newline at end of file
+main_context_menu = None
\ No newline at end of file
@@ -2,12 +2,11 @@
 # -*- coding: utf-8 -*-
 
 import os
-import tkinter.filedialog as filedialog
-import tkinter.messagebox as messagebox
 import sys
 import traceback
 from datetime import datetime
 import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from openpyxl.styles import Font
 from openpyxl.utils.cell import column_index_from_string, coordinate_from_string
@@ -39,6 +38,7 @@ except ImportError:
     def log_error(exc_type, exc_value, exc_traceback, error_log="error.txt"):
         print(f"Ошибка (koshtorys log): {exc_value}")
         traceback.print_exception(exc_type, exc_value, exc_traceback)
+        import tkinter.messagebox as messagebox
         messagebox.showerror("Ошибка", f"Произошла ошибка (koshtorys): {str(exc_value)}")
 
 
@@ -46,26 +46,35 @@ except ImportError:
         return f"{amount} грн (заглушка)"
 
 
+from koshtorys_totals import calculate_products_totals, parse_decimal
+from koshtorys_xml import KoshtorysTemplateError, load_koshtorys_template, write_koshtorys_xlsx
+
+# Шаблон кошторису (відносно робочої папки програми)
+KOSHTORYS_TEMPLATE_PATH = "ШАБЛОН_кошторис_розумний.xlsx"
+
+# Ім'я файлу кошторису: {номер} - номер заходу, {дата} - дата заходу, {назва} - назва заходу
+KOSHTORYS_NAME_PATTERN = "кошторис_{номер}_{назва}_{дата}.xlsx"
+# Папка для кошторисів (відносно робочої папки програми)
+KOSHTORYS_OUTPUT_DIR = "."
+# Скільки кошторисів записується одночасно в пакетному режимі
+KOSHTORYS_BATCH_WORKERS = 4
+
+
 def get_entry_value(entries_dict, field_name, default=""):
     """Отримує значення з Entry віджета"""
     if field_name in entries_dict:
         widget = entries_dict[field_name]
         if hasattr(widget, 'get'):
             return widget.get().strip()
+        if isinstance(widget, str):
+            # Збережений стан (app_state.json) містить звичайні рядки
+            return widget.strip()
     return default
 
 
 def convert_to_number(value_str):
-    """Конвертує строку в число"""
-    if not value_str:
-        return 0.0
-
-    try:
-        # Замінюємо кому на крапку та видаляємо пробіли
-        clean_str = str(value_str).replace(",", ".").replace(" ", "")
-        return float(clean_str)
-    except ValueError:
-        return 0.0
+    """Конвертує строку в число (кома або крапка, пробіли ігноруються; некоректне значення - 0.0)"""
+    return float(parse_decimal(value_str))
 
 
 def get_товар_name_from_entries(entries):
@@ -155,303 +164,113 @@ def safe_set_cell_value(sheet, row, col, value):
         return False
 
 
-def copy_row_with_full_formatting(sheet, source_row_num, target_row_num):
-    """Копіює повне форматування рядка включаючи висоту, стилі всіх ячейок"""
-    try:
-        max_col = sheet.max_column if sheet.max_column > 0 else 26
-
-        # Копіюємо висоту рядка
-        if source_row_num in sheet.row_dimensions:
-            source_row_dim = sheet.row_dimensions[source_row_num]
-            target_row_dim = sheet.row_dimensions[target_row_num]
-            target_row_dim.height = source_row_dim.height
-            target_row_dim.hidden = source_row_dim.hidden
-            target_row_dim.outlineLevel = source_row_dim.outlineLevel
-            target_row_dim.collapsed = source_row_dim.collapsed
-
-        # Копіюємо всі ячейки з повним форматуванням
-        for col_num in range(1, max_col + 1):
-            source_cell = sheet.cell(source_row_num, col_num)
-            target_cell = sheet.cell(target_row_num, col_num)
-
-            # Перевіряємо чи цільова ячейка не є частиною об'єднання
-            # Якщо так, пропускаємо її (об'єднання будуть скопійовані окремо)
-            if is_merged_cell(sheet, target_row_num, col_num):
-                continue
-
-            # Копіюємо значення (якщо воно не формула і не пусте)
-            if source_cell.value is not None and not str(source_cell.value).startswith('='):
-                target_cell.value = source_cell.value
-
-            # Копіюємо повний стиль через _style (найнадійніший спосіб)
-            if hasattr(source_cell, '_style') and source_cell._style:
-                target_cell._style = copy(source_cell._style)
-
-            # Додатково копіюємо кожен стиль окремо для гарантії
-            try:
-                # Шрифт
-                if source_cell.font:
-                    target_cell.font = Font(
-                        name=source_cell.font.name,
-                        size=source_cell.font.size,
-                        bold=source_cell.font.bold,
-                        italic=source_cell.font.italic,
-                        vertAlign=source_cell.font.vertAlign,
-                        underline=source_cell.font.underline,
-                        strike=source_cell.font.strike,
-                        color=copy(source_cell.font.color) if source_cell.font.color else None
-                    )
-
-                # Заливка
-                if source_cell.fill and source_cell.fill.fill_type:
-                    target_cell.fill = PatternFill(
-                        fill_type=source_cell.fill.fill_type,
-                        start_color=copy(source_cell.fill.start_color) if source_cell.fill.start_color else None,
-                        end_color=copy(source_cell.fill.end_color) if source_cell.fill.end_color else None
-                    )
-
-                # Границі
-                if source_cell.border:
-                    target_cell.border = Border(
-                        left=copy(source_cell.border.left) if source_cell.border.left else None,
-                        right=copy(source_cell.border.right) if source_cell.border.right else None,
-                        top=copy(source_cell.border.top) if source_cell.border.top else None,
-                        bottom=copy(source_cell.border.bottom) if source_cell.border.bottom else None,
-                        diagonal=copy(source_cell.border.diagonal) if source_cell.border.diagonal else None,
-                        diagonal_direction=source_cell.border.diagonal_direction,
-                        outline=copy(source_cell.border.outline) if source_cell.border.outline else None,
-                        vertical=copy(source_cell.border.vertical) if source_cell.border.vertical else None,
-                        horizontal=copy(source_cell.border.horizontal) if source_cell.border.horizontal else None
-                    )
-
-                # Вирівнювання
-                if source_cell.alignment:
-                    target_cell.alignment = Alignment(
-                        horizontal=source_cell.alignment.horizontal,
-                        vertical=source_cell.alignment.vertical,
-                        text_rotation=source_cell.alignment.text_rotation,
-                        wrap_text=source_cell.alignment.wrap_text,
-                        shrink_to_fit=source_cell.alignment.shrink_to_fit,
-                        indent=source_cell.alignment.indent
-                    )
-
-                # Формат чисел
-                if source_cell.number_format:
-                    target_cell.number_format = source_cell.number_format
-
-                # Захист
-                if source_cell.protection:
-                    target_cell.protection = copy(source_cell.protection)
-
-            except Exception as style_error:
-                print(f"[WARNING] Помилка копіювання стилю ячейки {col_num}: {style_error}")
-
-        # Копіюємо об'єднані ячейки в рядку
-        merged_ranges_to_copy = []
-        for merged_range in sheet.merged_cells.ranges:
-            if merged_range.min_row == source_row_num and merged_range.max_row == source_row_num:
-                # Це об'єднання тільки в межах одного рядка
-                merged_ranges_to_copy.append(merged_range)
+ROW_DIMENSION_ATTRS = ("height", "hidden", "outlineLevel", "collapsed")
 
-        for merged_range in merged_ranges_to_copy:
-            try:
-                new_range = f"{get_column_letter(merged_range.min_col)}{target_row_num}:{get_column_letter(merged_range.max_col)}{target_row_num}"
-                sheet.merge_cells(new_range)
-                #print(f"[DEBUG] Скопійовано об'єднання в рядку: {new_range}")
 
-                # Копіюємо значення в об'єднану ячейку
-                source_merged_cell = sheet.cell(source_row_num, merged_range.min_col)
-                target_merged_cell = sheet.cell(target_row_num, merged_range.min_col)
-                if source_merged_cell.value is not None:
-                    target_merged_cell.value = source_merged_cell.value
+def capture_row_template(sheet, row_num):
+    """
+    Знімок рядка-шаблону для штампування (знімається один раз): значення ячейок
+    (без формул), індекси стилів (_style), висота рядка та об'єднання в межах рядка.
+    """
+    max_col = sheet.max_column if sheet.max_column > 0 else 26
 
-            except Exception as merge_error:
-                print(f"[WARNING] Помилка копіювання об'єднання: {merge_error}")
+    cells = []
+    for col_num in range(1, max_col + 1):
+        cell = sheet.cell(row_num, col_num)
+        value = cell.value
+        # Формули прив'язані до свого рядка - не копіюємо
+        if value is not None and str(value).startswith('='):
+            value = None
+        cells.append((col_num, value, cell._style))
 
-        #print(f"[DEBUG] Скопійовано повне форматування з рядка {source_row_num} в рядок {target_row_num}")
+    dimension = None
+    if row_num in sheet.row_dimensions:
+        source_row_dim = sheet.row_dimensions[row_num]
+        dimension = {attr: getattr(source_row_dim, attr) for attr in ROW_DIMENSION_ATTRS}
 
-    except Exception as e:
-        print(f"[ERROR] Помилка копіювання форматування рядка: {e}")
-        traceback.print_exc()
+    merges = [(merged_range.min_col, merged_range.max_col) for merged_range in sheet.merged_cells.ranges
+              if merged_range.min_row == row_num and merged_range.max_row == row_num]
+
+    return {"cells": cells, "dimension": dimension, "merges": merges}
+
+
+def stamp_row_template(sheet, row_template, target_row_num):
+    """
+    Штампує рядок-шаблон у рядок target_row_num. Стиль ячейки - це масив індексів
+    у спільних таблицях стилів книги, тому нові Font/Border/Fill не створюються.
+    """
+    for col_num, value, style in row_template["cells"]:
+        target_cell = sheet.cell(target_row_num, col_num)
+        target_cell._style = copy(style)
+        if value is not None:
+            target_cell.value = value
+
+    if row_template["dimension"] is not None:
+        target_row_dim = sheet.row_dimensions[target_row_num]
+        for attr, value in row_template["dimension"].items():
+            setattr(target_row_dim, attr, value)
+
+    for min_col, max_col in row_template["merges"]:
+        try:
+            sheet.merge_cells(start_row=target_row_num, start_column=min_col,
+                              end_row=target_row_num, end_column=max_col)
+        except Exception as merge_error:
+            print(f"[WARNING] Помилка копіювання об'єднання: {merge_error}")
+
+
+def shift_rows_down(sheet, first_row, offset):
+    """
+    Зсуває все, що починається з рядка first_row, на offset рядків вниз одним проходом:
+    ячейки (разом зі стилями), об'єднання і висоти рядків. Рядки first_row..first_row+offset-1
+    залишаються порожніми.
+    """
+    if offset <= 0:
+        return
+
+    # Ячейки: один зсув замість вставки по одному рядку
+    sheet.insert_rows(first_row, offset)
+
+    # Об'єднання openpyxl не зсуває - переносимо діапазони (MergedCell вже зсунуті разом з ячейками)
+    shifted_ranges = [merged_range for merged_range in sheet.merged_cells.ranges
+                      if merged_range.min_row >= first_row]
+    # (спочатку видаляємо всі, щоб зсунутий діапазон не збігся з ще не зсунутим)
+    for merged_range in shifted_ranges:
+        sheet.merged_cells.remove(merged_range)
+    for merged_range in shifted_ranges:
+        merged_range.shift(row_shift=offset)
+        sheet.merged_cells.add(merged_range)
+
+    # Висоти рядків теж не зсуваються автоматично
+    row_dimensions = sheet.row_dimensions
+    for row in sorted((row for row in list(row_dimensions) if row >= first_row), reverse=True):
+        row_dim = row_dimensions.pop(row)
+        row_dim.index = row + offset
+        row_dimensions[row + offset] = row_dim
 
 
 def insert_rows_for_products(sheet, товари_count):
-    """Вставляє рядки для товарів з повним збереженням форматування рядків 33-40"""
+    """
+    Готує рядки для товарів: підсумки та підписи (рядки 33 і нижче) зсуваються одним
+    зміщенням, а звільнені рядки штампуються з рядка товару 32.
+    """
     try:
         # Базовий рядок для товарів в шаблоні (рядок 32)
         base_product_row = 32
-        # Початок критичної області з підсумками та підписами
-        critical_start_row = 33
-        # Кінець критичної області (рядки 33-40)
-        critical_end_row = 40
+        # Початок області з підсумками та підписами
+        footer_start_row = base_product_row + 1
 
         if товари_count <= 1:
             # Якщо товар один або менше, нічого не змінюємо
-            #print(f"[DEBUG] Товарів {товари_count}, додаткові рядки не потрібні")
             return base_product_row
 
         # Кількість додаткових рядків, які потрібно вставити
         additional_rows = товари_count - 1
 
-        #print(f"[DEBUG] Потрібно вставити {additional_rows} додаткових рядків для {товари_count} товарів")
-        #print(f"[DEBUG] Базовий рядок товару: {base_product_row}")
-        #print(f"[DEBUG] Критична область: {critical_start_row}-{critical_end_row}")
-
-        max_col = sheet.max_column if sheet.max_column > 0 else 26
-
-        # КРОК 1: Повне збереження критичної області (33-40) з усіма стилями та об'єднаннями
-        #print(f"[DEBUG] Зберігаємо критичну область {critical_start_row}-{critical_end_row}")
-        saved_critical_area = {}
-
-        # Зберігаємо висоту рядків
-        saved_row_dimensions = {}
-        for row in range(critical_start_row, critical_end_row + 1):
-            if row in sheet.row_dimensions:
-                saved_row_dimensions[row] = {
-                    'height': sheet.row_dimensions[row].height,
-                    'hidden': sheet.row_dimensions[row].hidden,
-                    'outlineLevel': sheet.row_dimensions[row].outlineLevel,
-                    'collapsed': sheet.row_dimensions[row].collapsed,
-                }
-
-        # Зберігаємо об'єднані ячейки в критичній області
-        saved_merged_cells = []
-        for merged_range in list(sheet.merged_cells.ranges):
-            if (critical_start_row <= merged_range.min_row <= critical_end_row or
-                    critical_start_row <= merged_range.max_row <= critical_end_row):
-                saved_merged_cells.append({
-                    'range': str(merged_range),
-                    'min_row': merged_range.min_row,
-                    'max_row': merged_range.max_row,
-                    'min_col': merged_range.min_col,
-                    'max_col': merged_range.max_col
-                })
-                #print(f"[DEBUG] Збережено об'єднання: {merged_range}")
-
-        # Зберігаємо всі ячейки критичної області
-        for row in range(critical_start_row, critical_end_row + 1):
-            saved_critical_area[row] = {}
-            for col in range(1, max_col + 1):
-                cell = sheet.cell(row, col)
-
-                # Зберігаємо повну інформацію про ячейку
-                saved_critical_area[row][col] = {
-                    'value': cell.value,
-                    'style': copy(cell._style) if hasattr(cell, '_style') else None,
-                    'font': copy(cell.font) if cell.font else None,
-                    'fill': copy(cell.fill) if cell.fill else None,
-                    'border': copy(cell.border) if cell.border else None,
-                    'alignment': copy(cell.alignment) if cell.alignment else None,
-                    'number_format': cell.number_format,
-                    'protection': copy(cell.protection) if cell.protection else None,
-                    'hyperlink': cell.hyperlink,
-                    'comment': cell.comment
-                }
-
-        #print(f"[DEBUG] Збережено {len(saved_critical_area)} рядків з повним форматуванням")
-
-        # КРОК 2: Видаляємо об'єднання в критичній області перед вставкою
-        merged_to_remove = []
-        for merged_range in list(sheet.merged_cells.ranges):
-            if (critical_start_row <= merged_range.min_row <= critical_end_row or
-                    critical_start_row <= merged_range.max_row <= critical_end_row):
-                merged_to_remove.append(merged_range)
-
-        for merged_range in merged_to_remove:
-            sheet.unmerge_cells(str(merged_range))
-            #print(f"[DEBUG] Тимчасово видалено об'єднання: {merged_range}")
-
-        # КРОК 3: Вставляємо додаткові рядки ПІСЛЯ базового рядка товару (32)
-        # Це автоматично зсуне всі рядки нижче (включаючи 33-40)
-        for i in range(additional_rows):
-            insert_position = base_product_row + 1 + i
-            sheet.insert_rows(insert_position, 1)
-            #print(f"[DEBUG] Вставлено рядок товару на позиції {insert_position}")
-
-            # Копіюємо форматування з базового рядка товару
-            copy_row_with_full_formatting(sheet, base_product_row, insert_position)
-
-        # КРОК 4: Розраховуємо нові позиції для критичної області
-        new_critical_start = critical_start_row + additional_rows
-        new_critical_end = critical_end_row + additional_rows
-
-        #print(f"[DEBUG] Нові позиції критичної області: {new_critical_start}-{new_critical_end}")
-
-        # КРОК 5: Відновлюємо критичну область на нових позиціях
-        for original_row in range(critical_start_row, critical_end_row + 1):
-            new_row = original_row + additional_rows
-
-            # Відновлюємо висоту рядка
-            if original_row in saved_row_dimensions:
-                sheet.row_dimensions[new_row].height = saved_row_dimensions[original_row]['height']
-                sheet.row_dimensions[new_row].hidden = saved_row_dimensions[original_row]['hidden']
-                sheet.row_dimensions[new_row].outlineLevel = saved_row_dimensions[original_row]['outlineLevel']
-                sheet.row_dimensions[new_row].collapsed = saved_row_dimensions[original_row]['collapsed']
-
-            # Відновлюємо всі ячейки в рядку
-            for col in range(1, max_col + 1):
-                if original_row in saved_critical_area and col in saved_critical_area[original_row]:
-                    cell_data = saved_critical_area[original_row][col]
-                    target_cell = sheet.cell(new_row, col)
-
-                    # Відновлюємо значення
-                    target_cell.value = cell_data['value']
-
-                    # Відновлюємо стилі
-                    if cell_data['style']:
-                        target_cell._style = cell_data['style']
-
-                    if cell_data['font']:
-                        target_cell.font = cell_data['font']
-                    if cell_data['fill']:
-                        target_cell.fill = cell_data['fill']
-                    if cell_data['border']:
-                        target_cell.border = cell_data['border']
-                    if cell_data['alignment']:
-                        target_cell.alignment = cell_data['alignment']
-                    if cell_data['number_format']:
-                        target_cell.number_format = cell_data['number_format']
-                    if cell_data['protection']:
-                        target_cell.protection = cell_data['protection']
-                    if cell_data['hyperlink']:
-                        target_cell.hyperlink = cell_data['hyperlink']
-                    if cell_data['comment']:
-                        target_cell.comment = cell_data['comment']
-
-        #print(f"[DEBUG] Відновлено всі ячейки критичної області")
-
-        # КРОК 6: Відновлюємо об'єднані ячейки на нових позиціях
-        for merged_info in saved_merged_cells:
-            try:
-                # Розраховуємо нові координати об'єднання
-                new_min_row = merged_info['min_row'] + additional_rows
-                new_max_row = merged_info['max_row'] + additional_rows
-                new_min_col = merged_info['min_col']
-                new_max_col = merged_info['max_col']
-
-                # Створюємо нове об'єднання
-                new_range = f"{get_column_letter(new_min_col)}{new_min_row}:{get_column_letter(new_max_col)}{new_max_row}"
-                sheet.merge_cells(new_range)
-                #print(f"[DEBUG] Відновлено об'єднання: {merged_info['range']} -> {new_range}")
-
-            except Exception as merge_error:
-                print(f"[WARNING] Помилка відновлення об'єднання {merged_info['range']}: {merge_error}")
-
-        # КРОК 7: Очищаємо старі рядки критичної області (якщо вони ще залишились)
-        # Це може статися якщо була накладка в позиціях
-        for row in range(critical_start_row, critical_start_row + additional_rows):
-            for col in range(1, max_col + 1):
-                try:
-                    cell = sheet.cell(row, col)
-                    # Очищуємо тільки якщо ячейка не є частиною нового товару
-                    if row > base_product_row + товари_count:
-                        cell.value = None
-                except:
-                    pass
+        row_template = capture_row_template(sheet, base_product_row)
+        shift_rows_down(sheet, footer_start_row, additional_rows)
 
-        #print(f"[DEBUG] Успішно вставлено {additional_rows} рядків товарів")
-        # print(
-        #     f"[DEBUG] Критична область {critical_start_row}-{critical_end_row} збережена і переміщена на {new_critical_start}-{new_critical_end}")
+        for target_row in range(footer_start_row, footer_start_row + additional_rows):
+            stamp_row_template(sheet, row_template, target_row)
 
         return base_product_row
 
@@ -467,7 +286,6 @@ def safe_write_to_cell(sheet, cell_reference, value):
         #print(f"[DEBUG] Спроба запису '{value}' в ячейку {cell_reference}")
 
         # Розбираємо референс ячейки (наприклад, "K39" -> row=39, col=11)
-        from openpyxl.utils.cell import coordinate_from_string, column_index_from_string
         col_letter, row = coordinate_from_string(cell_reference)
         col_num = column_index_from_string(col_letter)
 
@@ -509,13 +327,12 @@ def safe_write_to_cell(sheet, cell_reference, value):
 
     except Exception as e:
         print(f"[ERROR] Помилка запису в ячейку {cell_reference}: {e}")
-        import traceback
         traceback.print_exc()
         return False
 
 
-def save_koshtorys_to_excel(захід, адреса, дата, товари, загальна_сума, сума_прописом):
-    """Зберігає кошторис у Excel файл на основі шаблону з правильним заповненням"""
+def build_koshtorys_workbook(захід, адреса, дата, товари, загальна_сума, template_path=KOSHTORYS_TEMPLATE_PATH):
+    """Заповнює кошторис на основі шаблону в пам'яті і повертає workbook (без запису на диск)"""
 
     def debug_template_structure(sheet):
         """Диагностика структуры шаблона"""
@@ -624,7 +441,6 @@ def save_koshtorys_to_excel(захід, адреса, дата, товари, з
             target_cells = ['D12', 'E14', 'E15']
             for cell_ref in target_cells:
                 try:
-                    from openpyxl.utils.cell import coordinate_from_string, column_index_from_string
                     col_letter, row = coordinate_from_string(cell_ref)
                     col_num = column_index_from_string(col_letter)
 
@@ -645,183 +461,311 @@ def save_koshtorys_to_excel(захід, адреса, дата, товари, з
 
         except Exception as e:
             print(f"[ERROR] Критична помилка при заповненні основних даних: {e}")
-            import traceback
             traceback.print_exc()
             return False
 
-    try:
-        template_path = "ШАБЛОН_кошторис_розумний.xlsx"
-        output_path = f"кошторис_заповнений.xlsx"
+    # Відкриваємо шаблон (файл шаблону не змінюється)
+    workbook = load_workbook(template_path)
+    sheet = workbook.active
 
-        # Перевіряємо чи існує шаблон
-        if not os.path.exists(template_path):
-            print(f"[WARNING] Шаблон {template_path} не знайдено. Створюємо простий файл.")
-            return save_koshtorys_to_text(захід, адреса, дата, товари, загальна_сума, сума_прописом)
+    # Вызовите эту функцию после открытия шаблона:
+    debug_template_structure(sheet)
 
-        # Копіюємо шаблон
-        shutil.copy2(template_path, output_path)
+    # Заповнюємо основні дані відповідно до вказаних ячейок
+    improved_fill_main_data(sheet, захід, адреса, дата)
 
-        if EXCEL_AVAILABLE:
-            # Відкриваємо скопійований файл
-            workbook = load_workbook(output_path)
-            sheet = workbook.active
-
-            # Вызовите эту функцию после открытия шаблона:
-            debug_template_structure(sheet)
-
-            # Заповнюємо основні дані відповідно до вказаних ячейок
-            improved_fill_main_data(sheet, захід, адреса, дата)
-
-            # Робимо жирний шрифт у злитій клітинці C13:E13
-            bold_font = Font(bold=True)
-            for col in ['C', 'D', 'E']:
-                cell = sheet[f'{col}13']
-                # Зберігаємо всі інші властивості шрифту, але робимо жирним
-                cell.font = Font(
-                    name=cell.font.name,
-                    size=cell.font.size,
-                    bold=True,  # Примусово жирний
-                    italic=cell.font.italic,
-                    color=cell.font.color
-                )
-
-            print(f"[DEBUG] Зроблено жирний шрифт в ячейках C13:E13")
-
-            # Вставляємо додаткові рядки для товарів (це автоматично зсуне весь контент)
-            товари_count = len(товари)
-            print(f"[DEBUG] Кількість товарів: {товари_count}")
+    # Робимо жирний шрифт у злитій клітинці C13:E13
+    bold_font = Font(bold=True)
+    for col in ['C', 'D', 'E']:
+        cell = sheet[f'{col}13']
+        # Зберігаємо всі інші властивості шрифту, але робимо жирним
+        cell.font = Font(
+            name=cell.font.name,
+            size=cell.font.size,
+            bold=True,  # Примусово жирний
+            italic=cell.font.italic,
+            color=cell.font.color
+        )
 
-            start_row = insert_rows_for_products(sheet, товари_count)
+    print(f"[DEBUG] Зроблено жирний шрифт в ячейках C13:E13")
 
-            # Заповнюємо товари
-            base_b_number = 6  # Базове значення для стовпця B
-            g_column_value = 2210  # Значення для стовпця G
+    # Вставляємо додаткові рядки для товарів (це автоматично зсуне весь контент)
+    товари_count = len(товари)
+    print(f"[DEBUG] Кількість товарів: {товари_count}")
 
-            for i, товар_data in enumerate(товари):
-                current_row = start_row + i
+    start_row = insert_rows_for_products(sheet, товари_count)
 
-                кількість_num = convert_to_number(товар_data["кількість"])
-                ціна_num = convert_to_number(товар_data["ціна за одиницю"])
+    # Заповнюємо товари
+    base_b_number = 6  # Базове значення для стовпця B
+    g_column_value = 2210  # Значення для стовпця G
 
-                # НОВОЕ: Рассчитываем сумму по товару
-                сума_товару = кількість_num * ціна_num
+    # Суми всіх товарів - одним розрахунком у Decimal
+    line_sums = calculate_products_totals(товари)["line_sums"]
 
-                # B - нумерація (6, 7, 8...)
-                safe_set_cell_value(sheet, current_row, 2, base_b_number + i)  # B колонка = 2
-                print(f"[DEBUG] B{current_row} = {base_b_number + i}")
+    for i, товар_data in enumerate(товари):
+        current_row = start_row + i
 
-                # C - назви товарів
-                safe_set_cell_value(sheet, current_row, 3, товар_data["товар"])  # C колонка = 3
+        кількість_num = float(parse_decimal(товар_data["кількість"]))
+        ціна_num = float(parse_decimal(товар_data["ціна за одиницю"]))
 
-                # G - значення 2210 (жирним шрифтом)
-                if safe_set_cell_value(sheet, current_row, 7, g_column_value):  # G колонка = 7
-                    try:
-                        g_cell = sheet.cell(current_row, 7)
-                        if not is_merged_cell(sheet, current_row, 7):
-                            if g_cell.font:
-                                g_cell.font = Font(
-                                    name=g_cell.font.name,
-                                    size=g_cell.font.size,
-                                    bold=True,
-                                    italic=g_cell.font.italic,
-                                    color=g_cell.font.color
-                                )
-                            else:
-                                g_cell.font = Font(bold=True)
-                    except:
-                        pass
-                print(f"[DEBUG] G{current_row} = {g_column_value} (жирним)")
+        # Сума по товару (кількість × ціна, округлена до копійок)
+        сума_товару = float(line_sums[i])
 
-                # H - кількість
-                safe_set_cell_value(sheet, current_row, 8, кількість_num)  # H колонка = 8
+        # B - нумерація (6, 7, 8...)
+        safe_set_cell_value(sheet, current_row, 2, base_b_number + i)  # B колонка = 2
+        print(f"[DEBUG] B{current_row} = {base_b_number + i}")
 
-                # J - ціна за одиницю
-                safe_set_cell_value(sheet, current_row, 10, ціна_num)  # J колонка = 10
+        # C - назви товарів
+        safe_set_cell_value(sheet, current_row, 3, товар_data["товар"])  # C колонка = 3
 
-                # K - НОВОЕ: сума по товару (кількість × ціна)
-                if safe_set_cell_value(sheet, current_row, 11, сума_товару):  # K колонка = 11
-                    print(f"[DEBUG] K{current_row} = {сума_товару:.2f} (сума товару)")
-                else:
-                    print(f"[WARNING] Не вдалося записати суму товару в K{current_row}")
+        # G - значення 2210 (жирним шрифтом)
+        if safe_set_cell_value(sheet, current_row, 7, g_column_value):  # G колонка = 7
+            try:
+                g_cell = sheet.cell(current_row, 7)
+                if not is_merged_cell(sheet, current_row, 7):
+                    if g_cell.font:
+                        g_cell.font = Font(
+                            name=g_cell.font.name,
+                            size=g_cell.font.size,
+                            bold=True,
+                            italic=g_cell.font.italic,
+                            color=g_cell.font.color
+                        )
+                    else:
+                        g_cell.font = Font(bold=True)
+            except:
+                pass
+        print(f"[DEBUG] G{current_row} = {g_column_value} (жирним)")
+
+        # H - кількість
+        safe_set_cell_value(sheet, current_row, 8, кількість_num)  # H колонка = 8
+
+        # J - ціна за одиницю
+        safe_set_cell_value(sheet, current_row, 10, ціна_num)  # J колонка = 10
+
+        # K - НОВОЕ: сума по товару (кількість × ціна)
+        if safe_set_cell_value(sheet, current_row, 11, сума_товару):  # K колонка = 11
+            print(f"[DEBUG] K{current_row} = {сума_товару:.2f} (сума товару)")
+        else:
+            print(f"[WARNING] Не вдалося записати суму товару в K{current_row}")
 
-                # L - НОВОЕ: дублируем сумму товара в столбец L
-                if safe_set_cell_value(sheet, current_row, 12, сума_товару):  # L колонка = 12
-                    print(f"[DEBUG] L{current_row} = {сума_товару:.2f} (дубль суми товару)")
-                else:
-                    print(f"[WARNING] Не вдалося записати суму товару в L{current_row}")
+        # L - НОВОЕ: дублируем сумму товара в столбец L
+        if safe_set_cell_value(sheet, current_row, 12, сума_товару):  # L колонка = 12
+            print(f"[DEBUG] L{current_row} = {сума_товару:.2f} (дубль суми товару)")
+        else:
+            print(f"[WARNING] Не вдалося записати суму товару в L{current_row}")
 
-                print(f"[DEBUG] Рядок {current_row}: товар='{товар_data['товар']}' (C{current_row}), "
-                      f"кількість={кількість_num} (H{current_row}), ціна={ціна_num} (J{current_row}), "
-                      f"сума={сума_товару:.2f} (K{current_row}, L{current_row})")
+        print(f"[DEBUG] Рядок {current_row}: товар='{товар_data['товар']}' (C{current_row}), "
+              f"кількість={кількість_num} (H{current_row}), ціна={ціна_num} (J{current_row}), "
+              f"сума={сума_товару:.2f} (K{current_row}, L{current_row})")
 
-            # ИСПРАВЛЕНО: Ищем строку с "у т. ч. за КЕКВ:" и "2210"
-            total_sum_row = None
+    # ИСПРАВЛЕНО: Ищем строку с "у т. ч. за КЕКВ:" и "2210"
+    total_sum_row = None
 
-            # Ищем строку где в столбцах C-F есть "у т. ч. за КЕКВ:" а в G есть "2210"
-            for row in range(start_row + товари_count, start_row + товари_count + 20):
-                try:
-                    # Проверяем объединенные ячейки C-F на наличие "у т. ч. за КЕКВ:"
-                    kekv_found = False
-                    for col in ['C', 'D', 'E', 'F']:
-                        cell_value = sheet[f'{col}{row}'].value
-                        if cell_value and "у т. ч. за КЕКВ:" in str(cell_value):
-                            kekv_found = True
-                            break
+    # Ищем строку где в столбцах C-F есть "у т. ч. за КЕКВ:" а в G есть "2210"
+    for row in range(start_row + товари_count, start_row + товари_count + 20):
+        try:
+            # Проверяем объединенные ячейки C-F на наличие "у т. ч. за КЕКВ:"
+            kekv_found = False
+            for col in ['C', 'D', 'E', 'F']:
+                cell_value = sheet[f'{col}{row}'].value
+                if cell_value and "у т. ч. за КЕКВ:" in str(cell_value):
+                    kekv_found = True
+                    break
+
+            # Проверяем столбец G на наличие "2210"
+            g_cell_value = sheet[f'G{row}'].value
+            if kekv_found and g_cell_value and "2210" in str(g_cell_value):
+                total_sum_row = row
+                print(f"[DEBUG] Найдена строка с КЕКВ:2210 в строке {row}")
+                break
 
-                    # Проверяем столбец G на наличие "2210"
-                    g_cell_value = sheet[f'G{row}'].value
-                    if kekv_found and g_cell_value and "2210" in str(g_cell_value):
-                        total_sum_row = row
-                        print(f"[DEBUG] Найдена строка с КЕКВ:2210 в строке {row}")
-                        break
+        except Exception as e:
+            print(f"[DEBUG] Ошибка при поиске КЕКВ в строке {row}: {e}")
+            continue
 
-                except Exception as e:
-                    print(f"[DEBUG] Ошибка при поиске КЕКВ в строке {row}: {e}")
-                    continue
-
-            # Если нашли строку с КЕКВ:2210, записываем туда общую сумму
-            if total_sum_row:
-                if safe_set_cell_value(sheet, total_sum_row, 11, загальна_сума):  # K колонка = 11
-                    print(f"[DEBUG] Загальна сума {загальна_сума:.2f} записана в K{total_sum_row} (строка с КЕКВ:2210)")
-                else:
-                    print(f"[WARNING] Не вдалося записати суму в K{total_sum_row}")
-
-                # НОВОЕ: Дублируем общую сумму в столбец L
-                if safe_set_cell_value(sheet, total_sum_row, 12, загальна_сума):  # L колонка = 12
-                    print(f"[DEBUG] Загальна сума {загальна_сума:.2f} продубльована в L{total_sum_row}")
-                else:
-                    print(f"[WARNING] Не вдалося записати суму в L{total_sum_row}")
-            else:
-                print(f"[WARNING] Не знайдено строку з 'у т. ч. за КЕКВ:' та '2210'")
+    # Если нашли строку с КЕКВ:2210, записываем туда общую сумму
+    if total_sum_row:
+        if safe_set_cell_value(sheet, total_sum_row, 11, float(загальна_сума)):  # K колонка = 11
+            print(f"[DEBUG] Загальна сума {загальна_сума:.2f} записана в K{total_sum_row} (строка с КЕКВ:2210)")
+        else:
+            print(f"[WARNING] Не вдалося записати суму в K{total_sum_row}")
+
+        # НОВОЕ: Дублируем общую сумму в столбец L
+        if safe_set_cell_value(sheet, total_sum_row, 12, float(загальна_сума)):  # L колонка = 12
+            print(f"[DEBUG] Загальна сума {загальна_сума:.2f} продубльована в L{total_sum_row}")
+        else:
+            print(f"[WARNING] Не вдалося записати суму в L{total_sum_row}")
+    else:
+        print(f"[WARNING] Не знайдено строку з 'у т. ч. за КЕКВ:' та '2210'")
 
-            # НОВОЕ: Продолжаем нумерацию в столбце B для перенесенных строк (33-36)
-            # Нумерация продолжается после товаров
-            next_b_number = base_b_number + товари_count
+    # НОВОЕ: Продолжаем нумерацию в столбце B для перенесенных строк (33-36)
+    # Нумерация продолжается после товаров
+    next_b_number = base_b_number + товари_count
 
-            # Заполняем нумерацию для строк которые были перенесены вниз (примерно 33-36)
-            for offset in range(4):  # 4 строки (33, 34, 35, 36)
-                current_row = start_row + товари_count + offset
-                try:
-                    # Проверяем есть ли контент в этой строке (не пустая ли)
-                    has_content = False
-                    for col in ['C', 'D', 'E', 'F', 'G', 'H', 'J']:
-                        if sheet[f'{col}{current_row}'].value:
-                            has_content = True
-                            break
+    # Заполняем нумерацию для строк которые были перенесены вниз (примерно 33-36)
+    for offset in range(4):  # 4 строки (33, 34, 35, 36)
+        current_row = start_row + товари_count + offset
+        try:
+            # Проверяем есть ли контент в этой строке (не пустая ли)
+            has_content = False
+            for col in ['C', 'D', 'E', 'F', 'G', 'H', 'J']:
+                if sheet[f'{col}{current_row}'].value:
+                    has_content = True
+                    break
+
+            if has_content:
+                if safe_set_cell_value(sheet, current_row, 2, next_b_number):  # B колонка = 2
+                    print(f"[DEBUG] B{current_row} = {next_b_number} (продолжение нумерации)")
+                    next_b_number += 1
 
-                    if has_content:
-                        if safe_set_cell_value(sheet, current_row, 2, next_b_number):  # B колонка = 2
-                            print(f"[DEBUG] B{current_row} = {next_b_number} (продолжение нумерации)")
-                            next_b_number += 1
+        except Exception as e:
+            print(f"[DEBUG] Ошибка при нумерации строки {current_row}: {e}")
+            continue
 
-                except Exception as e:
-                    print(f"[DEBUG] Ошибка при нумерации строки {current_row}: {e}")
-                    continue
+    return workbook
+
+
+def write_koshtorys_file(output, захід, адреса, дата, товари, загальна_сума,
+                         template_path=KOSHTORYS_TEMPLATE_PATH):
+    """
+    Записує заповнений кошторис у output (шлях або файловий об'єкт).
+    template_path - шлях до шаблону або розібраний шаблон (load_koshtorys_template).
+    Основний шлях - пряме редагування XML шаблону (koshtorys_xml); якщо розмітка
+    шаблону не підтримується, кошторис будується через openpyxl.
+    """
+    try:
+        write_koshtorys_xlsx(output, захід, адреса, дата, товари, загальна_сума, template_path)
+        return
+    except KoshtorysTemplateError as e:
+        print(f"[WARNING] Шаблон кошторису не підтримується прямим записом ({e}), використовується openpyxl")
+
+    template_path = getattr(template_path, "path", template_path)
+    workbook = build_koshtorys_workbook(захід, адреса, дата, товари, загальна_сума, template_path)
+    workbook.save(output)
+    workbook.close()
+
+
+def format_koshtorys_filename(name_pattern=KOSHTORYS_NAME_PATTERN, номер="", дата="", назва=""):
+    """
+    Ім'я файлу кошторису за шаблоном ("кошторис_{номер}_{назва}_{дата}.xlsx").
+    Символи, недопустимі в імені файлу, прибираються; порожні поля не залишають "__".
+    """
+    def clean(value):
+        text = "".join(c if c.isalnum() or c in ".-_" else "_" for c in str(value or "").strip())
+        return text.strip("._")
+
+    name = name_pattern.format(номер=clean(номер), дата=clean(дата), назва=clean(назва))
+    stem, extension = os.path.splitext(name)
+    while "__" in stem:
+        stem = stem.replace("__", "_")
+    return f"{stem.strip('_') or 'кошторис'}{extension or '.xlsx'}"
+
+
+def get_koshtorys_events(document_blocks):
+    """
+    Групує блоки договорів за заходами (вкладками) у порядку появи.
+    Повертає [{"назва": назва вкладки, "номер": номер заходу, "blocks": [...]}].
+    """
+    events = {}
+    for block in document_blocks:
+        tab_name = (block.get("tab_name") or "").strip()
+        event = events.setdefault(tab_name, {"назва": tab_name, "номер": block.get("event_number") or "",
+                                             "blocks": []})
+        event["blocks"].append(block)
+    return list(events.values())
+
+
+def save_koshtorys_batch(events, output_dir=KOSHTORYS_OUTPUT_DIR, name_pattern=KOSHTORYS_NAME_PATTERN,
+                         max_workers=None, template_path=KOSHTORYS_TEMPLATE_PATH):
+    """
+    Створює кошторис для кожного заходу одним викликом.
+
+    Шаблон розбирається один раз і спільно використовується потоками запису.
+    Заходи без товарів пропускаються; однакові імена файлів отримують суфікс _1, _2...
+
+    Args:
+        events: [{"назва", "номер", "blocks"}] (get_koshtorys_events)
+        output_dir: папка для кошторисів (створюється за потреби)
+        name_pattern: шаблон імені файлу (format_koshtorys_filename)
+        max_workers: кількість потоків запису (None - KOSHTORYS_BATCH_WORKERS)
+
+    Returns:
+        {"files": [шляхи], "skipped": [заходи без товарів], "failed": ["захід: помилка", ...]}
+    """
+    report = {"files": [], "skipped": [], "failed": []}
+    os.makedirs(output_dir, exist_ok=True)
+
+    try:
+        template = load_koshtorys_template(template_path)
+    except KoshtorysTemplateError as e:
+        # write_koshtorys_file для кожного заходу перейде на openpyxl
+        print(f"[WARNING] Шаблон кошторису не підтримується прямим записом ({e})")
+        template = template_path
+
+    jobs = []
+    used_names = set()
+    for event in events:
+        title = event.get("назва") or str(event.get("номер") or "")
+        data = get_koshtorys_data(event["blocks"])
+        if data is None:
+            print(f"[WARNING] Захід '{title}': немає товарів для кошторису")
+            report["skipped"].append(title)
+            continue
+
+        file_name = format_koshtorys_filename(name_pattern, event.get("номер", ""), data["дата"],
+                                              data["захід"] or event.get("назва"))
+        stem, extension = os.path.splitext(file_name)
+        counter = 1
+        while file_name.lower() in used_names:
+            file_name = f"{stem}_{counter}{extension}"
+            counter += 1
+        used_names.add(file_name.lower())
+        jobs.append((title, os.path.join(output_dir, file_name), data))
+
+    with ThreadPoolExecutor(max_workers=max_workers or KOSHTORYS_BATCH_WORKERS) as executor:
+        futures = {
+            executor.submit(write_koshtorys_file, output_path, data["захід"], data["адреса"], data["дата"],
+                            data["товари"], data["загальна_сума"], template): (title, output_path)
+            for title, output_path, data in jobs
+        }
+        for future in as_completed(futures):
+            title, output_path = futures[future]
+            try:
+                future.result()
+                print(f"[SUCCESS] Кошторис заходу '{title}' збережено у файл: {output_path}")
+                report["files"].append(output_path)
+            except Exception as e:
+                print(f"[ERROR] Кошторис заходу '{title}' не створено: {e}")
+                traceback.print_exc()
+                report["failed"].append(f"{title}: {e}")
+
+    # Порядок файлів як у заходів, незалежно від порядку завершення потоків
+    order = {output_path: index for index, (_, output_path, _) in enumerate(jobs)}
+    report["files"].sort(key=order.get)
+    return report
+
+
+def save_koshtorys_to_excel(захід, адреса, дата, товари, загальна_сума, сума_прописом, номер="",
+                            output_dir=KOSHTORYS_OUTPUT_DIR, name_pattern=KOSHTORYS_NAME_PATTERN):
+    """Зберігає кошторис у Excel файл на основі шаблону з правильним заповненням"""
+    # Діалоги потрібні тільки в GUI; модуль імпортується і без tkinter (CLI)
+    import tkinter.messagebox as messagebox
+
+    try:
+        template_path = KOSHTORYS_TEMPLATE_PATH
+        os.makedirs(output_dir, exist_ok=True)
+        output_path = os.path.join(output_dir, format_koshtorys_filename(name_pattern, номер, дата, захід))
 
-            # Зберігаємо файл
-            workbook.save(output_path)
-            workbook.close()
+        # Перевіряємо чи існує шаблон
+        if not os.path.exists(template_path):
+            print(f"[WARNING] Шаблон {template_path} не знайдено. Створюємо простий файл.")
+            return save_koshtorys_to_text(захід, адреса, дата, товари, загальна_сума, сума_прописом)
+
+        if EXCEL_AVAILABLE:
+            write_koshtorys_file(output_path, захід, адреса, дата, товари, загальна_сума, template_path)
 
+            товари_count = len(товари)
             print(f"[SUCCESS] Кошторис збережено у файл: {output_path}")
             messagebox.showinfo("Успіх", f"Кошторис успішно збережено у файл:\n{output_path}\n\n"
                                          f"Додано {товари_count} товарів з правильним форматуванням!\n"
@@ -848,26 +792,73 @@ def save_koshtorys_to_text(захід, адреса, дата, товари, з
     return None
 
 
+def get_koshtorys_data(document_blocks):
+    """
+    Збирає дані кошторису з блоків заходу (без діалогів).
+    Повертає словник захід/адреса/дата/товари/загальна_сума/сума_прописом або None, якщо товарів немає.
+    """
+    if not document_blocks:
+        return None
+
+    # Отримуємо дані з першого блоку для загальних полів
+    first_entries = document_blocks[0].get("entries", {})
+    захід = get_entry_value(first_entries, "захід")
+    адреса = get_entry_value(first_entries, "адреса")
+    дата = get_entry_value(first_entries, "дата")
+
+    # Отримуємо список товарів
+    товари = get_товари_from_blocks(document_blocks)
+    if not товари:
+        return None
+
+    print(f"[DEBUG] Знайдено товарів: {len(товари)}")
+    print(f"[DEBUG] Захід: {захід}")
+    print(f"[DEBUG] Адреса: {адреса}")
+    print(f"[DEBUG] Дата: {дата}")
+
+    # Рахуємо суми всіх товарів одним викликом (Decimal, до копійок)
+    totals = calculate_products_totals(товари)
+    for i, (товар_data, сума_товару) in enumerate(zip(товари, totals["line_sums"])):
+        print(f"[DEBUG] Товар {i + 1}: {товар_data['товар']}, "
+              f"кількість: {товар_data['кількість']} {товар_data['одиниця виміру']}, "
+              f"ціна: {товар_data['ціна за одиницю']}, разом: {сума_товару}")
+
+    print(f"[DEBUG] Загальна сума: {totals['total_text']}")
+
+    return {
+        "захід": захід,
+        "адреса": адреса,
+        "дата": дата,
+        "товари": товари,
+        "загальна_сума": totals["total"],
+        "сума_прописом": totals["words"],
+    }
+
+
 def fill_koshtorys(document_blocks):
     """Основна функція заповнення кошторису"""
+    import tkinter.messagebox as messagebox
+
     try:
         if not document_blocks:
             messagebox.showwarning("Увага", "Не знайдено даних для заповнення кошторису.")
             return False
 
-        # Отримуємо дані з першого блоку для загальних полів
-        first_block = document_blocks[0]
-        first_entries = first_block.get("entries", {})
-
-        # Отримуємо основні поля
-        захід = get_entry_value(first_entries, "захід")
-        адреса = get_entry_value(first_entries, "адреса")
-        дата = get_entry_value(first_entries, "дата")
-
-        # Отримуємо список товарів
-        товари = get_товари_from_blocks(document_blocks)
+        events = get_koshtorys_events(document_blocks)
+        if len(events) > 1:
+            # Кілька заходів - окремий кошторис для кожного
+            report = save_koshtorys_batch(events)
+            message = f"Створено кошторисів: {len(report['files'])}\n" + "\n".join(report["files"])
+            if report["skipped"]:
+                message += "\n\nБез товарів: " + ", ".join(report["skipped"])
+            if report["failed"]:
+                messagebox.showwarning("Увага", message + "\n\nПомилки:\n" + "\n".join(report["failed"]))
+            else:
+                messagebox.showinfo("Успіх", message)
+            return bool(report["files"])
 
-        if not товари:
+        data = get_koshtorys_data(document_blocks)
+        if data is None:
             messagebox.showwarning("Увага", "Не знайдено товарів для заповнення кошторису.\n"
                                             "Переконайтесь, що у блоках договорів заповнені поля:\n"
                                             "- товар/назва/найменування/предмет\n"
@@ -875,46 +866,9 @@ def fill_koshtorys(document_blocks):
                                             "- ціна за одиницю")
             return False
 
-        print(f"[DEBUG] Знайдено товарів: {len(товари)}")
-        print(f"[DEBUG] Захід: {захід}")
-        print(f"[DEBUG] Адреса: {адреса}")
-        print(f"[DEBUG] Дата: {дата}")
-
-        # Виводимо інформацію про товари та рахуємо загальну суму
-        загальна_сума = 0.0
-        товари_info = []
-
-        for i, товар_data in enumerate(товари):
-            кількість_num = convert_to_number(товар_data["кількість"])
-            ціна_num = convert_to_number(товар_data["ціна за одиницю"])
-            сума_товару = кількість_num * ціна_num
-            загальна_сума += сума_товару
-
-            товар_info = (f"{i + 1}. {товар_data['товар']} - "
-                          f"{кількість_num} {товар_data['одиниця виміру']} × "
-                          f"{ціна_num:.2f} грн = {сума_товару:.2f} грн")
-            товари_info.append(товар_info)
-
-            print(f"[DEBUG] Товар {i + 1}: {товар_data['товар']}, "
-                  f"кількість: {кількість_num} {товар_data['одиниця виміру']}, "
-                  f"ціна: {ціна_num:.2f}, разом: {сума_товару:.2f}")
-
-        print(f"[DEBUG] Загальна сума: {загальна_сума:.2f}")
-
-        # Формуємо детальне повідомлення
-        товари_список = "\n".join(товари_info)
-        сума_прописом = number_to_ukrainian_text(загальна_сума).capitalize()
-
-        detail_message = (f"ДАНІ ДЛЯ КОШТОРИСУ:\n\n"
-                          f"Захід: {захід}\n"
-                          f"Місце проведення: {адреса}\n"
-                          f"Дата: {дата}\n\n"
-                          f"ТОВАРИ ТА ПОСЛУГИ:\n{товари_список}\n\n"
-                          f"ЗАГАЛЬНА СУМА: {загальна_сума:.2f} грн\n"
-                          f"Сума прописом: {сума_прописом}")
-
         # Зберігаємо кошторис у файл з правильним форматуванням
-        saved_file = save_koshtorys_to_excel(захід, адреса, дата, товари, загальна_сума, сума_прописом)
+        saved_file = save_koshtorys_to_excel(data["захід"], data["адреса"], data["дата"], data["товари"],
+                                             data["загальна_сума"], data["сума_прописом"], events[0]["номер"])
 
         return saved_file is not None
 
@@ -0,0 +1,98 @@
+# koshtorys_totals.py
+# -*- coding: utf-8 -*-
+"""
+Розрахунок сум товарів заходу одним викликом.
+
+Кількості й ціни всіх товарів передаються списками, а результат містить суми
+рядків, загальну суму і суму прописом. Арифметика виконується в Decimal:
+сума рядка округлюється до копійок (ROUND_HALF_UP), загальна сума - точна сума
+округлених рядків, тому вона завжди збігається з тим, що видно в таблиці.
+
+Сума прописом береться з text_utils, який кешує текст за сумою в копійках -
+повторні перерахунки (кожне натискання клавіші в таблиці товарів) не рахують
+його знову.
+
+    totals = calculate_totals(["2", "1,5"], ["100", "33.33"])
+    totals["line_sums"]   # [Decimal('200.00'), Decimal('50.00')]
+    totals["total_text"]  # '250.00'
+    totals["words"]       # 'Двісті п'ятдесят гривень, 00 копійок.'
+"""
+
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from text_utils import number_to_ukrainian_text
+
+KOPECK = Decimal("0.01")
+ZERO = Decimal("0.00")
+
+
+def parse_decimal(value):
+    """
+    Перетворює значення поля ("1 234,50", 12, 3.5) в Decimal.
+    Порожнє або некоректне значення дає 0.
+    """
+    if value is None:
+        return ZERO
+    if isinstance(value, Decimal):
+        return value if value.is_finite() else ZERO
+    if isinstance(value, float):
+        # str() дає найкоротше представлення (0.1 -> "0.1"), без хвоста двійкової похибки
+        value = str(value)
+
+    clean_str = str(value).replace(",", ".").replace(" ", "").replace("\u00a0", "").strip()
+    if not clean_str:
+        return ZERO
+
+    try:
+        number = Decimal(clean_str)
+    except InvalidOperation:
+        return ZERO
+    return number if number.is_finite() else ZERO
+
+
+def to_kopecks(amount):
+    """
+    Округлює суму до копійок (бухгалтерське округлення, половина - вгору).
+    Сума з більшою кількістю цифр, ніж точність контексту Decimal, вважається некоректною (0).
+    """
+    try:
+        return parse_decimal(amount).quantize(KOPECK, rounding=ROUND_HALF_UP)
+    except InvalidOperation:
+        return ZERO
+
+
+def amount_to_words(amount):
+    """Сума прописом з великої літери ("Сто гривень, 00 копійок.")"""
+    return number_to_ukrainian_text(to_kopecks(amount)).capitalize()
+
+
+def calculate_totals(quantities, prices):
+    """
+    Рахує суми для всіх товарів одним викликом.
+
+    Args:
+        quantities: кількості товарів (рядки з полів або числа)
+        prices: ціни за одиницю, у тому ж порядку
+
+    Returns:
+        {"line_sums": [Decimal], "total": Decimal, "total_text": "0.00", "words": "сума прописом"}
+    """
+    if len(quantities) != len(prices):
+        raise ValueError(f"Кількість значень не збігається: {len(quantities)} кількостей, {len(prices)} цін")
+
+    line_sums = [to_kopecks(parse_decimal(quantity) * parse_decimal(price))
+                 for quantity, price in zip(quantities, prices)]
+    total = sum(line_sums, ZERO)
+
+    return {
+        "line_sums": line_sums,
+        "total": total,
+        "total_text": f"{total:.2f}",
+        "words": amount_to_words(total),
+    }
+
+
+def calculate_products_totals(products, quantity_field="кількість", price_field="ціна за одиницю"):
+    """calculate_totals для списку словників товарів (get_товари_from_blocks, таблиця товарів)"""
+    return calculate_totals([product.get(quantity_field, "") for product in products],
+                            [product.get(price_field, "") for product in products])
@@ -0,0 +1,561 @@
+# koshtorys_xml.py
+# -*- coding: utf-8 -*-
+"""
+Запис кошторису напряму в XML шаблону ШАБЛОН_кошторис_розумний.xlsx, без openpyxl.
+
+Шаблон читається як zip-архів. Змінюється тільки аркуш xl/worksheets/sheet1.xml:
+заповнюються основні дані, рядок товару 32 штампується для кожного товару, а
+підсумки й підписи нижче зсуваються (разом з об'єднаннями і посиланнями у формулах).
+Рядки товарів генеруються і пишуться в архів по одному, тому пам'ять не залежить
+від кількості товарів. Решта частин копіюється без змін, крім:
+- xl/styles.xml - додається жирний варіант стилю, якщо в шаблоні його немає;
+- xl/calcChain.xml - видаляється (Excel перебудує ланцюжок обчислень сам).
+
+Нові тексти записуються як inline-рядки, тому sharedStrings.xml не змінюється.
+
+Розібраний шаблон (KoshtorysTemplate) лише читається під час запису і зберігається
+в template_cache, тому повторні генерації не розбирають файл знову, а один екземпляр
+можна використовувати з різних потоків. Зміни кожного кошторису робляться в копіях
+лише тих рядків, які змінюються (KoshtorysSheet).
+
+Розмітка шаблону перевіряється до запису: якщо вона не підтримується, кидається
+KoshtorysTemplateError і нічого не пишеться (koshtorys.write_koshtorys_file тоді
+використовує openpyxl).
+"""
+
+import re
+import zipfile
+from copy import copy, deepcopy
+from decimal import Decimal
+from xml.sax.saxutils import escape
+
+from lxml import etree
+
+from koshtorys_totals import calculate_products_totals, parse_decimal
+from template_cache import template_cache
+
+SHEET_PART = "xl/worksheets/sheet1.xml"
+STYLES_PART = "xl/styles.xml"
+SHARED_STRINGS_PART = "xl/sharedStrings.xml"
+CALC_CHAIN_PART = "xl/calcChain.xml"
+CONTENT_TYPES_PART = "[Content_Types].xml"
+WORKBOOK_RELS_PART = "xl/_rels/workbook.xml.rels"
+
+S_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+
+# Розмітка шаблону (та сама, що в koshtorys.build_koshtorys_workbook)
+PRODUCT_ROW = 32
+BASE_B_NUMBER = 6
+KEKV_CODE = 2210
+KEKV_LABEL = "у т. ч. за КЕКВ:"
+KEKV_SEARCH_ROWS = 20
+FOOTER_NUMBERED_ROWS = 4
+# Стовпці рядка товару, які заповнюються для кожного товару
+PRODUCT_COLUMNS = ("B", "C", "G", "H", "J", "K", "L")
+MAIN_DATA_CELLS = (("D", 12), ("E", 14), ("E", 15))
+BOLD_CELLS = (("C", 13),)
+# Розмір частини sheet1.xml, що передається в zip за раз
+WRITE_CHUNK_SIZE = 64 * 1024
+
+# Елементи аркуша з діапазонами, які цей записувач не зсуває
+UNSUPPORTED_SHEET_ELEMENTS = ("<conditionalFormatting", "<dataValidations", "<hyperlinks", "<rowBreaks",
+                              "<tableParts", "<autoFilter")
+
+ROW_PATTERN = re.compile(r'<row\b[^>]*?(?:/>|>.*?</row>)', re.S)
+CELL_PATTERN = re.compile(r'<c\b[^>]*?(?:/>|>.*?</c>)', re.S)
+CELL_REF_PATTERN = re.compile(r'\br="([A-Z]+)(\d+)"')
+ROW_NUMBER_PATTERN = re.compile(r'\br="(\d+)"')
+STYLE_PATTERN = re.compile(r'\bs="(\d+)"')
+TYPE_PATTERN = re.compile(r'\bt="(\w+)"')
+VALUE_PATTERN = re.compile(r'<v>(.*?)</v>', re.S)
+INLINE_TEXT_PATTERN = re.compile(r'<t\b[^>]*>(.*?)</t>', re.S)
+FORMULA_PATTERN = re.compile(r'<f\b[^>]*?(?:/>|>.*?</f>)', re.S)
+FORMULA_TEXT_PATTERN = re.compile(r'(<f\b[^>]*>)(.*?)(</f>)', re.S)
+FORMULA_REF_ATTR_PATTERN = re.compile(r'(<f\b[^>]*?\bref=")([^"]+)(")')
+# Посилання на клітинку у формулі: A1, $A$1 (не частина імені функції чи аркуша)
+A1_REF_PATTERN = re.compile(r'(?<![A-Za-z_\d$.])(\$?[A-Z]{1,3})(\$?)(\d+)(?![\d(A-Za-z_])')
+DIMENSION_PATTERN = re.compile(r'(<dimension ref="[A-Z]+\d+:[A-Z]+)(\d+)(")')
+MERGE_CELLS_PATTERN = re.compile(r'<mergeCells\b[^>]*>(.*?)</mergeCells>|<mergeCells\b[^>]*/>', re.S)
+MERGE_REF_PATTERN = re.compile(r'<mergeCell ref="([A-Z]+)(\d+):([A-Z]+)(\d+)"/>')
+
+
+class KoshtorysTemplateError(ValueError):
+    """Розмітка шаблону кошторису не підтримується прямим записом XML"""
+
+
+def column_index(letters):
+    index = 0
+    for char in letters:
+        index = index * 26 + ord(char) - 64
+    return index
+
+
+def shift_formula(formula, first_row, offset):
+    """Зсуває посилання на рядки >= first_row у тексті формули"""
+    def shift(match):
+        row = int(match.group(3))
+        if row >= first_row:
+            row += offset
+        return f"{match.group(1)}{match.group(2)}{row}"
+    return A1_REF_PATTERN.sub(shift, formula)
+
+
+def shift_cell_formulas(cell_xml, first_row, offset):
+    """Зсуває посилання у формулі клітинки та діапазон ref спільної формули"""
+    if "<f" not in cell_xml:
+        return cell_xml
+    cell_xml = FORMULA_TEXT_PATTERN.sub(
+        lambda m: m.group(1) + shift_formula(m.group(2), first_row, offset) + m.group(3), cell_xml)
+    return FORMULA_REF_ATTR_PATTERN.sub(
+        lambda m: m.group(1) + shift_formula(m.group(2), first_row, offset) + m.group(3), cell_xml)
+
+
+class SheetRow:
+    """Рядок аркуша: атрибути <row> та клітинки {колонка: xml}"""
+
+    def __init__(self, row_xml):
+        # Незмінений рядок шаблону пишеться як є; у копій xml = None
+        self.xml = row_xml
+        self.has_formula = "<f" in row_xml
+        head_end = row_xml.index(">")
+        self.self_closing = row_xml[head_end - 1] == "/"
+        self.attrs = row_xml[4:head_end - 1 if self.self_closing else head_end]
+        self.number = int(ROW_NUMBER_PATTERN.search(self.attrs).group(1))
+        self.cells = {}
+        if not self.self_closing:
+            for cell_xml in CELL_PATTERN.findall(row_xml, head_end + 1):
+                self.cells[CELL_REF_PATTERN.search(cell_xml).group(1)] = cell_xml
+
+    def copy_to(self, number, keep_formulas=True):
+        """Копія рядка з номером number (посилання клітинок перенумеровуються)"""
+        row = object.__new__(SheetRow)
+        row.xml = None
+        row.has_formula = self.has_formula and keep_formulas
+        row.self_closing = self.self_closing
+        row.number = number
+        row.attrs = ROW_NUMBER_PATTERN.sub(f'r="{number}"', self.attrs, count=1)
+        row.cells = {}
+        for column, cell_xml in self.cells.items():
+            cell_xml = CELL_REF_PATTERN.sub(f'r="{column}{number}"', cell_xml, count=1)
+            if not keep_formulas and "<f" in cell_xml:
+                cell_xml = empty_cell(column, number, cell_style(cell_xml))
+            row.cells[column] = cell_xml
+        return row
+
+    def to_xml(self):
+        if self.xml is not None:
+            return self.xml
+        if not self.cells:
+            return f"<row{self.attrs}/>"
+        cells = sorted(self.cells.items(), key=lambda item: column_index(item[0]))
+        return f"<row{self.attrs}>{''.join(cell_xml for _, cell_xml in cells)}</row>"
+
+
+def cell_style(cell_xml):
+    match = STYLE_PATTERN.search(cell_xml) if cell_xml else None
+    return match.group(1) if match else None
+
+
+def _style_attr(style):
+    return f' s="{style}"' if style is not None else ""
+
+
+def empty_cell(column, row, style):
+    return f'<c r="{column}{row}"{_style_attr(style)}/>'
+
+
+def number_cell(column, row, style, value):
+    if isinstance(value, Decimal):
+        text = format(value, "f")
+    else:
+        text = repr(value) if isinstance(value, float) else str(value)
+    return f'<c r="{column}{row}"{_style_attr(style)}><v>{text}</v></c>'
+
+
+def string_cell(column, row, style, text):
+    return (f'<c r="{column}{row}"{_style_attr(style)} t="inlineStr">'
+            f'<is><t xml:space="preserve">{escape(text)}</t></is></c>')
+
+
+def read_shared_strings(template_zip):
+    """Тексти sharedStrings.xml за індексом"""
+    if SHARED_STRINGS_PART not in template_zip.namelist():
+        return []
+    root = etree.fromstring(template_zip.read(SHARED_STRINGS_PART))
+    strings = []
+    for si in root.iter(f"{{{S_NS}}}si"):
+        # Фонетичні підказки (rPh) не є частиною тексту
+        strings.append("".join(t.text or "" for t in si.iter(f"{{{S_NS}}}t")
+                               if t.getparent().tag != f"{{{S_NS}}}rPh"))
+    return strings
+
+
+def cell_value(cell_xml, shared_strings):
+    """Значення клітинки як у openpyxl: текст, число, формула ("=...") або None"""
+    if not cell_xml:
+        return None
+    formula = FORMULA_TEXT_PATTERN.search(cell_xml)
+    if formula:
+        return "=" + formula.group(2)
+    cell_type = TYPE_PATTERN.search(cell_xml.split(">", 1)[0])
+    cell_type = cell_type.group(1) if cell_type else "n"
+    if cell_type == "inlineStr":
+        return "".join(INLINE_TEXT_PATTERN.findall(cell_xml)) or None
+    value = VALUE_PATTERN.search(cell_xml)
+    if value is None:
+        return None
+    if cell_type == "s":
+        return shared_strings[int(value.group(1))]
+    if cell_type in ("str", "e"):
+        return value.group(1)
+    if cell_type == "b":
+        return value.group(1) == "1"
+    number = float(value.group(1))
+    return int(number) if number.is_integer() else number
+
+
+def add_bold_style(styles_root, style):
+    """
+    Індекс жирного варіанту стилю клітинки (cellXfs). Якщо шрифт уже жирний - повертає
+    той самий індекс; інакше знаходить або додає шрифт і xf у styles.xml.
+    """
+    fonts = styles_root.find(f"{{{S_NS}}}fonts")
+    cell_xfs = styles_root.find(f"{{{S_NS}}}cellXfs")
+    xf = cell_xfs[int(style or 0)]
+    font = fonts[int(xf.get("fontId", "0"))]
+
+    bold = font.find(f"{{{S_NS}}}b")
+    if bold is not None and bold.get("val", "1") not in ("0", "false"):
+        return style
+
+    bold_font = deepcopy(font)
+    if bold is not None:
+        bold_font.remove(bold_font.find(f"{{{S_NS}}}b"))
+    bold_font.insert(0, etree.Element(f"{{{S_NS}}}b"))
+    font_id = _find_or_append(fonts, bold_font)
+
+    bold_xf = deepcopy(xf)
+    bold_xf.set("fontId", str(font_id))
+    bold_xf.set("applyFont", "1")
+    return str(_find_or_append(cell_xfs, bold_xf))
+
+
+def _find_or_append(parent, element):
+    serialized = etree.tostring(element)
+    for index, existing in enumerate(parent):
+        if etree.tostring(existing) == serialized:
+            return index
+    parent.append(element)
+    parent.set("count", str(len(parent)))
+    return len(parent) - 1
+
+
+class KoshtorysTemplate:
+    """Розібраний шаблон кошторису: частини архіву, рядки аркуша, тексти та стилі"""
+
+    def __init__(self, template_path):
+        self.path = template_path
+        with zipfile.ZipFile(template_path) as template_zip:
+            names = template_zip.namelist()
+            if SHEET_PART not in names or STYLES_PART not in names:
+                raise KoshtorysTemplateError(f"у шаблоні немає {SHEET_PART} або {STYLES_PART}")
+            self.parts = [(item, template_zip.read(item.filename)) for item in template_zip.infolist()]
+            self.shared_strings = read_shared_strings(template_zip)
+
+        parts = {item.filename: data for item, data in self.parts}
+        self.styles_xml = parts[STYLES_PART]
+        sheet_xml = parts[SHEET_PART].decode("utf-8")
+
+        data_start = sheet_xml.find("<sheetData")
+        data_end = sheet_xml.find("</sheetData>")
+        if data_start < 0 or data_end < 0:
+            raise KoshtorysTemplateError("аркуш без <sheetData>")
+        data_open_end = sheet_xml.index(">", data_start) + 1
+        self.head = sheet_xml[:data_open_end]
+        self.tail = sheet_xml[data_end:]
+        for element in UNSUPPORTED_SHEET_ELEMENTS:
+            if element in self.tail:
+                raise KoshtorysTemplateError(f"аркуш містить {element}>")
+
+        self.rows = [SheetRow(row_xml) for row_xml in ROW_PATTERN.findall(sheet_xml, data_open_end, data_end)]
+        self.rows_by_number = {row.number: row for row in self.rows}
+        self.product_template = self.rows_by_number.get(PRODUCT_ROW)
+        if self.product_template is None:
+            raise KoshtorysTemplateError(f"немає рядка товару {PRODUCT_ROW}")
+
+        # Жирні варіанти стилів (C13, стовпець G товарів) однакові для всіх кошторисів
+        styles_root = etree.fromstring(self.styles_xml)
+        self.bold_styles = {}
+        bold_sources = [self.product_template.cells.get("G")]
+        bold_sources.extend(self.rows_by_number[row_number].cells.get(column)
+                            for column, row_number in BOLD_CELLS if row_number in self.rows_by_number)
+        for cell_xml in bold_sources:
+            style = cell_style(cell_xml)
+            self.bold_styles[style] = add_bold_style(styles_root, style)
+        if any(bold != style for style, bold in self.bold_styles.items()):
+            self.styles_xml = etree.tostring(styles_root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+class KoshtorysSheet:
+    """
+    Аркуш одного кошторису поверх спільного KoshtorysTemplate (копіювання при зміні):
+    рядки шаблону не копіюються, поки їх не треба змінити - змінені рядки лежать в
+    overrides, решта під час запису береться з шаблону (зі зсувом номерів, якщо треба).
+    """
+
+    def __init__(self, template, захід, адреса, дата, товари, загальна_сума):
+        self.template = template
+        self.head = template.head
+        self.tail = template.tail
+        self.товари = товари
+        self.line_sums = calculate_products_totals(товари)["line_sums"]
+        self.offset = max(len(товари) - 1, 0)
+        self.shared_strings = template.shared_strings
+        self.product_template = template.product_template
+        self.product_merges = []
+        self.overrides = {}
+
+        self._fill_main_data(захід, адреса, дата)
+        self._fill_total(загальна_сума)
+        self._number_footer_rows()
+        self._prepare_merges()
+
+        self.head = DIMENSION_PATTERN.sub(
+            lambda m: f"{m.group(1)}{int(m.group(2)) + self.offset if int(m.group(2)) > PRODUCT_ROW else m.group(2)}"
+                      f"{m.group(3)}", self.head, count=1)
+
+    def bold_style(self, style):
+        return self.template.bold_styles.get(style, style)
+
+    def _template_row(self, row_number):
+        """Рядок шаблону, що в кошторисі стоїть на row_number (None - рядок товару або його немає)"""
+        if self.товари and PRODUCT_ROW <= row_number < PRODUCT_ROW + len(self.товари):
+            return None
+        source = row_number - self.offset if row_number > PRODUCT_ROW else row_number
+        return self.template.rows_by_number.get(source)
+
+    def _shifted_copy(self, template_row, row_number):
+        copied = template_row.copy_to(row_number)
+        if self.offset and copied.has_formula:
+            for column, cell_xml in copied.cells.items():
+                copied.cells[column] = shift_cell_formulas(cell_xml, PRODUCT_ROW + 1, self.offset)
+        return copied
+
+    def _output_row(self, template_row):
+        """Рядок для запису: змінений, зсунутий або сам рядок шаблону"""
+        row_number = template_row.number + (self.offset if template_row.number > PRODUCT_ROW else 0)
+        if row_number in self.overrides:
+            return self.overrides[row_number]
+        if row_number == template_row.number and not (self.offset and template_row.has_formula):
+            return template_row
+        return self._shifted_copy(template_row, row_number)
+
+    def _writable_row(self, row_number):
+        if row_number not in self.overrides:
+            template_row = self._template_row(row_number)
+            if template_row is None:
+                raise KoshtorysTemplateError(f"немає рядка {row_number}")
+            self.overrides[row_number] = self._shifted_copy(template_row, row_number)
+        return self.overrides[row_number]
+
+    def _set_cell(self, row_number, column, builder, value):
+        row = self._writable_row(row_number)
+        style = cell_style(row.cells.get(column))
+        row.cells[column] = builder(column, row_number, style, value)
+
+    def _fill_main_data(self, захід, адреса, дата):
+        for (column, row_number), value in zip(MAIN_DATA_CELLS, (захід, адреса, дата)):
+            if value and value.strip():
+                self._set_cell(row_number, column, string_cell, value)
+
+        for column, row_number in BOLD_CELLS:
+            template_row = self._template_row(row_number)
+            if template_row is None or column not in template_row.cells:
+                continue
+            style = cell_style(template_row.cells[column])
+            bold = self.bold_style(style)
+            if bold != style:
+                row = self._writable_row(row_number)
+                cell_xml = row.cells[column]
+                row.cells[column] = (STYLE_PATTERN.sub(f's="{bold}"', cell_xml, count=1) if style is not None
+                                     else cell_xml.replace("<c ", f'<c s="{bold}" ', 1))
+
+    def _value(self, row_number, column):
+        row = self.overrides.get(row_number) or self._template_row(row_number)
+        return cell_value(row.cells.get(column), self.shared_strings) if row else None
+
+    def _fill_total(self, загальна_сума):
+        footer_start = PRODUCT_ROW + len(self.товари)
+        for row_number in range(footer_start, footer_start + KEKV_SEARCH_ROWS):
+            kekv_found = any(self._value(row_number, column) and KEKV_LABEL in str(self._value(row_number, column))
+                             for column in "CDEF")
+            code = self._value(row_number, "G")
+            if kekv_found and code and str(KEKV_CODE) in str(code):
+                total = parse_decimal(загальна_сума)
+                self._set_cell(row_number, "K", number_cell, total)
+                self._set_cell(row_number, "L", number_cell, total)
+                print(f"[DEBUG] Загальна сума {total} записана в K{row_number}, L{row_number} (КЕКВ:{KEKV_CODE})")
+                return
+        print(f"[WARNING] Не знайдено строку з '{KEKV_LABEL}' та '{KEKV_CODE}'")
+
+    def _number_footer_rows(self):
+        """Продовжує нумерацію в стовпці B для непорожніх рядків підсумків"""
+        next_number = BASE_B_NUMBER + len(self.товари)
+        footer_start = PRODUCT_ROW + len(self.товари)
+        for row_number in range(footer_start, footer_start + FOOTER_NUMBERED_ROWS):
+            if self._template_row(row_number) and any(self._value(row_number, column) for column in "CDEFGHJ"):
+                self._set_cell(row_number, "B", number_cell, next_number)
+                next_number += 1
+
+    def _prepare_merges(self):
+        """Зсуває об'єднання нижче товарів і запам'ятовує об'єднання рядка товару для штампування"""
+        self.merges = []
+        match = MERGE_CELLS_PATTERN.search(self.tail)
+        if not match:
+            self.merges_span = None
+            return
+        self.merges_span = match.span()
+
+        for start_col, start_row, end_col, end_row in MERGE_REF_PATTERN.findall(match.group(1) or ""):
+            start_row, end_row = int(start_row), int(end_row)
+            if start_row == end_row == PRODUCT_ROW:
+                self.product_merges.append((start_col, end_col))
+            if start_row > PRODUCT_ROW:
+                start_row += self.offset
+                end_row += self.offset
+            elif end_row > PRODUCT_ROW:
+                end_row += self.offset
+            self.merges.append(f'<mergeCell ref="{start_col}{start_row}:{end_col}{end_row}"/>')
+
+    def iter_product_rows(self):
+        """XML рядків товарів (по одному рядку)"""
+        template = self.product_template
+        style = {column: cell_style(cell_xml) for column, cell_xml in template.cells.items()}
+        g_style = self.bold_style(style.get("G"))
+        columns = sorted(set(template.cells) | set(PRODUCT_COLUMNS), key=column_index)
+        # Рядки-копії: клітинки без формул, номер рядка підставляється замість заглушки 0
+        stamped = template.copy_to(0, keep_formulas=False)
+        row_head, row_tail = f"<row{stamped.attrs}>".split(' r="0"', 1)
+
+        for i, (товар_data, line_sum) in enumerate(zip(self.товари, self.line_sums)):
+            row_number = PRODUCT_ROW + i
+            values = {
+                "B": number_cell("B", row_number, style.get("B"), BASE_B_NUMBER + i),
+                "C": string_cell("C", row_number, style.get("C"), товар_data["товар"]),
+                "G": number_cell("G", row_number, g_style, KEKV_CODE),
+                "H": number_cell("H", row_number, style.get("H"), parse_decimal(товар_data["кількість"])),
+                "J": number_cell("J", row_number, style.get("J"), parse_decimal(товар_data["ціна за одиницю"])),
+                "K": number_cell("K", row_number, style.get("K"), line_sum),
+                "L": number_cell("L", row_number, style.get("L"), line_sum),
+            }
+            parts = [f'{row_head} r="{row_number}"{row_tail}']
+            for column in columns:
+                if column in values:
+                    parts.append(values[column])
+                elif i == 0:
+                    parts.append(template.cells[column])
+                else:
+                    parts.append(stamped.cells[column].replace(f'r="{column}0"', f'r="{column}{row_number}"', 1))
+            parts.append("</row>")
+            yield "".join(parts)
+
+    def iter_merges(self):
+        yield from self.merges
+        for row_number in range(PRODUCT_ROW + 1, PRODUCT_ROW + len(self.товари)):
+            for start_col, end_col in self.product_merges:
+                yield f'<mergeCell ref="{start_col}{row_number}:{end_col}{row_number}"/>'
+
+    def write(self, dest):
+        """Пише sheet1.xml у файловий об'єкт dest частинами"""
+        buffer = []
+        buffered = 0
+
+        def put(text):
+            nonlocal buffered
+            buffer.append(text)
+            buffered += len(text)
+            if buffered >= WRITE_CHUNK_SIZE:
+                flush()
+
+        def flush():
+            nonlocal buffered
+            dest.write("".join(buffer).encode("utf-8"))
+            buffer.clear()
+            buffered = 0
+
+        put(self.head)
+        for template_row in self.template.rows:
+            if template_row.number == PRODUCT_ROW and self.товари:
+                for row_xml in self.iter_product_rows():
+                    put(row_xml)
+            else:
+                put(self._output_row(template_row).to_xml())
+
+        if self.merges_span is None:
+            put(self.tail)
+            flush()
+            return
+
+        start, end = self.merges_span
+        put(self.tail[:start])
+        merges_count = len(self.merges) + len(self.product_merges) * max(len(self.товари) - 1, 0)
+        put(f'<mergeCells count="{merges_count}">')
+        for merge_xml in self.iter_merges():
+            put(merge_xml)
+        put("</mergeCells>")
+        put(self.tail[end:])
+        flush()
+
+
+def _drop_calc_chain(part_xml):
+    """Прибирає посилання на calcChain.xml з [Content_Types].xml або workbook.xml.rels"""
+    root = etree.fromstring(part_xml)
+    for element in list(root):
+        if (element.get("PartName") == "/" + CALC_CHAIN_PART or
+                (element.get("Target") or "").endswith("calcChain.xml")):
+            root.remove(element)
+    return etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+def load_koshtorys_template(template_path):
+    """
+    Розібраний шаблон кошторису для write_koshtorys_xlsx. Береться з template_cache:
+    файл розбирається тільки при першому звертанні або після зміни на диску.
+
+    Raises:
+        KoshtorysTemplateError: розмітка шаблону не підтримується
+    """
+    return template_cache.get(template_path, KoshtorysTemplate, kind="koshtorys")
+
+
+def write_koshtorys_xlsx(output, захід, адреса, дата, товари, загальна_сума, template):
+    """
+    Записує заповнений кошторис у output (шлях або файловий об'єкт для запису).
+    template - шлях до шаблону або KoshtorysTemplate (load_koshtorys_template).
+
+    Raises:
+        KoshtorysTemplateError: розмітка шаблону не підтримується (у output нічого не записано)
+    """
+    if not isinstance(template, KoshtorysTemplate):
+        template = load_koshtorys_template(template)
+
+    # Уся перевірка і підготовка - до відкриття output
+    sheet = KoshtorysSheet(template, захід, адреса, дата, товари, загальна_сума)
+    print(f"[DEBUG] Кошторис (XML): товарів {len(товари)}, зсув підсумків на {sheet.offset} рядків")
+
+    with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_DEFLATED) as output_zip:
+        for template_item, data in template.parts:
+            # ZipFile.writestr змінює ZipInfo (зсуви, розміри) - у кожного запису своя копія
+            item = copy(template_item)
+            name = item.filename
+            if name == CALC_CHAIN_PART:
+                continue
+            if name == SHEET_PART:
+                with output_zip.open(name, "w", force_zip64=True) as dest:
+                    sheet.write(dest)
+            elif name == STYLES_PART:
+                output_zip.writestr(item, template.styles_xml)
+            elif name in (CONTENT_TYPES_PART, WORKBOOK_RELS_PART):
+                output_zip.writestr(item, _drop_calc_chain(data))
+            else:
+                output_zip.writestr(item, data)
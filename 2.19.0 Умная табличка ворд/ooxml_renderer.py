@@ -0,0 +1,641 @@
+# ooxml_renderer.py
+# -*- coding: utf-8 -*-
+"""
+Рендеринг договорів напряму через XML-частини шаблону (word/document.xml,
+колонтитули) без запуску Microsoft Word.
+
+Підтримує ті ж плейсхолдери, що і COM-генерація в word_renderer.py:
+<поле>, {{PERSON_*}} / інші плейсхолдери людей та <таблиця_товарів>.
+Модуль не імпортує tkinter і win32com, тому працює і на Linux.
+"""
+
+import io
+import re
+import zipfile
+from copy import deepcopy
+
+from lxml import etree
+
+from koshtorys_totals import calculate_products_totals
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+TABLE_PLACEHOLDER = "<таблиця_товарів>"
+
+# Частини документа, в яких шукаємо плейсхолдери
+STORY_PART_PATTERN = re.compile(r"^word/(document|header\d*|footer\d*)\.xml$")
+
+# Типи вмісту для перетворення .docm -> .docx
+DOCM_MAIN_CONTENT_TYPE = "application/vnd.ms-word.document.macroEnabled.main+xml"
+DOCX_MAIN_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"
+CONTENT_TYPES_PART = "[Content_Types].xml"
+DOCUMENT_RELS_PART = "word/_rels/document.xml.rels"
+
+
+def w(tag):
+    """Повертає повне ім'я тегу у просторі імен WordprocessingML"""
+    return f"{{{W_NS}}}{tag}"
+
+
+W_P = w("p")
+W_R = w("r")
+W_T = w("t")
+W_TAB = w("tab")
+W_BR = w("br")
+W_CR = w("cr")
+W_PPR = w("pPr")
+W_RPR = w("rPr")
+W_TBL = w("tbl")
+W_TC = w("tc")
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Підготовка даних блоку
+
+def get_entry_text(value):
+    """Повертає текст поля: значення Entry віджета або звичайний рядок"""
+    if value is None or isinstance(value, (bool, list, dict)):
+        return ""
+    if hasattr(value, "get") and callable(value.get):
+        try:
+            return str(value.get())
+        except Exception:
+            return ""
+    return str(value)
+
+
+def snapshot_block_entries(block):
+    """
+    Знімає значення всіх текстових полів блоку у звичайний словник {поле: текст}.
+    Віджети CTk не можна передавати в інші потоки/процеси, тому рендер працює зі знімком.
+    """
+    snapshot = {}
+    for key, value in block.get("entries", {}).items():
+        if isinstance(value, (bool, list, dict)):
+            continue
+        snapshot[key] = get_entry_text(value)
+    return snapshot
+
+
+def get_block_items(block):
+    """
+    Повертає список товарів блоку у форматі, який очікує таблиця товарів
+    (ключі "товар", "дк", "кількість", "ціна").
+    """
+    items = block.get("items")
+    if callable(items):
+        items = items()
+    if not items:
+        items = block.get("entries", {}).get("products", [])
+        if callable(items):
+            items = items()
+
+    normalized = []
+    for item in items or []:
+        item = dict(item)
+        if not item.get("ціна") and item.get("ціна за одиницю"):
+            item["ціна"] = item["ціна за одиницю"]
+        normalized.append(item)
+    return normalized
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Робота з текстом абзаців
+
+def _owner_paragraph(element):
+    """Повертає найближчий батьківський абзац w:p для елемента"""
+    parent = element.getparent()
+    while parent is not None and parent.tag != W_P:
+        parent = parent.getparent()
+    return parent
+
+
+def paragraph_text_nodes(paragraph):
+    """Повертає w:t вузли, що належать саме цьому абзацу (без вкладених текстових полів)"""
+    return [t for t in paragraph.iter(W_T) if _owner_paragraph(t) is paragraph]
+
+
+def _set_node_text(node, text):
+    node.text = text
+    if text and (text[0].isspace() or text[-1].isspace() or "  " in text):
+        node.set(XML_SPACE, "preserve")
+
+
+def build_placeholder_pattern(placeholders):
+    """Будує один регулярний вираз-альтернацію для всіх плейсхолдерів (довші - першими)"""
+    keys = sorted((p for p in placeholders if p), key=len, reverse=True)
+    if not keys:
+        return None
+    return re.compile("|".join(re.escape(k) for k in keys))
+
+
+def replace_in_paragraph(paragraph, pattern, replacements, hits=None):
+    """
+    Замінює всі плейсхолдери абзацу за один прохід, навіть якщо плейсхолдер розбитий на кілька w:r.
+    Форматування береться з run-а, в якому починається плейсхолдер.
+
+    Returns:
+        Кількість виконаних замін
+    """
+    nodes = paragraph_text_nodes(paragraph)
+    if not nodes:
+        return 0
+
+    original_texts = [node.text or "" for node in nodes]
+    texts = list(original_texts)
+    full_text = "".join(texts)
+    matches = list(pattern.finditer(full_text))
+    if not matches:
+        return 0
+
+    # Початкові позиції кожного w:t у загальному тексті абзацу
+    starts = []
+    position = 0
+    for text in original_texts:
+        starts.append(position)
+        position += len(text)
+
+    def locate(offset, is_end):
+        for index in range(len(nodes) - 1, -1, -1):
+            if starts[index] < offset or (not is_end and starts[index] == offset and original_texts[index]):
+                return index, offset - starts[index]
+        return 0, offset
+
+    # Замінюємо з кінця, щоб не зсувати позиції попередніх збігів
+    for match in reversed(matches):
+        replacement = replacements.get(match.group(0), "")
+        start_index, start_offset = locate(match.start(), False)
+        end_index, end_offset = locate(match.end(), True)
+
+        if start_index == end_index:
+            text = texts[start_index]
+            texts[start_index] = text[:start_offset] + replacement + text[end_offset:]
+        else:
+            texts[start_index] = texts[start_index][:start_offset] + replacement
+            for index in range(start_index + 1, end_index):
+                texts[index] = ""
+            texts[end_index] = texts[end_index][end_offset:]
+
+        if hits is not None:
+            hits[match.group(0)] = hits.get(match.group(0), 0) + 1
+
+    for node, text in zip(nodes, texts):
+        if (node.text or "") != text:
+            _set_node_text(node, text)
+
+    return len(matches)
+
+
+def _split_run_text(run):
+    """
+    Розбиває run, текст якого містить \\t або \\n, на послідовність run-ів/табуляцій.
+    Повертає список "рядків", кожен з яких - список нових w:r елементів.
+    """
+    rpr = run.find(W_RPR)
+    lines = [[]]
+
+    def new_run():
+        element = etree.Element(W_R)
+        if rpr is not None:
+            element.append(deepcopy(rpr))
+        lines[-1].append(element)
+        return element
+
+    current = new_run()
+    for child in run:
+        if child.tag == W_RPR:
+            continue
+        if child.tag != W_T or not child.text or not any(ch in child.text for ch in "\t\n"):
+            current.append(deepcopy(child))
+            continue
+
+        for chunk in re.split(r"(\t|\n)", child.text):
+            if chunk == "\t":
+                etree.SubElement(current, W_TAB)
+            elif chunk == "\n":
+                lines.append([])
+                current = new_run()
+            elif chunk:
+                text_node = etree.SubElement(current, W_T)
+                _set_node_text(text_node, chunk)
+    return lines
+
+
+def materialize_special_chars(paragraph):
+    """
+    Перетворює символи, які Word вставляє через Find/Replace (^p, ^t), у структуру XML:
+    перенос рядка -> новий абзац з тими ж властивостями, табуляція -> w:tab.
+    """
+    nodes = paragraph_text_nodes(paragraph)
+    if not any(node.text and any(ch in node.text for ch in "\t\r\n") for node in nodes):
+        return [paragraph]
+
+    for node in nodes:
+        if node.text and "\r" in node.text:
+            _set_node_text(node, node.text.replace("\r\n", "\n").replace("\r", "\n"))
+
+    ppr = paragraph.find(W_PPR)
+    lines = [[]]
+    for child in list(paragraph):
+        if child.tag == W_PPR:
+            continue
+        paragraph.remove(child)
+        if child.tag == W_R and any(t.text and any(ch in t.text for ch in "\t\n") for t in child.findall(W_T)):
+            run_lines = _split_run_text(child)
+            lines[-1].extend(run_lines[0])
+            lines.extend(run_lines[1:])
+        else:
+            lines[-1].append(child)
+
+    for element in lines[0]:
+        paragraph.append(element)
+
+    result = [paragraph]
+    previous = paragraph
+    for line in lines[1:]:
+        new_paragraph = etree.Element(W_P)
+        if ppr is not None:
+            new_paragraph.append(deepcopy(ppr))
+        for element in line:
+            new_paragraph.append(element)
+        previous.addnext(new_paragraph)
+        previous = new_paragraph
+        result.append(new_paragraph)
+    return result
+
+
+def remove_paragraph(paragraph):
+    """Видаляє абзац; останній абзац комірки таблиці лише очищається (Word вимагає хоча б один w:p)"""
+    parent = paragraph.getparent()
+    if parent is None:
+        return
+    if parent.tag == W_TC and len(parent.findall(W_P)) == 1:
+        for child in list(paragraph):
+            if child.tag != W_PPR:
+                paragraph.remove(child)
+        return
+    parent.remove(paragraph)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Таблиця товарів
+
+def _make_cell(text, width, align="left", bold=False, span=1):
+    tc = etree.Element(W_TC)
+    tc_pr = etree.SubElement(tc, w("tcPr"))
+    tc_w = etree.SubElement(tc_pr, w("tcW"))
+    tc_w.set(w("w"), str(width))
+    tc_w.set(w("type"), "pct")
+    if span > 1:
+        etree.SubElement(tc_pr, w("gridSpan")).set(w("val"), str(span))
+    etree.SubElement(tc_pr, w("vAlign")).set(w("val"), "center")
+
+    for line in str(text).split("\n"):
+        p = etree.SubElement(tc, W_P)
+        p_pr = etree.SubElement(p, W_PPR)
+        etree.SubElement(p_pr, w("jc")).set(w("val"), align)
+        r = etree.SubElement(p, W_R)
+        if bold:
+            r_pr = etree.SubElement(r, W_RPR)
+            etree.SubElement(r_pr, w("b"))
+        _set_node_text(etree.SubElement(r, W_T), line)
+    return tc
+
+
+# Ширини колонок у п'ятдесятих частках відсотка (разом 5000 = 100%)
+PRODUCTS_TABLE_COLUMNS = [
+    ("№\nп/п", 300, "center"),
+    ("Найменування", 1500, "left"),
+    ("ДК-021:2015", 700, "center"),
+    ("Одиниця виміру │ Кількість", 900, "center"),
+    ("Ціна за\nодиницю, грн.", 800, "right"),
+    ("Загальна\nсума, грн.", 800, "right"),
+]
+
+
+def build_products_table_xml(items_data):
+    """
+    Створює елемент w:tbl з таблицею товарів (заголовок + товари + рядок "Разом:").
+    Цю ж таблицю вставляє в документ Word word_renderer.create_products_table (InsertXML).
+    """
+    tbl = etree.Element(W_TBL)
+    tbl_pr = etree.SubElement(tbl, w("tblPr"))
+    tbl_w = etree.SubElement(tbl_pr, w("tblW"))
+    tbl_w.set(w("w"), "5000")
+    tbl_w.set(w("type"), "pct")
+    borders = etree.SubElement(tbl_pr, w("tblBorders"))
+    for side in ("top", "left", "bottom", "right", "insideH", "insideV"):
+        border = etree.SubElement(borders, w(side))
+        border.set(w("val"), "single")
+        border.set(w("sz"), "4")
+        border.set(w("space"), "0")
+        border.set(w("color"), "auto")
+
+    grid = etree.SubElement(tbl, w("tblGrid"))
+    for _, width, _ in PRODUCTS_TABLE_COLUMNS:
+        etree.SubElement(grid, w("gridCol")).set(w("w"), str(width * 2))
+
+    # Заголовок
+    header = etree.SubElement(tbl, w("tr"))
+    for title, width, _ in PRODUCTS_TABLE_COLUMNS:
+        header.append(_make_cell(title, width, "center", bold=True))
+
+    # Товари (суми в Decimal так само, як поля "разом" / "сума прописом" і кошторис)
+    totals = calculate_products_totals(items_data, price_field="ціна")
+    total_sum = totals["total"]
+    for i, (item, item_sum) in enumerate(zip(items_data, totals["line_sums"])):
+        values = [
+            str(i + 1),
+            item.get("товар", ""),
+            item.get("дк", ""),
+            f"шт. │ {item.get('кількість', '')}",
+            item.get("ціна", "0"),
+            f"{item_sum:.2f}",
+        ]
+        row = etree.SubElement(tbl, w("tr"))
+        for value, (_, width, align) in zip(values, PRODUCTS_TABLE_COLUMNS):
+            row.append(_make_cell(value, width, align))
+
+    # Підсумковий рядок "Разом:"
+    total_row = etree.SubElement(tbl, w("tr"))
+    span_width = sum(width for _, width, _ in PRODUCTS_TABLE_COLUMNS[:-1])
+    total_row.append(_make_cell("Разом:", span_width, "right", bold=True, span=len(PRODUCTS_TABLE_COLUMNS) - 1))
+    total_row.append(_make_cell(totals["total_text"], PRODUCTS_TABLE_COLUMNS[-1][1], "right", bold=True))
+
+    return tbl, total_sum
+
+
+PKG_NS = "http://schemas.microsoft.com/office/2006/xmlPackage"
+RELS_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+OFFICE_DOCUMENT_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+
+
+def _pkg_part(package, name, content_type, content):
+    part = etree.SubElement(package, f"{{{PKG_NS}}}part")
+    part.set(f"{{{PKG_NS}}}name", name)
+    part.set(f"{{{PKG_NS}}}contentType", content_type)
+    etree.SubElement(part, f"{{{PKG_NS}}}xmlData").append(content)
+
+
+def build_products_table_flat_opc(items_data):
+    """
+    Пакує таблицю товарів у Flat OPC документ для Word Range.InsertXML:
+    вся таблиця з форматуванням колонок вставляється однією COM-операцією.
+
+    Returns:
+        (xml_text, total_sum)
+    """
+    tbl, total_sum = build_products_table_xml(items_data)
+
+    package = etree.Element(f"{{{PKG_NS}}}package", nsmap={"pkg": PKG_NS})
+
+    relationships = etree.Element(f"{{{RELS_NS}}}Relationships", nsmap={None: RELS_NS})
+    relationship = etree.SubElement(relationships, f"{{{RELS_NS}}}Relationship")
+    relationship.set("Id", "rId1")
+    relationship.set("Type", OFFICE_DOCUMENT_REL)
+    relationship.set("Target", "word/document.xml")
+    _pkg_part(package, "/_rels/.rels", "application/vnd.openxmlformats-package.relationships+xml", relationships)
+
+    document = etree.Element(w("document"), nsmap={"w": W_NS})
+    body = etree.SubElement(document, w("body"))
+    body.append(tbl)
+    etree.SubElement(body, W_P)
+    _pkg_part(package, "/word/document.xml", DOCX_MAIN_CONTENT_TYPE, document)
+
+    xml_text = etree.tostring(package, xml_declaration=True, encoding="UTF-8", standalone=True).decode("utf-8")
+    return xml_text, total_sum
+
+
+def paragraph_text(paragraph):
+    """Повертає текст абзацу (тільки його власні w:t)"""
+    return "".join(node.text or "" for node in paragraph_text_nodes(paragraph))
+
+
+def insert_products_table(root, items_data, placeholder=TABLE_PLACEHOLDER, paragraphs=None):
+    """
+    Замінює абзаци з плейсхолдером таблиці на таблицю товарів.
+    paragraphs - вже знайдені абзаци з плейсхолдером (щоб не обходити документ повторно).
+
+    Returns:
+        Кількість вставлених таблиць
+    """
+    if paragraphs is None:
+        paragraphs = [p for p in root.iter(W_P) if placeholder in paragraph_text(p)]
+
+    inserted = 0
+    for paragraph in paragraphs:
+        if paragraph.getparent() is None:
+            continue
+        table, _ = build_products_table_xml(items_data)
+        paragraph.addprevious(table)
+        # У комірці Word вимагає абзац після таблиці - remove_paragraph лише очистить його
+        remove_paragraph(paragraph)
+        inserted += 1
+    return inserted
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Рендеринг частини документа
+
+def get_planned_paragraphs(paragraphs, plan_part):
+    """
+    Повертає абзаци, вказані в плані частини (render_plan.compile_template).
+    None - план не відповідає XML (кількість абзаців або w:t змінилась), потрібен повний обхід.
+    """
+    planned = []
+    for entry in plan_part["paragraphs"]:
+        index = entry["index"]
+        if index >= len(paragraphs):
+            return None
+        paragraph = paragraphs[index]
+        if len(paragraph_text_nodes(paragraph)) != entry["nodes"]:
+            return None
+        planned.append(paragraph)
+    return planned
+
+
+def remove_people_sections(paragraphs, plan_part, removals, hits=None):
+    """
+    Видаляє умовні секції необраних людей (people_sections плану) за індексами абзаців - без пошуку маркерів.
+
+    Returns:
+        Множина id() видалених абзаців
+    """
+    removed = set()
+    for marker, indices in plan_part.get("people_sections", {}).items():
+        if marker not in removals:
+            continue
+        for index in indices:
+            if hits is not None:
+                hits[marker] = hits.get(marker, 0) + 1
+            paragraph = paragraphs[index]
+            if id(paragraph) not in removed:
+                remove_paragraph(paragraph)
+                removed.add(id(paragraph))
+    return removed
+
+
+def render_story_part(xml_bytes, field_replacements, people_replacements, items_data=None, hits=None,
+                      plan_part=None):
+    """
+    Обробляє одну XML-частину (document/header/footer) і повертає нові байти.
+
+    Args:
+        xml_bytes: вміст частини
+        field_replacements: {"<поле>": "значення"}
+        people_replacements: {"{{PERSON_X}}": "текст"}; порожній текст видаляє абзац
+        items_data: товари для <таблиця_товарів> (None - таблицю не вставляємо)
+        hits: словник для підрахунку кількості замін кожного плейсхолдера
+        plan_part: план частини - обробляються тільки абзаци з плейсхолдерами
+    """
+    root = etree.fromstring(xml_bytes)
+
+    replacements = dict(field_replacements)
+    # Плейсхолдери людей з порожньою заміною видаляють весь абзац
+    removals = {key for key, value in people_replacements.items() if value == ""}
+    replacements.update({key: value for key, value in people_replacements.items() if value != ""})
+
+    pattern = build_placeholder_pattern(replacements)
+    removal_pattern = build_placeholder_pattern(removals)
+
+    paragraphs = list(root.iter(W_P))
+    removed = set()
+    if plan_part is not None:
+        planned = get_planned_paragraphs(paragraphs, plan_part)
+        if planned is None:
+            print("[WARNING] План шаблону застарів, виконується повний обхід документу")
+        else:
+            # Умовні секції людей видаляються за відомими індексами, текст абзаців не перевіряється
+            removed = remove_people_sections(paragraphs, plan_part, removals, hits)
+            removal_pattern = None
+            paragraphs = planned
+
+    table_paragraphs = []
+    for paragraph in paragraphs:
+        if id(paragraph) in removed:
+            continue
+        text = None
+        if removal_pattern is not None:
+            text = paragraph_text(paragraph)
+            found = removal_pattern.findall(text)
+            if found:
+                if hits is not None:
+                    for key in found:
+                        hits[key] = hits.get(key, 0) + 1
+                remove_paragraph(paragraph)
+                continue
+
+        if items_data is not None:
+            text = text if text is not None else paragraph_text(paragraph)
+            if TABLE_PLACEHOLDER in text:
+                table_paragraphs.append(paragraph)
+                continue
+
+        if pattern is not None and replace_in_paragraph(paragraph, pattern, replacements, hits):
+            materialize_special_chars(paragraph)
+
+    if table_paragraphs:
+        inserted = insert_products_table(root, items_data, paragraphs=table_paragraphs)
+        if hits is not None and inserted:
+            hits[TABLE_PLACEHOLDER] = hits.get(TABLE_PLACEHOLDER, 0) + inserted
+
+    return etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+def _convert_content_types(xml_bytes):
+    """Перетворює [Content_Types].xml з macro-enabled (.docm) формату у звичайний .docx"""
+    root = etree.fromstring(xml_bytes)
+    for override in list(root):
+        content_type = override.get("ContentType", "")
+        part_name = override.get("PartName", "")
+        if content_type == DOCM_MAIN_CONTENT_TYPE:
+            override.set("ContentType", DOCX_MAIN_CONTENT_TYPE)
+        elif "vbaProject" in part_name or "vbaData" in part_name or content_type.startswith("application/vnd.ms-office.vba"):
+            root.remove(override)
+        elif override.get("Extension") == "bin" and "vba" in content_type:
+            root.remove(override)
+    return etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+def _strip_vba_relationships(xml_bytes):
+    """Видаляє зв'язки з vbaProject.bin з word/_rels/document.xml.rels"""
+    root = etree.fromstring(xml_bytes)
+    for relationship in list(root):
+        if "vbaProject" in relationship.get("Type", "") or "vbaProject" in relationship.get("Target", ""):
+            root.remove(relationship)
+    return etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+
+def build_field_replacements(entries, placeholders=None):
+    """
+    Формує словник замін {"<поле>": "значення"} для непорожніх полів.
+    Якщо передано placeholders - беремо лише їх (як block["placeholders"] у COM-версії).
+    """
+    keys = placeholders if placeholders is not None else entries.keys()
+    replacements = {}
+    for key in keys:
+        value = entries.get(key)
+        if value:
+            replacements[f"<{key}>"] = value
+    return replacements
+
+
+def render_document_bytes(template_path, entries, items_data=None, people_replacements=None,
+                          placeholders=None, hits=None, plan=None):
+    """
+    Рендерить договір у пам'яті та повертає байти .docx.
+
+    Args:
+        template_path: шлях до .docm/.docx шаблону
+        entries: {поле: текст} (див. snapshot_block_entries)
+        items_data: товари для <таблиця_товарів>
+        people_replacements: результат people_manager.generate_replacements()
+        placeholders: обмеження списку полів (block["placeholders"])
+        hits: словник для статистики замін
+        plan: скомпільований план шаблону (render_plan.get_render_plan); частини без
+              плейсхолдерів копіюються без розбору XML
+    """
+    field_replacements = build_field_replacements(entries, placeholders)
+    people_replacements = people_replacements or {}
+    is_macro_enabled = False
+
+    output = io.BytesIO()
+    with zipfile.ZipFile(template_path) as source, \
+            zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as target:
+        names = source.namelist()
+        if CONTENT_TYPES_PART in names:
+            is_macro_enabled = DOCM_MAIN_CONTENT_TYPE.encode() in source.read(CONTENT_TYPES_PART)
+
+        for info in source.infolist():
+            name = info.filename
+            if is_macro_enabled and ("vbaProject" in name or "vbaData" in name):
+                continue
+
+            data = source.read(name)
+            if STORY_PART_PATTERN.match(name):
+                plan_part = plan["parts"].get(name) if plan is not None else None
+                if plan is None or plan_part is not None:
+                    data = render_story_part(
+                        data, field_replacements, people_replacements,
+                        items_data if name == "word/document.xml" else None,
+                        hits, plan_part
+                    )
+            elif is_macro_enabled and name == CONTENT_TYPES_PART:
+                data = _convert_content_types(data)
+            elif is_macro_enabled and name == DOCUMENT_RELS_PART:
+                data = _strip_vba_relationships(data)
+
+            target.writestr(info, data, compress_type=zipfile.ZIP_DEFLATED)
+
+    return output.getvalue()
+
+
+def render_document(template_path, save_path, entries, items_data=None, people_replacements=None,
+                    placeholders=None, hits=None, plan=None):
+    """Рендерить договір і записує його у save_path. Повертає save_path"""
+    data = render_document_bytes(template_path, entries, items_data, people_replacements, placeholders, hits,
+                                 plan)
+    with open(save_path, "wb") as f:
+        f.write(data)
+    return save_path
@@ -0,0 +1,136 @@
+# pdf_export.py
+# -*- coding: utf-8 -*-
+"""
+Експорт згенерованих договорів у PDF для бекенду без Word (OOXML).
+
+Використовується LibreOffice у headless-режимі. PdfExporter приймає готові .docx
+по одному і конвертує їх у фоновому потоці пачками, поки генеруються наступні
+договори. Одночасно працює лише один процес soffice з власним профілем, тому
+конвертація не конфліктує з LibreOffice, відкритим користувачем.
+
+Для бекенду Word PDF створюється одразу в COM-сесії (ExportAsFixedFormat).
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import subprocess
+
+from globals import LIBREOFFICE_PATH
+
+# Типові місця встановлення LibreOffice на Windows
+WINDOWS_SOFFICE_PATHS = [
+    r"C:\Program Files\LibreOffice\program\soffice.exe",
+    r"C:\Program Files (x86)\LibreOffice\program\soffice.exe",
+]
+
+# Обмеження часу на конвертацію однієї пачки (секунди)
+CONVERT_TIMEOUT = 300
+
+
+def get_pdf_path(docx_path):
+    """Шлях до PDF поруч з документом"""
+    return os.path.splitext(docx_path)[0] + ".pdf"
+
+
+def find_soffice():
+    """Повертає шлях до soffice або None, якщо LibreOffice не встановлено"""
+    if LIBREOFFICE_PATH and os.path.exists(LIBREOFFICE_PATH):
+        return LIBREOFFICE_PATH
+    for name in ("soffice", "libreoffice"):
+        path = shutil.which(name)
+        if path:
+            return path
+    for path in WINDOWS_SOFFICE_PATHS:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+class PdfExporter:
+    """Фонова черга конвертації .docx -> .pdf через LibreOffice"""
+
+    def __init__(self, soffice_path=None):
+        self.soffice_path = soffice_path or find_soffice()
+        self.results = {}
+        self._pending = []
+        self._condition = threading.Condition()
+        self._closed = False
+        self._profile_dir = None
+        self._thread = None
+
+    @property
+    def available(self):
+        return self.soffice_path is not None
+
+    def submit(self, docx_path):
+        """Додає документ у чергу конвертації (не блокує)"""
+        if not self.available:
+            self.results[docx_path] = (None, "LibreOffice не знайдено")
+            return
+        with self._condition:
+            self._pending.append(docx_path)
+            if self._thread is None:
+                self._profile_dir = tempfile.mkdtemp(prefix="sfa_lo_profile_")
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def finish(self):
+        """
+        Чекає завершення всіх конвертацій.
+
+        Returns:
+            {docx_path: (pdf_path або None, помилка або None)}
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            shutil.rmtree(self._profile_dir, ignore_errors=True)
+        return self.results
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and not self._closed:
+                    self._condition.wait()
+                if not self._pending:
+                    return
+                batch, self._pending = self._pending, []
+
+            # Пачка конвертується одним запуском soffice окремо для кожної папки
+            by_folder = {}
+            for docx_path in batch:
+                by_folder.setdefault(os.path.dirname(docx_path), []).append(docx_path)
+            for folder, paths in by_folder.items():
+                self._convert(folder, paths)
+
+    def _convert(self, folder, paths):
+        profile_url = "file:///" + self._profile_dir.replace("\\", "/").lstrip("/")
+        command = [
+            self.soffice_path,
+            f"-env:UserInstallation={profile_url}",
+            "--headless", "--norestore",
+            "--convert-to", "pdf",
+            "--outdir", folder,
+        ] + paths
+
+        error = None
+        try:
+            completed = subprocess.run(command, capture_output=True, timeout=CONVERT_TIMEOUT)
+            if completed.returncode != 0:
+                error = completed.stderr.decode("utf-8", errors="replace").strip() or f"код {completed.returncode}"
+        except Exception as e:
+            error = str(e)
+
+        for docx_path in paths:
+            pdf_path = get_pdf_path(docx_path)
+            if os.path.exists(pdf_path) and os.path.getmtime(pdf_path) >= os.path.getmtime(docx_path):
+                self.results[docx_path] = (pdf_path, None)
+                print(f"[DEBUG] PDF створено: {pdf_path}")
+            else:
+                self.results[docx_path] = (None, error or "PDF не створено")
+                print(f"[ERROR] Не вдалося створити PDF для {docx_path}: {error}")
@@ -0,0 +1,181 @@
+# people_directory.py
+# -*- coding: utf-8 -*-
+"""
+Довідник людей (посади, відмінки, плейсхолдери) та спеціальних ролей.
+
+Дані зберігаються у файлі people.json поруч з програмою - це єдине джерело
+довідника, тому додати людину можна без нової збірки. Без файлу довідник
+порожній (лише роль матеріально-відповідальної особи без вибору); пошкоджений
+файл не скидає вже завантажені дані. Причина в обох випадках - у load_error,
+програма показує її користувачу при запуску.
+
+Після завантаження будуються індекси: за id, за рангом (порядок у документах)
+і за плейсхолдером ({{PERSON_X}} -> (id, тип)). Файл перечитується без
+перезапуску програми, щойно змінюються його mtime або розмір; кожне
+перезавантаження збільшує revision (за ним інвалідуються кеші замін).
+
+Формат файлу:
+    {
+      "version": 1,
+      "people": {"<id>": {"name": ..., "rank": ..., "placeholders": {...}, ...}},
+      "special_roles": {"<role_id>": {"title": ..., "placeholder": ..., "options": [...], "default": ...}}
+    }
+"""
+
+import os
+import json
+import time
+import threading
+
+from utils import get_executable_dir
+
+PEOPLE_FILE_NAME = "people.json"
+PEOPLE_FILE_VERSION = 1
+
+# Вбудований довідник на випадок відсутності people.json: людей немає, спеціальні ролі без вибору
+DEFAULT_SPECIAL_ROLES = {
+    "material_responsible": {
+        "title": "Матеріально-відповідальна особа",
+        "placeholder": "{{MATERIAL_RESPONSIBLE}}",
+        "options": [None],
+        "default": None
+    }
+}
+
+# Як часто (секунди) перевіряти mtime файлу
+RELOAD_CHECK_INTERVAL = 1.0
+
+# Обов'язкові поля запису людини
+REQUIRED_PERSON_FIELDS = ("name", "position", "display_name", "rank", "position_dative", "name_dative",
+                          "placeholders")
+
+
+def validate_people(people, special_roles):
+    """Перевіряє структуру довідника; кидає ValueError з описом першої помилки"""
+    if not isinstance(people, dict) or not isinstance(special_roles, dict):
+        raise ValueError("'people' та 'special_roles' мають бути об'єктами")
+
+    tokens = set()
+    for person_id, person_data in people.items():
+        missing = [field for field in REQUIRED_PERSON_FIELDS if field not in person_data]
+        if missing:
+            raise ValueError(f"{person_id}: відсутні поля {', '.join(missing)}")
+        for kind in ("full_block", "name_only", "position_only"):
+            if kind not in person_data["placeholders"]:
+                raise ValueError(f"{person_id}: відсутній плейсхолдер {kind}")
+        for token in person_data["placeholders"].values():
+            if token in tokens:
+                raise ValueError(f"{person_id}: плейсхолдер {token} вже використовується")
+            tokens.add(token)
+
+    for role_id, role_config in special_roles.items():
+        for field in ("title", "placeholder", "options"):
+            if field not in role_config:
+                raise ValueError(f"{role_id}: відсутнє поле {field}")
+
+
+class PeopleDirectory:
+    """Довідник людей з індексами і гарячим перезавантаженням файлу"""
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(get_executable_dir(), PEOPLE_FILE_NAME)
+        self.revision = 0
+        # Текст помилки завантаження people.json (None - файл завантажено)
+        self.load_error = None
+        self._lock = threading.RLock()
+        self._file_signature = False  # файл ще не перевірявся (None - файлу немає)
+        self._last_check = 0.0
+        self._apply({}, DEFAULT_SPECIAL_ROLES)
+        self._reload_if_changed(force=True)
+
+    def _apply(self, people, special_roles):
+        """Встановлює дані та перебудовує індекси"""
+        self._people = dict(people)
+        self._special_roles = dict(special_roles)
+        self._by_rank = sorted(self._people.items(), key=lambda item: item[1]["rank"])
+        self._by_placeholder = {}
+        for person_id, person_data in self._people.items():
+            for kind, token in person_data["placeholders"].items():
+                self._by_placeholder[token] = (person_id, kind)
+        self.revision += 1
+
+    def _reload_if_changed(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._last_check < RELOAD_CHECK_INTERVAL:
+            return
+        with self._lock:
+            self._last_check = now
+            try:
+                stat = os.stat(self.path)
+                signature = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                signature = None
+
+            if signature == self._file_signature:
+                return
+            self._file_signature = signature
+
+            if signature is None:
+                self.load_error = f"Файл довідника людей не знайдено: {self.path}\nСписок людей порожній."
+                print(f"[WARNING] {self.load_error}")
+                self._apply({}, DEFAULT_SPECIAL_ROLES)
+                return
+
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("version") != PEOPLE_FILE_VERSION:
+                    raise ValueError(f"непідтримувана версія {data.get('version')}")
+                people = data.get("people", {})
+                special_roles = data.get("special_roles", DEFAULT_SPECIAL_ROLES)
+                validate_people(people, special_roles)
+                self._apply(people, special_roles)
+                self.load_error = None
+                print(f"[INFO] Завантажено довідник людей: {len(people)} осіб ({self.path})")
+            except Exception as e:
+                # Попередні дані лишаються чинними, поки файл не виправлять
+                self.load_error = f"Не вдалося завантажити довідник людей {self.path}:\n{e}"
+                print(f"[ERROR] {self.load_error}")
+
+    def reload(self):
+        """Примусово перечитує файл (якщо він змінився)"""
+        self._reload_if_changed(force=True)
+
+    @property
+    def people(self):
+        """{id: дані} у порядку файлу"""
+        self._reload_if_changed()
+        return self._people
+
+    @property
+    def special_roles(self):
+        self._reload_if_changed()
+        return self._special_roles
+
+    def get(self, person_id):
+        """Дані людини за id або None"""
+        self._reload_if_changed()
+        return self._people.get(person_id)
+
+    def by_rank(self, person_ids=None):
+        """[(id, дані)] за рангом (від старшого); person_ids - обмежити вибраними"""
+        self._reload_if_changed()
+        if person_ids is None:
+            return list(self._by_rank)
+        return [(person_id, data) for person_id, data in self._by_rank if person_id in person_ids]
+
+    def placeholder_index(self):
+        """{плейсхолдер людини: (id, тип плейсхолдера)}"""
+        self._reload_if_changed()
+        return self._by_placeholder
+
+    def all_placeholders(self):
+        """Усі плейсхолдери людей і спеціальних ролей"""
+        self._reload_if_changed()
+        placeholders = list(self._by_placeholder)
+        placeholders.extend(role_config["placeholder"] for role_config in self._special_roles.values())
+        return placeholders
+
+
+# Глобальний екземпляр довідника
+people_directory = PeopleDirectory()
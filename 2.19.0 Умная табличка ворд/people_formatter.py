@@ -1,6 +1,22 @@
 # people_formatter.py
 
-from globals import SPECIAL_ROLES, PEOPLE_CONFIG
+from people_directory import people_directory
+
+
+def get_person_placeholder_text(person_data, kind):
+    """Текст плейсхолдера людини за типом (full_block, name_only, ...); порожній для невідомого типу"""
+    if kind == "full_block":
+        return (
+            f"{person_data['position']}\r\n\r\n"
+            f"1___1________________2025 року \t\t\t\t{person_data['name']}\r\n"
+        )
+    if kind == "name_only":
+        return person_data['name']
+    if kind == "position_only":
+        return person_data['position']
+    if kind == "accusative_block":
+        return person_data.get('accusative_block', "")
+    return ""
 
 
 def generate_replacements(selected_people,
@@ -9,18 +25,15 @@ def generate_replacements(selected_people,
                           detect_used_part_placeholders_func,
                           invisible_char,
                           text=None):
-    """Генерує словник замін для шаблонів"""
+    """Генерує словник замін для шаблонів (дані людей - з індексів people_directory)"""
     print(f"[DEBUG] Generating replacements for selected people: {selected_people}")
     replacements = {}
+    special_roles = people_directory.special_roles
 
-    # 1. Плейсхолдери для всіх людей – пусті
-    for person_id, person_data in PEOPLE_CONFIG.items():
-        replacements[person_data['placeholders']['full_block']] = ""
-        replacements[person_data['placeholders']['name_only']] = ""
-        replacements[person_data['placeholders']['position_only']] = ""
-        # Додаємо accusative блоки - також спочатку пусті
-        if 'accusative_block' in person_data['placeholders']:
-            replacements[person_data['placeholders']['accusative_block']] = ""
+    # 1. Плейсхолдери всіх людей (індекс за плейсхолдером) – пусті
+    placeholder_index = people_directory.placeholder_index()
+    for placeholder in placeholder_index:
+        replacements[placeholder] = ""
 
     # 2. Плейсхолдери частин списку – невидимий символ
     if text:
@@ -34,7 +47,7 @@ def generate_replacements(selected_people,
     replacements["{{SELECTED_PEOPLE_LIST}}"] = invisible_char
     replacements["{{SELECTED_PEOPLE_PARTS_COUNT}}"] = "0"
 
-    for role_config in SPECIAL_ROLES.values():
+    for role_config in special_roles.values():
         replacements[role_config['placeholder']] = invisible_char
 
     # 5. Список людей
@@ -76,29 +89,16 @@ def generate_replacements(selected_people,
     else:
         print("[DEBUG] No people selected, all PART placeholders get invisible chars")
 
-    # 6. Індивідуальні плейсхолдери обраних людей
-    for person_id in selected_people:
-        person_data = PEOPLE_CONFIG.get(person_id)
-        if person_data:
-            full_block = (
-                f"{person_data['position']}\r\n\r\n"
-                f"1___1________________2025 року \t\t\t\t{person_data['name']}\r\n"
-            )
-            replacements[person_data['placeholders']['full_block']] = full_block
-            replacements[person_data['placeholders']['name_only']] = person_data['name']
-            replacements[person_data['placeholders']['position_only']] = person_data['position']
-
-            # Додаємо обробку accusative блоків
-            if 'accusative_block' in person_data['placeholders'] and 'accusative_block' in person_data:
-                replacements[person_data['placeholders']['accusative_block']] = person_data['accusative_block']
-                print(f"[DEBUG] Set accusative block for {person_id}: '{person_data['accusative_block']}'")
-
-            print(f"[DEBUG] Set placeholders for selected person: {person_id}")
+    # 6. Індивідуальні плейсхолдери обраних людей (через індекс за плейсхолдером)
+    for placeholder, (person_id, kind) in placeholder_index.items():
+        if person_id in selected_people:
+            replacements[placeholder] = get_person_placeholder_text(people_directory.get(person_id), kind)
+            print(f"[DEBUG] Set {placeholder} for selected person: {person_id}")
 
     # 7. Спеціальні ролі
-    for role_id, role_config in SPECIAL_ROLES.items():
+    for role_id, role_config in special_roles.items():
         selected_person_id = get_special_role_func(role_id)
-        person_data = PEOPLE_CONFIG.get(selected_person_id)
+        person_data = people_directory.get(selected_person_id)
         if person_data:
             if role_id == "material_responsible":
                 material_block = (
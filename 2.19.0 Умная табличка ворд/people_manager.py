@@ -4,10 +4,16 @@ import json
 import os
 import re
 
-from globals import SPECIAL_ROLES, PEOPLE_CONFIG
+from globals import PEOPLE_TEXT_DEBUG
+from people_directory import people_directory
 from utils import get_executable_dir
 from people_formatter import generate_replacements as external_generate_replacements
 
+# Будь-який плейсхолдер {{...}}, для якого немає заміни
+UNPROCESSED_PLACEHOLDER_PATTERN = r'\{\{[^}]+\}\}'
+# Невидимий символ або послідовність переносів разом з пробілами/невидимими символами після них
+CLEANUP_PATTERN = re.compile(r'\u200B|(?:\r\n|\r|\n)[\s\u200B]*')
+
 
 class PeopleManager:
     def __init__(self):
@@ -15,10 +21,14 @@ class PeopleManager:
         self.selected_people = set()
         self.special_roles_selection = {}
         self._after_jobs = set()  # Отслеживание активных after() задач
+        # Кеш словників замін: {(ревізія довідника, обрані люди, спеціальні ролі, використані PART): заміни}
+        self._replacements_cache = {}
+        self._substitution_patterns = {}
         self.load_settings()
 
     def load_settings(self):
         """Завантажує збережені налаштування людей"""
+        self.invalidate_replacements()
         try:
             if os.path.exists(self.settings_file):
                 with open(self.settings_file, 'r', encoding='utf-8') as f:
@@ -29,14 +39,14 @@ class PeopleManager:
             else:
                 # Налаштування за замовчуванням
                 self.special_roles_selection = {
-                    "material_responsible": SPECIAL_ROLES["material_responsible"]["default"]
+                    "material_responsible": people_directory.special_roles["material_responsible"]["default"]
                 }
                 print("[INFO] Використовуються налаштування за замовчуванням")
         except Exception as e:
             print(f"[ERROR] Помилка завантаження налаштувань людей: {e}")
             self.selected_people = set()
             self.special_roles_selection = {
-                "material_responsible": SPECIAL_ROLES["material_responsible"]["default"]
+                "material_responsible": people_directory.special_roles["material_responsible"]["default"]
             }
 
     def save_settings(self):
@@ -81,6 +91,7 @@ class PeopleManager:
             self.selected_people.remove(person_id)
         else:
             self.selected_people.add(person_id)
+        self.invalidate_replacements()
         self.save_settings()
 
     def is_person_selected(self, person_id):
@@ -89,54 +100,45 @@ class PeopleManager:
 
     def set_special_role(self, role_id, person_id):
         """Встановлює особу для спеціальної ролі"""
-        if role_id in SPECIAL_ROLES:
+        special_roles = people_directory.special_roles
+        if role_id in special_roles:
             # Дозволяємо встановлювати None або "NONE" для скасування призначення
-            if person_id in SPECIAL_ROLES[role_id]["options"] or person_id in [None, "NONE"]:
+            if person_id in special_roles[role_id]["options"] or person_id in [None, "NONE"]:
                 # Якщо передається "NONE", зберігаємо як None
                 if person_id == "NONE":
                     person_id = None
                 self.special_roles_selection[role_id] = person_id
+                self.invalidate_replacements()
                 self.save_settings()
 
     def get_special_role(self, role_id):
         """Отримує особу для спеціальної ролі"""
-        return self.special_roles_selection.get(role_id, SPECIAL_ROLES.get(role_id, {}).get("default"))
+        return self.special_roles_selection.get(role_id,
+                                                people_directory.special_roles.get(role_id, {}).get("default"))
 
     def get_person_data(self, person_id):
         """Отримує дані особи за ID"""
-        return PEOPLE_CONFIG.get(person_id)
+        return people_directory.get(person_id)
 
     def get_all_people(self):
         """Отримує всіх доступних людей"""
-        return PEOPLE_CONFIG
+        return people_directory.people
 
     def get_selected_people_ordered(self):
         """Повертає обраних людей, відсортованих за рангом (від старшого до молодшого)"""
-        selected_with_data = []
-        for person_id in self.selected_people:
-            person_data = PEOPLE_CONFIG.get(person_id)
-            if person_data:
-                selected_with_data.append((person_id, person_data))
-        selected_with_data.sort(key=lambda x: x[1]['rank'])
-        return selected_with_data
+        return people_directory.by_rank(self.selected_people)
 
     def generate_people_list_text(self):
         """Генерує текст зі списком обраних людей у дательному відмінку через кому"""
         material_person_id = self.get_special_role("material_responsible")
-        all_people_with_data = []
-
-        for person_id in self.selected_people:
-            person_data = PEOPLE_CONFIG.get(person_id)
-            if person_data:
-                all_people_with_data.append((person_id, person_data))
+        person_ids = set(self.selected_people)
 
         # Перевіряємо, чи material_person_id не None і не пустий рядок
-        if material_person_id and material_person_id not in self.selected_people:
-            material_person_data = PEOPLE_CONFIG.get(material_person_id)
-            if material_person_data:
-                all_people_with_data.append((material_person_id, material_person_data))
+        if material_person_id:
+            person_ids.add(material_person_id)
 
-        all_people_with_data.sort(key=lambda x: x[1]['rank'])
+        # Індекс довідника вже впорядкований за рангом
+        all_people_with_data = people_directory.by_rank(person_ids)
 
         print(f"[DEBUG] All people sorted by rank: {len(all_people_with_data)}")
 
@@ -214,91 +216,113 @@ class PeopleManager:
         text = re.sub(r'[ \t]+', ' ', text)
         return text.strip()
 
+    def invalidate_replacements(self):
+        """Скидає кеш замін (зміна вибору людей або спеціальних ролей)"""
+        self._replacements_cache.clear()
+
     # винесена функция в people_formatter
     def generate_replacements(self, text=None):
-        return external_generate_replacements(
-            selected_people = self.selected_people,
-            get_special_role_func = self.get_special_role,
-            generate_people_list_text_func = self.generate_people_list_text,
-            detect_used_part_placeholders_func = self.detect_used_part_placeholders,
-            invisible_char = self.get_invisible_placeholder(),
-            text = text
+        """
+        Словник замін для поточного вибору людей. Результат кешується за ключем
+        (ревізія довідника, обрані люди, спеціальні ролі, використані PART-плейсхолдери), тому
+        для серії договорів він обчислюється один раз. Повертається копія.
+        """
+        used_part_numbers = self.detect_used_part_placeholders(text) if text else None
+        key = (
+            people_directory.revision,
+            frozenset(self.selected_people),
+            tuple(self.get_special_role(role_id) for role_id in people_directory.special_roles),
+            frozenset(used_part_numbers) if used_part_numbers is not None else None,
         )
 
+        replacements = self._replacements_cache.get(key)
+        if replacements is None:
+            replacements = external_generate_replacements(
+                selected_people = self.selected_people,
+                get_special_role_func = self.get_special_role,
+                generate_people_list_text_func = self.generate_people_list_text,
+                detect_used_part_placeholders_func = lambda _text: used_part_numbers,
+                invisible_char = self.get_invisible_placeholder(),
+                text = text
+            )
+            self._replacements_cache[key] = replacements
+        return dict(replacements)
+
+
+    def get_substitution_pattern(self, replacements):
+        """
+        Один скомпільований регулярний вираз для всіх ключів замін (довші - першими) і,
+        останньою альтернативою, будь-якого іншого {{...}}. Кешується за набором ключів.
+        """
+        keys = frozenset(replacements)
+        pattern = self._substitution_patterns.get(keys)
+        if pattern is None:
+            alternatives = [re.escape(key) for key in sorted(keys, key=len, reverse=True) if key]
+            alternatives.append(UNPROCESSED_PLACEHOLDER_PATTERN)
+            pattern = re.compile("|".join(alternatives))
+            self._substitution_patterns.clear()
+            self._substitution_patterns[keys] = pattern
+        return pattern
 
     def process_document_text(self, text):
-        """Обробляє текст документа: виконує заміни та видаляє невикористані плейсхолдери"""
+        """
+        Обробляє текст документа: виконує заміни та видаляє невикористані плейсхолдери.
+        Усі заміни (і невикористані {{...}} -> невидимий символ) виконуються за один прохід.
+        """
         print("[DEBUG] Starting process_document_text")
-        original_text = text
+        original_length = len(text)
 
         # Передаємо текст у generate_replacements для аналізу використовуваних плейсхолдерів
         replacements = self.generate_replacements(text)
-        print(f"[DEBUG] Generated {len(replacements)} replacements")
+        invisible_char = self.get_invisible_placeholder()
+        replaced = set()
+        unprocessed = []
 
-        pattern = r'\{\{[^}]+\}\}'
-        placeholders_in_text = re.findall(pattern, text)
-        print(f"[DEBUG] Placeholders found in original text: {placeholders_in_text}")
+        def substitute(match):
+            placeholder = match.group(0)
+            if placeholder in replacements:
+                replaced.add(placeholder)
+                return replacements[placeholder]
+            unprocessed.append(placeholder)
+            return invisible_char
 
-        replacement_count = 0
-        invisible_char = self.get_invisible_placeholder()
+        text = self.get_substitution_pattern(replacements).sub(substitute, text)
 
-        for placeholder, replacement in replacements.items():
-            if placeholder in text:
-                old_text = text
-                text = text.replace(placeholder, replacement)
-                if old_text != text:
-                    replacement_count += 1
-                    if replacement and replacement != invisible_char:
-                        print(f"[DEBUG] Successfully replaced {placeholder} with content (length: {len(replacement)})")
-                    else:
-                        print(f"[DEBUG] Successfully replaced {placeholder} with removed content")
-
-        print(f"[DEBUG] Total successful replacements: {replacement_count}")
-
-        remaining_placeholders = re.findall(pattern, text)
-        if remaining_placeholders:
-            print(f"[WARNING] Remaining unprocessed placeholders: {remaining_placeholders}")
-            for placeholder in remaining_placeholders:
-                text = text.replace(placeholder, invisible_char)
-                print(f"[DEBUG] Replaced unprocessed placeholder with invisible char: {placeholder}")
+        print(f"[DEBUG] Total successful replacements: {len(replaced)} (of {len(replacements)})")
+        if unprocessed:
+            print(f"[WARNING] Unprocessed placeholders replaced with invisible char: {unprocessed}")
 
         # Применяем новую функцию очистки, чтобы убрать лишние пустые строки
         text = self.advanced_cleanup_document(text)
 
-        print(f"[DEBUG] Text processing completed. Original length: {len(original_text)}, Final length: {len(text)}")
+        print(f"[DEBUG] Text processing completed. Original length: {original_length}, Final length: {len(text)}")
         return text
 
     def advanced_cleanup_document(self, text):
-        import re
-        print("[DEBUG] Начинается advanced_cleanup_document")
-        print("[DEBUG] Исходный текст:")
-        print(text)
+        """
+        Очищення за один лінійний прохід: видаляє невидимі символи, нормалізує переноси
+        (CRLF/CR -> LF), послідовності з 3 і більше переносів (з пробілами між ними)
+        замінює рівно на 2 переноси; потім обрізає пробіли на краях.
+        """
+        if PEOPLE_TEXT_DEBUG:
+            print("[DEBUG] Начинается advanced_cleanup_document")
+            print("[DEBUG] Исходный текст:")
+            print(text)
 
-        # 1. Удаляем невидимые символы
         invisible_char = self.get_invisible_placeholder()
-        text = text.replace(invisible_char, '')
-        print("[DEBUG] После удаления невидимых символов:")
-        print(text)
-
-        # 2. Нормализуем переносы строк (CRLF/CR заменяем на LF)
-        text = re.sub(r'\r\n|\r', '\n', text)
-        print("[DEBUG] После нормализации переносов:")
-        print(text)
-
-        # 3. Многократно заменяем последовательности из 3 и более переносов (и пробельных символов) на ровно 2 переноса
-        pattern = re.compile(r'(?:\n\s*){3,}')
-        iteration = 1
-        while pattern.search(text):
-            print(f"[DEBUG] Итерация {iteration}: Найдена последовательность переносов, заменяем на '\\n\\n'")
-            text = pattern.sub("\n\n", text)
-            print("[DEBUG] Промежуточный результат:")
-            print(text)
-            iteration += 1
 
-        # 4. Обрезка пробелов в начале и в конце
-        text = text.strip()
-        print("[DEBUG] Финальный очищенный текст:")
-        print(text)
+        def clean(match):
+            chunk = match.group(0)
+            if chunk == invisible_char:
+                return ""
+            chunk = chunk.replace(invisible_char, "").replace("\r\n", "\n").replace("\r", "\n")
+            return "\n\n" if chunk.count("\n") >= 3 else chunk
+
+        text = CLEANUP_PATTERN.sub(clean, text).strip()
+
+        if PEOPLE_TEXT_DEBUG:
+            print("[DEBUG] Финальный очищенный текст:")
+            print(text)
 
         return text
 
@@ -306,7 +330,7 @@ class PeopleManager:
         """Генерує словник для видалення необраних людей з документа"""
         replacements = {}
         # Замість невидимого символа використовуємо порожній рядок (тобто – видаляємо блок)
-        for person_id, person_data in PEOPLE_CONFIG.items():
+        for person_id, person_data in people_directory.people.items():
             if person_id not in self.selected_people:
                 replacements[person_data['placeholders']['full_block']] = ""
                 replacements[person_data['placeholders']['name_only']] = ""
@@ -321,7 +345,7 @@ class PeopleManager:
         """Повертає короткий опис обраних людей"""
         ordered_people = self.get_selected_people_ordered()
         material_person_id = self.get_special_role("material_responsible")
-        material_person = PEOPLE_CONFIG.get(material_person_id)
+        material_person = people_directory.get(material_person_id)
         material_name = material_person['name'] if material_person else "Не вибрано"
 
         if not ordered_people and not material_person:
@@ -351,14 +375,13 @@ class PeopleManager:
     def get_people(self):
         """Повертає список всіх людей у форматі для нової системи"""
         people_list = []
-        for person_id, person_data in PEOPLE_CONFIG.items():
+        for person_id, person_data in people_directory.by_rank():
             people_list.append({
                 'ПІБ': person_data['name'],
                 'посада': person_data['position'],
                 'id': person_id,
                 'rank': person_data['rank']
             })
-        people_list.sort(key=lambda x: x['rank'])
         return people_list
 
     def get_person(self, index):
@@ -370,7 +393,7 @@ class PeopleManager:
 
     def get_person_count(self):
         """Повертає кількість людей"""
-        return len(PEOPLE_CONFIG)
+        return len(people_directory.people)
 
     def debug_test(self):
         """Тестовий метод для діагностики"""
@@ -2,7 +2,8 @@
 
 import customtkinter as ctk
 import tkinter.messagebox as messagebox
-from people_manager import people_manager, PEOPLE_CONFIG, SPECIAL_ROLES
+from people_manager import people_manager
+from people_directory import people_directory
 
 
 class PeopleSelectorDialog:
@@ -66,7 +67,7 @@ class PeopleSelectorDialog:
         section_label.pack(fill="x", pady=(0, 10))
 
         # Показываем всех людей, независимо от специальных ролей
-        for person_id, person_data in PEOPLE_CONFIG.items():
+        for person_id, person_data in people_directory.people.items():
             # Фрейм для кожної особи
             person_frame = ctk.CTkFrame(parent, fg_color="transparent")
             person_frame.pack(fill="x", pady=5)
@@ -95,7 +96,7 @@ class PeopleSelectorDialog:
         )
         section_label.pack(fill="x", pady=(0, 10))
 
-        for role_id, role_config in SPECIAL_ROLES.items():
+        for role_id, role_config in people_directory.special_roles.items():
             # Фрейм для ролі
             role_frame = ctk.CTkFrame(parent)
             role_frame.pack(fill="x", pady=10, padx=5)
@@ -125,7 +126,7 @@ class PeopleSelectorDialog:
                 none_radio.pack(anchor="w", padx=20, pady=2)
 
             for option_person_id in role_config['options']:
-                person_data = PEOPLE_CONFIG.get(option_person_id)
+                person_data = people_directory.get(option_person_id)
                 if person_data:
                     radio = ctk.CTkRadioButton(
                         role_frame,
@@ -267,7 +268,7 @@ class PeopleSelectorDialog:
             people_manager.selected_people.clear()
 
             # Скидаємо спеціальні ролі до значень за замовчуванням
-            for role_id, role_config in SPECIAL_ROLES.items():
+            for role_id, role_config in people_directory.special_roles.items():
                 people_manager.set_special_role(role_id, role_config['default'])
 
             # Оновлюємо інтерфейс
@@ -275,7 +276,7 @@ class PeopleSelectorDialog:
                 var.set(False)
 
             for role_id, var in self.special_role_vars.items():
-                default_value = SPECIAL_ROLES[role_id]['default']
+                default_value = people_directory.special_roles[role_id]['default']
                 var.set(default_value if default_value else "NONE")
 
             people_manager.save_settings()
@@ -320,7 +321,7 @@ class PeopleSelectorButton:
     def update_button_text(self):
         """Оновлює текст кнопки з кількістю обраних осіб"""
         count = people_manager.get_selected_count()
-        special_count = len([role for role in SPECIAL_ROLES.keys() if people_manager.get_special_role(role)])
+        special_count = len([role for role in people_directory.special_roles.keys() if people_manager.get_special_role(role)])
         total_count = count + special_count
 
         if total_count > 0:
@@ -0,0 +1,176 @@
+# placeholder_scanner.py
+# -*- coding: utf-8 -*-
+"""
+Потоковий сканер плейсхолдерів шаблонів .docx/.docm без Word і python-docx.
+
+Шаблон відкривається як zip, частини word/document.xml та колонтитули читаються
+через iterparse. Текст збирається так само, як його повертає Word
+(doc.Content.Text): кінець абзацу - '\\r', кінець комірки - '\\x07', кінець рядка
+таблиці - '\\r\\x07', табуляція - '\\t'. Тому розбиті на кілька w:r плейсхолдери
+знаходяться, а результат extract_placeholders() збігається з
+enhanced_extract_placeholders_from_word (включно з очищенням '\\r' / '\\x07').
+
+Модуль використовує тільки стандартну бібліотеку і не має спільного стану,
+тому його можна викликати з фонового потоку.
+"""
+
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+W_P = W_NS + "p"
+W_R = W_NS + "r"
+W_T = W_NS + "t"
+W_TAB = W_NS + "tab"
+W_BR = W_NS + "br"
+W_CR = W_NS + "cr"
+W_NO_BREAK_HYPHEN = W_NS + "noBreakHyphen"
+W_SOFT_HYPHEN = W_NS + "softHyphen"
+W_TBL = W_NS + "tbl"
+W_TR = W_NS + "tr"
+W_TC = W_NS + "tc"
+W_TXBX = W_NS + "txbxContent"
+W_TYPE = W_NS + "type"
+
+# Основний текст і колонтитули; document.xml завжди сканується першим
+STORY_PART_PATTERN = re.compile(r"^word/(document|header\d*|footer\d*)\.xml$")
+
+# Ті самі вирази, що й у enhanced_extract_placeholders_from_word
+ANGLE_PATTERN = re.compile(r'<([^>]+)>')
+BRACE_PATTERN = re.compile(r'\{([^}]+)\}')
+BRACE_KEYWORDS = ('people', 'person', 'selected', 'part')
+
+# Символи, які Word повертає для спеціальних елементів run-а
+RUN_CHARS = {
+    W_TAB: "\t",
+    W_CR: "\x0b",
+    W_NO_BREAK_HYPHEN: "\x1e",
+    W_SOFT_HYPHEN: "\x1f",
+}
+
+
+class StoryText:
+    """Текст однієї частини документу у форматі Word"""
+
+    def __init__(self, part_name):
+        self.part_name = part_name
+        self.full_text = ""
+        self.cell_texts = []
+        self.paragraphs = []
+
+
+def get_story_parts(zf):
+    """Повертає імена XML-частин з текстом: document.xml, потім колонтитули"""
+    names = [name for name in zf.namelist() if STORY_PART_PATTERN.match(name)]
+    return sorted(names, key=lambda name: (name != "word/document.xml", name))
+
+
+def read_story(stream, part_name=""):
+    """
+    Потоково читає XML-частину і збирає її текст.
+    Текстові поля (w:txbxContent) пропускаються, як і в doc.Content.Text.
+    """
+    story = StoryText(part_name)
+    parts = []
+    paragraph_start = 0
+    run_depth = 0
+    txbx_depth = 0
+    tbl_depth = 0
+    cell_start = None
+
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        tag = elem.tag
+
+        if event == "start":
+            if tag == W_TXBX:
+                txbx_depth += 1
+            elif txbx_depth:
+                continue
+            elif tag == W_R:
+                run_depth += 1
+            elif tag == W_P:
+                paragraph_start = len(parts)
+            elif tag == W_TBL:
+                tbl_depth += 1
+            elif tag == W_TC and tbl_depth == 1:
+                cell_start = len(parts)
+            continue
+
+        # event == "end"
+        if tag == W_TXBX:
+            txbx_depth -= 1
+            continue
+        if txbx_depth:
+            continue
+
+        if tag == W_T:
+            if elem.text:
+                parts.append(elem.text)
+        elif tag == W_R:
+            run_depth -= 1
+        elif run_depth and tag in RUN_CHARS:
+            parts.append(RUN_CHARS[tag])
+        elif run_depth and tag == W_BR:
+            parts.append("\x0c" if elem.get(W_TYPE) == "page" else "\x0b")
+        elif tag == W_P:
+            story.paragraphs.append("".join(parts[paragraph_start:]))
+            parts.append("\r")
+            elem.clear()
+        elif tag == W_TC:
+            parts.append("\x07")
+            if tbl_depth == 1 and cell_start is not None:
+                story.cell_texts.append("".join(parts[cell_start:]))
+                cell_start = None
+        elif tag == W_TR:
+            parts.append("\r\x07")
+        elif tag == W_TBL:
+            tbl_depth -= 1
+
+    story.full_text = "".join(parts)
+    return story
+
+
+def iter_template_stories(template_path):
+    """Послідовно повертає StoryText для document.xml і кожного колонтитула"""
+    with zipfile.ZipFile(template_path) as zf:
+        for part_name in get_story_parts(zf):
+            with zf.open(part_name) as stream:
+                yield read_story(stream, part_name)
+
+
+def extract_placeholders(template_path):
+    """
+    Витягує плейсхолдери так само, як enhanced_extract_placeholders_from_word:
+    імена <поле> без дужок і {..people/person/selected/part..} у фігурних дужках.
+    """
+    placeholders = set()
+
+    for story in iter_template_stories(template_path):
+        # Word додає текст кожної комірки таблиці ще раз після основного тексту
+        full_text = story.full_text + "".join(" " + cell for cell in story.cell_texts)
+
+        for match in ANGLE_PATTERN.findall(full_text):
+            # Очищуємо від спеціальних символів Word
+            clean_match = match.strip().replace('\r', '').replace('\x07', '').replace('\n', '')
+            if clean_match:
+                placeholders.add(clean_match)
+
+        for match in BRACE_PATTERN.findall(full_text):
+            clean_match = match.strip().replace('\r', '').replace('\x07', '').replace('\n', '')
+            if clean_match and any(keyword in clean_match.lower() for keyword in BRACE_KEYWORDS):
+                placeholders.add(f"{{{clean_match}}}")
+
+    return placeholders
+
+
+def find_bracket_placeholders(template_path):
+    """Повертає відсортований список плейсхолдерів <...> (з дужками), знайдених у межах абзаців"""
+    placeholders = set()
+
+    for story in iter_template_stories(template_path):
+        for paragraph in story.paragraphs:
+            for match in ANGLE_PATTERN.finditer(paragraph):
+                placeholders.add(match.group(0))
+
+    return sorted(placeholders)
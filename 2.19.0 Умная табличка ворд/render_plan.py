@@ -0,0 +1,231 @@
+# render_plan.py
+# -*- coding: utf-8 -*-
+"""
+Скомпільовані плани рендерингу шаблонів (для ooxml_renderer).
+
+Шаблон аналізується один раз: для кожної XML-частини запам'ятовується, в яких
+абзацах (індекс w:p у порядку документу) стоять плейсхолдери, які w:t вони
+займають, де якір <таблиця_товарів> і які плейсхолдери людей є в шаблоні.
+Під час генерації договору рендер обробляє тільки ці абзаци, а частини без
+плейсхолдерів копіює як є.
+
+Маркери людей ({{PERSON_*}}, {{*_NAME}}, {{SELECTED_PEOPLE_PART_n}}...) компілюються
+в умовні секції: для кожного маркера запам'ятовуються індекси абзаців, які існують
+лише тоді, коли людину обрано. Необрана людина видаляється за індексом абзацу,
+без пошуку маркера в документі.
+
+План зберігається поруч з шаблоном у "<шаблон>.plan.json" і перевіряється за
+розміром, mtime та SHA-256 шаблону - повторний аналіз потрібен лише після зміни файлу.
+"""
+
+import os
+import re
+import json
+import zipfile
+import threading
+
+from lxml import etree
+
+from ooxml_renderer import (STORY_PART_PATTERN, TABLE_PLACEHOLDER, DOCM_MAIN_CONTENT_TYPE, CONTENT_TYPES_PART,
+                            W_P, W_TC, paragraph_text_nodes)
+from placeholder_cache import file_sha256
+
+# Версія формату плану; зміна робить старі плани недійсними
+PLAN_VERSION = 2
+PLAN_SUFFIX = ".plan.json"
+
+# Поля <...> та плейсхолдери людей {{...}}
+PLAN_PLACEHOLDER_PATTERN = re.compile(r"<[^<>]+>|\{\{[^{}]+\}\}")
+PEOPLE_MARKER_PREFIX = "{{"
+
+_plans = {}
+_lock = threading.Lock()
+
+
+def get_plan_path(template_path):
+    """Шлях до файлу плану поруч з шаблоном"""
+    return template_path + PLAN_SUFFIX
+
+
+def _node_index(starts, offset):
+    """Індекс w:t, в якому знаходиться символ з позицією offset"""
+    index = 0
+    while index + 1 < len(starts) and starts[index + 1] <= offset:
+        index += 1
+    return index
+
+
+def _is_in_table_cell(paragraph):
+    parent = paragraph.getparent()
+    while parent is not None:
+        if parent.tag == W_TC:
+            return True
+        parent = parent.getparent()
+    return False
+
+
+def compile_story_part(xml_bytes):
+    """
+    Аналізує одну XML-частину. Повертає план частини або None, якщо плейсхолдерів немає.
+    """
+    root = etree.fromstring(xml_bytes)
+    paragraphs = []
+    table_anchors = []
+    # Умовні секції людей: {маркер: [індекси абзаців]} (індекс повторюється для кожного входження)
+    people_sections = {}
+    people_in_tables = False
+
+    for index, paragraph in enumerate(root.iter(W_P)):
+        nodes = paragraph_text_nodes(paragraph)
+        texts = [node.text or "" for node in nodes]
+        text = "".join(texts)
+        if "<" not in text and "{" not in text:
+            continue
+
+        occurrences = []
+        starts = []
+        position = 0
+        for node_text in texts:
+            starts.append(position)
+            position += len(node_text)
+
+        for match in PLAN_PLACEHOLDER_PATTERN.finditer(text):
+            occurrences.append([
+                match.group(0),
+                _node_index(starts, match.start()),
+                _node_index(starts, match.end() - 1),
+            ])
+
+        if not occurrences:
+            continue
+
+        paragraphs.append({
+            "index": index,
+            "nodes": len(nodes),
+            "placeholders": sorted({occurrence[0] for occurrence in occurrences}),
+            "occurrences": occurrences,
+        })
+        if TABLE_PLACEHOLDER in text:
+            table_anchors.append(index)
+
+        markers = [occurrence[0] for occurrence in occurrences if occurrence[0].startswith(PEOPLE_MARKER_PREFIX)]
+        for marker in markers:
+            people_sections.setdefault(marker, []).append(index)
+        if markers and _is_in_table_cell(paragraph):
+            people_in_tables = True
+
+    if not paragraphs:
+        return None
+    return {
+        "paragraphs": paragraphs,
+        "table_anchors": table_anchors,
+        "people_sections": people_sections,
+        "people_in_tables": people_in_tables,
+    }
+
+
+def compile_template(template_path):
+    """Компілює план рендерингу шаблону"""
+    stat = os.stat(template_path)
+    plan = {
+        "version": PLAN_VERSION,
+        "source": {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "sha256": file_sha256(template_path),
+        },
+        "macro_enabled": False,
+        "parts": {},
+        "field_placeholders": [],
+        "people_placeholders": [],
+    }
+
+    placeholders = set()
+    with zipfile.ZipFile(template_path) as zf:
+        names = zf.namelist()
+        if CONTENT_TYPES_PART in names:
+            plan["macro_enabled"] = DOCM_MAIN_CONTENT_TYPE.encode() in zf.read(CONTENT_TYPES_PART)
+
+        for name in names:
+            if not STORY_PART_PATTERN.match(name):
+                continue
+            part_plan = compile_story_part(zf.read(name))
+            if part_plan is None:
+                continue
+            plan["parts"][name] = part_plan
+            for entry in part_plan["paragraphs"]:
+                placeholders.update(entry["placeholders"])
+
+    plan["field_placeholders"] = sorted(p for p in placeholders if p.startswith("<"))
+    plan["people_placeholders"] = sorted(p for p in placeholders if p.startswith("{{"))
+    return plan
+
+
+def _is_plan_current(plan, stat, template_path):
+    """Перевіряє, що план складено для поточної версії шаблону"""
+    if not plan or plan.get("version") != PLAN_VERSION:
+        return False
+    source = plan.get("source", {})
+    if source.get("size") != stat.st_size:
+        return False
+    if source.get("mtime") == stat.st_mtime_ns:
+        return True
+    # mtime змінився (копіювання, перезбереження) - звіряємо вміст
+    if source.get("sha256") == file_sha256(template_path):
+        source["mtime"] = stat.st_mtime_ns
+        return True
+    return False
+
+
+def _load_plan_file(plan_path):
+    try:
+        if os.path.exists(plan_path):
+            with open(plan_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+    except Exception as e:
+        print(f"[WARNING] Не вдалося прочитати план шаблону {plan_path}: {e}")
+    return None
+
+
+def save_plan(plan, template_path):
+    """Атомарно записує план поруч з шаблоном (кілька воркерів можуть писати одночасно)"""
+    plan_path = get_plan_path(template_path)
+    tmp_path = f"{plan_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(plan, f, ensure_ascii=False)
+        os.replace(tmp_path, plan_path)
+    except Exception as e:
+        # Папка шаблонів може бути тільки для читання - план лишається в пам'яті
+        print(f"[WARNING] Не вдалося зберегти план шаблону {plan_path}: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def get_render_plan(template_path):
+    """
+    Повертає актуальний план шаблону: з пам'яті, з файлу поруч з шаблоном
+    або компілює новий. None - якщо шаблон не вдалося проаналізувати.
+    """
+    template_path = os.path.abspath(template_path)
+    try:
+        stat = os.stat(template_path)
+        with _lock:
+            plan = _plans.get(template_path)
+            if _is_plan_current(plan, stat, template_path):
+                return plan
+
+            plan = _load_plan_file(get_plan_path(template_path))
+            if not _is_plan_current(plan, stat, template_path):
+                print(f"[DEBUG] Компіляція плану шаблону: {os.path.basename(template_path)}")
+                plan = compile_template(template_path)
+                save_plan(plan, template_path)
+
+            _plans[template_path] = plan
+            return plan
+
+    except Exception as e:
+        print(f"[ERROR] Не вдалося скомпілювати план шаблону {template_path}: {e}")
+        return None
@@ -42,13 +42,20 @@ def save_current_state(document_blocks, tabview):
                 "entries": {}
             }
 
-            # Зберігаємо дані з полів
+            # Зберігаємо дані з полів (товари - окремо, списком)
             for field_key, entry_widget in block.get("entries", {}).items():
+                if isinstance(entry_widget, (list, bool)):
+                    continue
                 try:
                     block_data["entries"][field_key] = entry_widget.get()
                 except:
                     block_data["entries"][field_key] = ""
 
+            # Товари таблиці товарів (їх читає і batch_generate)
+            if block.get("has_products_table"):
+                items = block.get("items")
+                block_data["products"] = items() if callable(items) else block.get("entries", {}).get("products", [])
+
             state["document_blocks"].append(block_data)
 
         # Запис у файл
@@ -172,6 +179,9 @@ def restore_application_state(state, tabview, main_frame):
                     if last_block.get("tab_name") == tab_name:
                         #print(f"[INFO] Відновлюємо дані для {len(entries_data)} полів")
 
+                        if block_data.get("products") and callable(last_block.get("set_items")):
+                            last_block["set_items"](block_data["products"])
+
                         for field_key, saved_value in entries_data.items():
                             if field_key in last_block["entries"]:
                                 entry_widget = last_block["entries"][field_key]
@@ -0,0 +1,110 @@
+# template_cache.py
+# -*- coding: utf-8 -*-
+"""
+Кеш розібраних файлів (шаблонів і книг Excel) на час роботи програми.
+
+Запис прив'язаний до підпису файлу (mtime і розмір): якщо файл змінився на
+диску, наступне звертання розбирає його знову. Два режими:
+
+- get(path, loader) - спільний незмінний знімок (розібраний шаблон кошторису).
+  Його можуть одночасно читати кілька генерацій; зміни робляться у власних
+  копіях (див. koshtorys_xml.KoshtorysSheet).
+- take(path) / put(path, value) - змінюваний об'єкт (книга openpyxl бази даних).
+  take віддає об'єкт у виняткове користування і прибирає його з кешу; після
+  збереження файлу put повертає його з новим підписом. Якщо збереження не
+  вдалося, об'єкт просто не повертається - наступне звертання прочитає файл.
+
+    template = template_cache.get(path, KoshtorysTemplate)
+"""
+
+import os
+import threading
+
+
+def get_file_signature(path):
+    """(mtime_ns, розмір) файлу або None, якщо файлу немає"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class TemplateCache:
+    """Кеш розібраних файлів з інвалідацією за mtime"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._loading = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(path, kind):
+        return kind, os.path.normcase(os.path.abspath(path))
+
+    def get(self, path, loader, kind="template"):
+        """
+        Спільний знімок файлу: loader(path) викликається тільки при першому
+        звертанні або після зміни файлу. Знімок не можна змінювати.
+        """
+        key = self._key(path, kind)
+        signature = get_file_signature(path)
+        if signature is None:
+            raise FileNotFoundError(f"Файл не знайдено: {path}")
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self.hits += 1
+                return entry[1]
+            # Один розбір на файл, навіть якщо його одночасно просять кілька потоків
+            key_lock = self._loading.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] == signature:
+                    self.hits += 1
+                    return entry[1]
+                self.misses += 1
+
+            value = loader(path)
+            print(f"[DEBUG] Кеш шаблонів: розібрано {path}")
+            with self._lock:
+                self._entries[key] = (signature, value)
+            return value
+
+    def take(self, path, kind="workbook"):
+        """Забирає змінюваний об'єкт з кешу (None, якщо його немає або файл змінився)"""
+        key = self._key(path, kind)
+        signature = get_file_signature(path)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is None or signature is None or entry[0] != signature:
+            return None
+        self.hits += 1
+        return entry[1]
+
+    def put(self, path, value, kind="workbook"):
+        """Кладе об'єкт, що відповідає щойно записаному файлу path"""
+        signature = get_file_signature(path)
+        if signature is None:
+            return
+        with self._lock:
+            self._entries[self._key(path, kind)] = (signature, value)
+
+    def invalidate(self, path=None):
+        """Скидає записи файлу path (усі записи, якщо path не вказано)"""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                return
+            normalized = os.path.normcase(os.path.abspath(path))
+            for key in [key for key in self._entries if key[1] == normalized]:
+                del self._entries[key]
+
+
+# Глобальний екземпляр кешу
+template_cache = TemplateCache()
@@ -2,6 +2,7 @@
 
 import os
 import sys
+import threading
 from people_manager import people_manager
 
 
@@ -117,28 +118,50 @@ def print_folder_info():
 
 def get_people_placeholders():
     """Повертає всі плейсхолдери людей для включення в загальний список"""
-    from people_manager import PEOPLE_CONFIG, SPECIAL_ROLES
+    from people_directory import people_directory
 
-    placeholders = []
+    return people_directory.all_placeholders()
 
-    # Додаємо плейсхолдери основних осіб
-    for person_data in PEOPLE_CONFIG.values():
-        for placeholder in person_data['placeholders'].values():
-            placeholders.append(placeholder)
 
-    # Додаємо плейсхолдери спеціальних ролей
-    for role_data in SPECIAL_ROLES.values():
-        placeholders.append(role_data['placeholder'])
+def get_templates_placeholders():
+    """Повертає плейсхолдери полів <поле> з усіх шаблонів (через дисковий кеш)"""
+    # Імпорт тут, щоб не тягнути generation при завантаженні модуля
+    from generation import enhanced_extract_placeholders_from_word
 
-    return placeholders
+    placeholders = set()
+    for template_path in get_available_templates().values():
+        for name in enhanced_extract_placeholders_from_word(template_path):
+            # Плейсхолдери людей вже враховані в get_people_placeholders
+            if not name.startswith("{"):
+                placeholders.add(f"<{name}>")
+
+    return sorted(placeholders)
+
+
+def warm_up_placeholder_cache():
+    """
+    Заповнює кеш плейсхолдерів для всіх шаблонів у фоновому потоці,
+    щоб перша генерація не чекала на сканування
+    """
+    from placeholder_cache import get_cached_placeholders
+    from placeholder_scanner import extract_placeholders
+
+    def scan_all():
+        for template_path in get_available_templates().values():
+            get_cached_placeholders(template_path, extract_placeholders, kind="zip")
+        print("[DEBUG] Кеш плейсхолдерів шаблонів оновлено")
+
+    thread = threading.Thread(target=scan_all, daemon=True)
+    thread.start()
+    return thread
 
 
 def get_all_available_placeholders():
     """Повертає всі доступні плейсхолдери включаючи людей"""
     people_placeholders = get_people_placeholders()
 
-    # Тут можна додати інші типи плейсхолдерів якщо потрібно
-    all_placeholders = people_placeholders
+    # Поля шаблонів беруться з кешу плейсхолдерів
+    all_placeholders = people_placeholders + get_templates_placeholders()
 
     return all_placeholders
 
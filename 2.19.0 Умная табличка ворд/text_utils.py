@@ -1,27 +1,132 @@
-from num2words import num2words
+# text_utils.py
+# -*- coding: utf-8 -*-
+"""
+Сума прописом українською ("Сто двадцять гривень, 05 копійок.") без сторонніх бібліотек.
 
-def number_to_ukrainian_text(amount):
-    try:
-        amount = float(str(amount).replace(",", "."))
-    except:
-        return "Нуль гривень, 00 копійок."
-
-    integer_part = int(amount)
-    fractional_part = int(round((amount - integer_part) * 100))
-
-    # Текстова частина суми
-    words = num2words(integer_part, lang='uk')
-
-    # Узгодження "гривня"
-    def plural(n, forms):
-        if n % 10 == 1 and n % 100 != 11:
-            return forms[0]
-        elif 2 <= n % 10 <= 4 and not (12 <= n % 100 <= 14):
-            return forms[1]
+Число розбивається на трійки цифр; слова для кожної трійки (0-999) беруться
+з готових таблиць для чоловічого і жіночого роду, тож перетворення - це кілька
+звертань до списків. Результат кешується за сумою в копійках, тому повторні
+перерахунки (поля "сума прописом" при кожному натисканні клавіші) не рахують
+текст знову.
+
+Текст збігається з num2words(n, lang='uk'); перевірка: tests/test_number_to_text.py
+"""
+
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import lru_cache
+
+UNITS_MALE = ["", "один", "два", "три", "чотири", "п'ять", "шість", "сім", "вісім", "дев'ять"]
+UNITS_FEMALE = ["", "одна", "дві", "три", "чотири", "п'ять", "шість", "сім", "вісім", "дев'ять"]
+TEENS = ["десять", "одинадцять", "дванадцять", "тринадцять", "чотирнадцять", "п'ятнадцять",
+         "шістнадцять", "сімнадцять", "вісімнадцять", "дев'ятнадцять"]
+TENS = ["", "", "двадцять", "тридцять", "сорок", "п'ятдесят", "шістдесят", "сімдесят", "вісімдесят",
+        "дев'яносто"]
+HUNDREDS = ["", "сто", "двісті", "триста", "чотириста", "п'ятсот", "шістсот", "сімсот", "вісімсот",
+            "дев'ятсот"]
+
+# Розряди: (форми для 1 / 2-4 / 5+, жіночий рід)
+SCALES = [
+    (("", "", ""), False),
+    (("тисяча", "тисячі", "тисяч"), True),
+    (("мільйон", "мільйони", "мільйонів"), False),
+    (("мільярд", "мільярди", "мільярдів"), False),
+    (("трильйон", "трильйони", "трильйонів"), False),
+    (("квадрильйон", "квадрильйони", "квадрильйонів"), False),
+    (("квінтильйон", "квінтильйони", "квінтильйонів"), False),
+]
+
+HRYVNIA_FORMS = ("гривня", "гривні", "гривень")
+KOPECK_FORMS = ("копійка", "копійки", "копійок")
+
+# Скільки різних сум тримати в кеші
+TEXT_CACHE_SIZE = 4096
+
+INVALID_AMOUNT_TEXT = "Нуль гривень, 00 копійок."
+
+
+def _build_triplets(units):
+    """Таблиця слів для чисел 0-999 (індекс - число)"""
+    triplets = []
+    for number in range(1000):
+        hundreds, rest = divmod(number, 100)
+        words = [HUNDREDS[hundreds]]
+        if 10 <= rest <= 19:
+            words.append(TEENS[rest - 10])
         else:
-            return forms[2]
+            words.append(TENS[rest // 10])
+            words.append(units[rest % 10])
+        triplets.append(" ".join(word for word in words if word))
+    return triplets
+
+
+TRIPLETS_MALE = _build_triplets(UNITS_MALE)
+TRIPLETS_FEMALE = _build_triplets(UNITS_FEMALE)
 
-    hryvnia_word = plural(integer_part, ["гривня", "гривні", "гривень"])
-    kopiyky_word = plural(fractional_part, ["копійка", "копійки", "копійок"])
 
-    return f"{words} {hryvnia_word}, {fractional_part:02d} {kopiyky_word}."
+def plural(n, forms):
+    """Форма слова для числа n: 1 гривня, 2 гривні, 5 гривень"""
+    n = abs(n)
+    if n % 10 == 1 and n % 100 != 11:
+        return forms[0]
+    elif 2 <= n % 10 <= 4 and not (12 <= n % 100 <= 14):
+        return forms[1]
+    else:
+        return forms[2]
+
+
+def integer_to_words(number):
+    """Ціле число словами (чоловічий рід): 21001 -> "двадцять одна тисяча один" """
+    if number == 0:
+        return "нуль"
+    if number < 0:
+        return "мінус " + integer_to_words(-number)
+    if number >= 1000 ** len(SCALES):
+        raise ValueError(f"Число {number} завелике для перетворення в текст")
+
+    words = []
+    scale = 0
+    while number:
+        number, triplet = divmod(number, 1000)
+        if triplet:
+            forms, female = SCALES[scale]
+            if scale:
+                words.append(plural(triplet, forms))
+            words.append((TRIPLETS_FEMALE if female else TRIPLETS_MALE)[triplet])
+        scale += 1
+    return " ".join(reversed(words))
+
+
+def to_kopecks(amount):
+    """Сума (число або рядок з комою/крапкою) в цілих копійках; None, якщо це не число"""
+    try:
+        value = Decimal(str(amount).replace(",", ".").replace(" ", "").strip())
+        if not value.is_finite():
+            return None
+        # quantize теж кидає InvalidOperation, якщо цілих цифр більше за точність контексту
+        return int((value * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except InvalidOperation:
+        return None
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def kopecks_to_ukrainian_text(kopecks):
+    """Сума в копійках прописом: 12005 -> "сто двадцять гривень, 05 копійок." """
+    hryvnias, kopiyky = divmod(abs(kopecks), 100)
+    words = integer_to_words(hryvnias)
+    if kopecks < 0:
+        words = "мінус " + words
+
+    return f"{words} {plural(hryvnias, HRYVNIA_FORMS)}, {kopiyky:02d} {plural(kopiyky, KOPECK_FORMS)}."
+
+
+def number_to_ukrainian_text(amount):
+    """Сума прописом: 120.05 або "120,05" -> "сто двадцять гривень, 05 копійок." """
+    kopecks = to_kopecks(amount)
+    if kopecks is None:
+        return INVALID_AMOUNT_TEXT
+    try:
+        return kopecks_to_ukrainian_text(kopecks)
+    except ValueError as e:
+        # Сума більша за найбільший розряд (SCALES)
+        print(f"[WARNING] {e}")
+        return INVALID_AMOUNT_TEXT
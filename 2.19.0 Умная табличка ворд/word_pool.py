@@ -0,0 +1,275 @@
+# word_pool.py
+# -*- coding: utf-8 -*-
+"""
+Пул довгоживучих сесій Microsoft Word (COM).
+
+Замість запуску і Quit() окремого WINWORD.EXE для кожного шаблону всі COM-операції
+позичають вже запущений Word з пулу:
+    with word_pool.session() as word_app:
+        doc = word_app.Documents.Open(path)
+
+- Word запускається ліниво, при першому запиті;
+- перед видачею сесія перевіряється (health check), мертва сесія перезапускається;
+- сторожовий потік завершує процес Word, який "завис" довше WORD_POOL_HANG_TIMEOUT;
+- Word, що простоює довше WORD_POOL_IDLE_TIMEOUT, закривається автоматично.
+
+COM-об'єкти прив'язані до потоку, який їх створив, тому сесія видається
+тільки своєму потоку-власнику.
+"""
+
+import time
+import uuid
+import atexit
+import threading
+import traceback
+from contextlib import contextmanager
+
+# win32com доступний тільки на Windows з встановленим Word
+try:
+    import pythoncom
+    import win32api
+    import win32con
+    import win32gui
+    import win32process
+    import win32com.client as win32
+
+    WORD_AVAILABLE = True
+except ImportError:
+    pythoncom = None
+    win32 = None
+    WORD_AVAILABLE = False
+
+from globals import WORD_POOL_SIZE, WORD_POOL_IDLE_TIMEOUT, WORD_POOL_HANG_TIMEOUT
+
+# Як часто сторожовий потік перевіряє сесії (секунди)
+WATCHDOG_INTERVAL = 5
+
+
+class WordSession:
+    """Один запущений процес Word, прив'язаний до потоку-власника"""
+
+    def __init__(self):
+        self.owner_thread = threading.get_ident()
+        self.app = None
+        self.pid = None
+        self.leased_at = None
+        self.last_used = time.monotonic()
+        self.dead = False
+        self._quit_stream = None
+
+    def start(self):
+        """Запускає окремий (не користувацький) екземпляр Word"""
+        pythoncom.CoInitialize()
+
+        # DispatchEx завжди створює новий процес, тому Quit() не закриє Word користувача
+        self.app = win32.gencache.EnsureDispatch(win32.DispatchEx('Word.Application'))
+        self.app.Visible = False
+        self.app.DisplayAlerts = 0  # wdAlertsNone
+        self.pid = self._find_pid()
+
+        # Маршалізований інтерфейс для коректного Quit() зі сторожового потоку
+        self._quit_stream = pythoncom.CoMarshalInterThreadInterfaceInStream(
+            pythoncom.IID_IDispatch, self.app._oleobj_
+        )
+        print(f"[DEBUG] Word запущено (PID: {self.pid})")
+
+    def _find_pid(self):
+        """Визначає PID процесу Word через тимчасовий унікальний заголовок вікна"""
+        try:
+            marker = f"WordPool-{uuid.uuid4().hex}"
+            self.app.Caption = marker
+            hwnd = win32gui.FindWindow("OpusApp", marker)
+            self.app.Caption = ""
+            if hwnd:
+                return win32process.GetWindowThreadProcessId(hwnd)[1]
+        except Exception as e:
+            print(f"[WARNING] Не вдалося визначити PID процесу Word: {e}")
+        return None
+
+    def is_healthy(self):
+        """Перевіряє, що Word відповідає на COM-виклики"""
+        if self.dead or self.app is None:
+            return False
+        try:
+            self.app.Documents.Count
+            return True
+        except Exception as e:
+            print(f"[WARNING] Сесія Word не відповідає: {e}")
+            return False
+
+    def close_documents(self):
+        """Закриває документи, які залишились відкритими після попереднього використання"""
+        try:
+            while self.app.Documents.Count > 0:
+                self.app.Documents(1).Close(False)
+        except Exception as e:
+            print(f"[WARNING] Не вдалося закрити документи Word: {e}")
+            self.dead = True
+
+    def quit(self, from_owner=True):
+        """Закриває Word; з чужого потоку - через маршалізований інтерфейс"""
+        try:
+            if from_owner and self.app is not None:
+                self.app.Quit()
+            elif self._quit_stream is not None:
+                pythoncom.CoInitialize()
+                try:
+                    dispatch = pythoncom.CoGetInterfaceAndReleaseStream(
+                        self._quit_stream, pythoncom.IID_IDispatch
+                    )
+                    self._quit_stream = None
+                    win32.Dispatch(dispatch).Quit()
+                finally:
+                    pythoncom.CoUninitialize()
+            else:
+                self.kill()
+        except Exception as e:
+            print(f"[WARNING] Word не закрився штатно ({e}), завершуємо процес")
+            self.kill()
+        finally:
+            self.dead = True
+            if from_owner:
+                self.app = None
+
+    def kill(self):
+        """Примусово завершує процес Word (для зависання)"""
+        self.dead = True
+        if not self.pid:
+            return
+        try:
+            handle = win32api.OpenProcess(win32con.PROCESS_TERMINATE, False, self.pid)
+            win32api.TerminateProcess(handle, 1)
+            win32api.CloseHandle(handle)
+            print(f"[WARNING] Процес Word (PID: {self.pid}) примусово завершено")
+        except Exception as e:
+            print(f"[ERROR] Не вдалося завершити процес Word (PID: {self.pid}): {e}")
+
+
+class WordPool:
+    """Пул сесій Word зі здоров'ям, перезапуском і автозакриттям при простої"""
+
+    def __init__(self, size=WORD_POOL_SIZE, idle_timeout=WORD_POOL_IDLE_TIMEOUT,
+                 hang_timeout=WORD_POOL_HANG_TIMEOUT):
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.hang_timeout = hang_timeout
+        self._sessions = []
+        self._lock = threading.Lock()
+        self._watchdog = None
+
+    def _acquire(self):
+        """Видає вільну здорову сесію поточного потоку або запускає нову"""
+        if not WORD_AVAILABLE:
+            raise RuntimeError("Microsoft Word недоступний: pywin32 не встановлено")
+
+        thread_id = threading.get_ident()
+        while True:
+            with self._lock:
+                own_sessions = [s for s in self._sessions if s.owner_thread == thread_id]
+                session = next((s for s in own_sessions if s.leased_at is None), None)
+                is_new = session is None
+                if is_new:
+                    if len(own_sessions) >= self.size:
+                        raise RuntimeError("Усі сесії Word зайняті")
+                    session = WordSession()
+                    self._sessions.append(session)
+                session.leased_at = time.monotonic()
+
+            if is_new:
+                try:
+                    session.start()
+                except Exception:
+                    self._discard(session)
+                    raise
+                self._ensure_watchdog()
+                return session
+
+            # Health check поза блокуванням: завислий Word не повинен блокувати сторожа
+            if session.is_healthy():
+                return session
+
+            print("[DEBUG] Перезапуск несправної сесії Word")
+            self._discard(session)
+
+    def _discard(self, session):
+        """Прибирає сесію з пулу і завершує її процес"""
+        with self._lock:
+            if session in self._sessions:
+                self._sessions.remove(session)
+        if not session.dead:
+            session.kill()
+
+    def _release(self, session):
+        """Повертає сесію в пул, прибираючи відкриті документи"""
+        if not session.dead:
+            session.close_documents()
+        session.leased_at = None
+        session.last_used = time.monotonic()
+
+        if session.dead:
+            self._discard(session)
+
+    @contextmanager
+    def session(self):
+        """Позичає Word.Application з пулу на час блоку with"""
+        session = self._acquire()
+        try:
+            yield session.app
+        except Exception:
+            # Після збою COM перевіряємо, чи Word ще живий
+            if not session.dead and not session.is_healthy():
+                session.kill()
+            raise
+        finally:
+            self._release(session)
+
+    def _ensure_watchdog(self):
+        if self._watchdog is None or not self._watchdog.is_alive():
+            self._watchdog = threading.Thread(target=self._watch, daemon=True)
+            self._watchdog.start()
+
+    def _watch(self):
+        """Сторожовий потік: завершує завислі та простоюючі сесії"""
+        while True:
+            time.sleep(WATCHDOG_INTERVAL)
+            now = time.monotonic()
+            expired = []
+
+            with self._lock:
+                for session in list(self._sessions):
+                    if session.leased_at is not None:
+                        if not session.dead and now - session.leased_at > self.hang_timeout:
+                            print(f"[WARNING] Word не відповідає понад {self.hang_timeout} с")
+                            session.kill()
+                    elif now - session.last_used > self.idle_timeout:
+                        print(f"[DEBUG] Word простоює понад {self.idle_timeout} с, закриваємо")
+                        self._sessions.remove(session)
+                        expired.append(session)
+
+                if not self._sessions:
+                    self._watchdog = None
+
+            for session in expired:
+                session.quit(from_owner=False)
+
+            if self._watchdog is None:
+                return
+
+    def shutdown(self):
+        """Закриває всі сесії (викликається при виході з програми)"""
+        with self._lock:
+            sessions = list(self._sessions)
+            self._sessions.clear()
+
+        thread_id = threading.get_ident()
+        for session in sessions:
+            try:
+                session.quit(from_owner=session.owner_thread == thread_id)
+            except Exception as e:
+                print(f"[ERROR] Помилка при закритті Word: {e}")
+                traceback.print_exc()
+
+
+# Глобальний екземпляр
+word_pool = WordPool()
+atexit.register(word_pool.shutdown)
@@ -0,0 +1,338 @@
+# word_renderer.py
+# -*- coding: utf-8 -*-
+"""
+Обробка відкритого документу Word (COM): заміна плейсхолдерів полів і людей,
+вставка таблиці товарів.
+
+Модуль не імпортує GUI (tkinter, віджети), тому його використовують воркери
+пулу генерації (generation_scheduler) - процес воркера завантажує лише те,
+що потрібно для рендеру договору.
+"""
+
+import re
+import traceback
+from bisect import bisect_left
+
+# win32com доступний тільки на Windows з встановленим Word
+try:
+    import win32com.client as win32
+except ImportError:
+    win32 = None
+
+from people_manager import people_manager
+from ooxml_renderer import get_entry_text, build_placeholder_pattern, build_products_table_flat_opc
+from render_plan import get_render_plan
+from contract_renderer import validate_items_data
+
+
+def process_people_placeholders_in_document(doc, people_replacements=None, plan=None):
+    """
+    Обробляє плейсхолдери людей у документі Word за один прохід (apply_replacements_single_pass).
+    people_replacements можна передати готовими (воркер генерації не має доступу до GUI).
+    plan - план шаблону (render_plan): обробляються лише маркери, скомпільовані в умовні секції
+    шаблону, без пошуку кожної людини та альтернативних форматів.
+
+    Returns:
+        Словник {плейсхолдер: кількість замін}
+    """
+    try:
+        if people_replacements is None:
+            people_replacements = people_manager.generate_replacements()
+
+        if not people_replacements:
+            return {}
+
+        full_text = doc.Content.Text
+        known_people = plan.get("people_placeholders") if plan is not None else None
+        replacements = collect_document_replacements({}, [], people_replacements, full_text, known_people)
+
+        # Порожня заміна видаляє абзац (у комірці таблиці - лише сам маркер)
+        return apply_replacements_single_pass(doc, full_text, replacements, set(replacements))
+
+    except Exception as e:
+        print(f"[ERROR] Загальна помилка при обробці плейсхолдерів людей: {e}")
+        traceback.print_exc()
+        return {}
+
+
+# Маркер кінця комірки/рядка: у Content.Text це два символи, а в позиціях Range - один
+CELL_END_MARK = "\r\x07"
+TABLE_PLACEHOLDER = "<таблиця_товарів>"
+
+
+def collect_document_replacements(block, block_placeholders, people_replacements, full_text, known_people=None):
+    """
+    Збирає всі заміни документу в один словник {плейсхолдер: текст}.
+    Порожній текст у замінах людей означає видалення абзацу (як у process_people_placeholders_in_document).
+    known_people - маркери людей з плану шаблону; інші маркери пропускаються без пошуку в тексті.
+    """
+    replacements = {}
+    entries = block.get("entries", {})
+
+    for key in block_placeholders:
+        # Таблиця товарів вставляється окремо (replace_table_placeholders)
+        if key in entries and entries[key] and not isinstance(entries[key], (bool, list, dict)):
+            if f"<{key}>" != TABLE_PLACEHOLDER:
+                replacements[f"<{key}>"] = get_entry_text(entries[key])
+
+    for placeholder, replacement in (people_replacements or {}).items():
+        # Word розриває абзац на "\r" - аналог "^p" у Find
+        replacement = replacement.replace("\r\n", "\r")
+        if known_people is not None:
+            if placeholder in known_people:
+                replacements[placeholder] = replacement
+            continue
+        if placeholder in full_text:
+            replacements[placeholder] = replacement
+            continue
+
+        # Додаткова перевірка - можливо плейсхолдер має інший формат
+        for alt_format in (placeholder.upper(), placeholder.lower(),
+                           placeholder.replace('_', ' '), placeholder.replace('-', '_')):
+            if alt_format != placeholder and alt_format in full_text:
+                replacements[alt_format] = replacement
+                break
+
+    return replacements
+
+
+def apply_replacements_single_pass(doc, full_text, replacements, delete_empty=(), hits=None):
+    """
+    Застосовує всі заміни за один прохід по тексту документу.
+    Збіги шукаються одним регулярним виразом у Python, а в Word виконується лише
+    одна операція на кожен збіг (з кінця документу, щоб позиції не зсувались).
+    Плейсхолдери з delete_empty і порожньою заміною видаляють свій абзац.
+
+    Returns:
+        Словник {плейсхолдер: кількість замін}
+    """
+    if hits is None:
+        hits = {}
+    pattern = build_placeholder_pattern(replacements)
+    if pattern is None:
+        return hits
+
+    matches = list(pattern.finditer(full_text))
+    cell_marks = [m.start() for m in re.finditer(CELL_END_MARK, full_text)]
+    fallback = set()
+
+    for match in reversed(matches):
+        placeholder = match.group(0)
+        if placeholder in fallback:
+            continue
+
+        # Переводимо індекс тексту в позицію Word
+        shift = bisect_left(cell_marks, match.start())
+        start = match.start() - shift
+        rng = doc.Range(start, start + len(placeholder))
+
+        if rng.Text != placeholder:
+            # Позиції не збіглися (поля, вкладені об'єкти) - цей плейсхолдер замінимо через Find
+            fallback.add(placeholder)
+            continue
+
+        replacement = replacements[placeholder]
+        if replacement == "" and placeholder in delete_empty:
+            if rng.Information(win32.constants.wdWithInTable):
+                rng.Text = ""
+            else:
+                rng.Paragraphs(1).Range.Delete()
+        else:
+            rng.Text = replacement
+        hits[placeholder] = hits.get(placeholder, 0) + 1
+
+    for placeholder in fallback:
+        print(f"[DEBUG] Заміна через Find: {placeholder}")
+        hits[placeholder] = replace_with_find(doc, placeholder, replacements[placeholder],
+                                              placeholder in delete_empty)
+
+    return hits
+
+
+def replace_with_find(doc, placeholder, replacement, delete_empty=False):
+    """Запасна заміна через Word Find; повертає кількість замін"""
+    count = 0
+    find_obj = doc.Content.Find
+    find_obj.ClearFormatting()
+    while find_obj.Execute(FindText=placeholder, MatchCase=True):
+        found = find_obj.Parent
+        if replacement == "" and delete_empty:
+            found.Paragraphs(1).Range.Delete()
+        else:
+            found.Text = replacement
+        count += 1
+        find_obj = doc.Content.Find
+    return count
+
+
+def process_document_content(doc, block, current_fields, people_replacements=None):
+    """
+    Обробляє вміст документу Word - замінює плейсхолдери та обробляє людей
+    ОНОВЛЕНО: додано обробку плейсхолдерів таблиць товарів
+    entries блоку можуть бути віджетами або знімком рядків (generation_scheduler)
+    Поля і люди замінюються за один прохід (apply_replacements_single_pass)
+    """
+    try:
+        # 1. Збираємо заміни полів і людей та застосовуємо їх за один прохід
+        block_placeholders = block.get("placeholders", current_fields)
+        if people_replacements is None:
+            people_replacements = people_manager.generate_replacements()
+
+        full_text = doc.Content.Text
+        # Маркери людей беремо з плану шаблону (умовні секції), без пошуку альтернативних форматів
+        plan = get_render_plan(block["path"]) if block.get("path") else None
+        known_people = set(plan["people_placeholders"]) if plan is not None else None
+        replacements = collect_document_replacements(block, block_placeholders, people_replacements, full_text,
+                                                     known_people)
+        field_keys = {f"<{key}>" for key in block_placeholders}
+        delete_empty = {key for key in replacements if key not in field_keys}
+
+        hits = apply_replacements_single_pass(doc, full_text, replacements, delete_empty)
+        hits[TABLE_PLACEHOLDER] = full_text.count(TABLE_PLACEHOLDER)
+        print(f"[DEBUG] Замін за плейсхолдерами: { {k: v for k, v in hits.items() if v} }")
+
+        # 3. НОВЕ: обробляємо плейсхолдери таблиць товарів
+        items = block.get("items", [])
+        if callable(items):
+            items = items()
+
+        # Перевіряємо наявність плейсхолдера таблиці товарів
+        if hits[TABLE_PLACEHOLDER]:
+            print(f"[DEBUG] Знайдено плейсхолдер <таблиця_товарів>, товарів: {len(items) if items else 0}")
+
+            try:
+                # Валідація даних товарів
+                validate_items_data(items)
+
+                # Заміна плейсхолдерів таблиць
+                success = replace_table_placeholders(doc, "<таблиця_товарів>", items)
+
+                if success:
+                    print("[DEBUG] Таблиця товарів успішно вставлена")
+                else:
+                    print("[WARNING] Не вдалося вставити таблицю товарів")
+
+            except ValueError as ve:
+                # Воркер не має GUI - помилка потрапляє в результат завдання (generation_scheduler.run_job)
+                print(f"[ERROR] Помилка валідації товарів: {ve}")
+                raise
+            except Exception as e:
+                print(f"[ERROR] Помилка при обробці таблиці товарів: {e}")
+                traceback.print_exc()
+                return False
+
+        # print(f"[DEBUG] Обробка всіх플placeholder'ів завершена для документу")
+        return True
+
+    except ValueError:
+        raise
+    except Exception as e:
+        print(f"[ERROR] Помилка при обробці плейсхолдерів: {e}")
+        traceback.print_exc()
+        return False
+
+
+def create_products_table(doc, items_data, insert_range=None):
+    """
+    Створює таблицю товарів для вставки в Word документ
+    Структура таблиці відповідно до технічного завдання
+    Таблиця з усім форматуванням колонок будується як XML (ooxml_renderer) і вставляється
+    одним викликом InsertXML на місце insert_range (або на початку документу).
+    """
+    try:
+        if insert_range is None:
+            insert_range = doc.Range(0, 0)
+
+        start = insert_range.Start
+        table_xml, total_sum = build_products_table_flat_opc(items_data)
+        insert_range.InsertXML(table_xml)
+
+        # Колапсований діапазон на початку вставки знаходиться в першій комірці нової таблиці
+        table = doc.Range(start, start).Tables(1)
+
+        print(f"[DEBUG] Створено таблицю товарів: {len(items_data)} товарів, загальна сума: {total_sum:.2f}")
+        return table
+
+    except Exception as e:
+        print(f"[ERROR] Помилка при створенні таблиці товарів: {e}")
+        traceback.print_exc()
+        return None
+
+
+def replace_table_placeholders(doc, table_placeholder, items_data):
+    """
+    Знаходить плейсхолдери <таблиця_товарів> і вставляє таблиці товарів
+    Таблиця будується одразу на місці плейсхолдера, без буфера обміну (Cut/Paste),
+    тому кілька генерацій можуть працювати паралельно.
+    """
+    try:
+        print(f"[DEBUG] Пошук плейсхолдера: {table_placeholder}")
+
+        # Шукаємо всі входження плейсхолдера
+        replacements_made = 0
+
+        # Спочатку пробуємо через Find для точного пошуку
+        find_obj = doc.Content.Find
+        find_obj.ClearFormatting()
+
+        while find_obj.Execute(FindText=table_placeholder):
+            try:
+                print(f"[DEBUG] Знайдено плейсхолдер через Find")
+
+                # Діапазон плейсхолдера - таблиця вставляється замість нього
+                selection_range = find_obj.Parent
+
+                # Створюємо таблицю товарів
+                products_table = create_products_table(doc, items_data, selection_range)
+
+                if products_table:
+                    replacements_made += 1
+                    print(f"[DEBUG] Успішно замінено плейсхолдер #{replacements_made}")
+                    break
+                else:
+                    print(f"[ERROR] Не вдалося створити таблицю товарів")
+                    break
+
+            except Exception as e:
+                print(f"[ERROR] Помилка при заміні через Find: {e}")
+                break
+
+        # Якщо через Find не знайшли, пробуємо через ітерацію абзаців
+        if replacements_made == 0:
+            print(f"[DEBUG] Плейсхолдер не знайдено через Find, шукаємо в абзацах")
+
+            paragraphs_to_process = []
+
+            # Спочатку знаходимо всі абзаци з плейсхолдером
+            for paragraph in doc.Paragraphs:
+                paragraph_text = paragraph.Range.Text.strip()
+                if table_placeholder in paragraph_text:
+                    paragraphs_to_process.append(paragraph)
+
+            # Потім обробляємо знайдені абзаци
+            for paragraph in paragraphs_to_process:
+                try:
+                    print(f"[DEBUG] Обробляємо абзац з плейсхолдером")
+
+                    # Таблиця замінює весь абзац з плейсхолдером
+                    insert_range = paragraph.Range
+
+                    # Створюємо таблицю товарів
+                    products_table = create_products_table(doc, items_data, insert_range)
+
+                    if products_table:
+                        replacements_made += 1
+                        print(f"[DEBUG] Успішно замінено плейсхолдер в абзаці #{replacements_made}")
+                        break
+
+                except Exception as e:
+                    print(f"[ERROR] Помилка при заміні в абзаці: {e}")
+                    continue
+
+        print(f"[DEBUG] Загалом замінено плейсхолдерів: {replacements_made}")
+        return replacements_made > 0
+
+    except Exception as e:
+        print(f"[ERROR] Загальна помилка при заміні плейсхолдерів таблиць: {e}")
+        traceback.print_exc()
+        return False
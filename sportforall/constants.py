@@ -8,6 +8,7 @@ APP_VERSION = "0.1.8" # Используем версию из вашего ко
 DATA_FILE = "app_data.json" # Файл для сохранения всей структуры AppData
 ERROR_LOG = "error.txt" # Файл лога ошибок
 EXCEL_LOG_FILE = "journal.xlsx" # Файл Excel журнала генерации
+PLACEHOLDER_CACHE_FILE = "placeholder_cache.json" # Кеш плейсхолдеров шаблонов
 
 
 # Список плейсхолдеров, которые будут автоматически копироваться между договорами в рамках одного захода
@@ -22,12 +22,36 @@ from copy import deepcopy # Для копіювання XML елементів
 from sportforall.models import Contract, Item
 from sportforall import error_handling
 from sportforall import constants
+from sportforall.placeholder_cache import get_cached_placeholders
+from sportforall.placeholder_scanner import find_bracket_placeholders
 
 # Регулярний вираз для пошуку плейсхолдерів <...>
 PLACEHOLDER_PATTERN = re.compile(r"<([^>]+)>")
 
 
 def find_placeholders_in_template(filepath: str) -> list:
+    """
+    Повертає плейсхолдери шаблону з дискового кешу (placeholder_cache).
+    Змінений файл сканується як zip-архів (placeholder_scanner) - це працює і для .docm,
+    які python-docx не відкриває; python-docx лишається запасним варіантом.
+    """
+    if not os.path.exists(filepath):
+        print(f"Помилка: Файл шаблону не знайдено: {filepath}")
+        return []
+
+    return get_cached_placeholders(filepath, _scan_template, kind="zip")
+
+
+def _scan_template(filepath: str) -> list:
+    """Потокове сканування zip-архіву шаблону з запасним варіантом через python-docx"""
+    try:
+        return find_bracket_placeholders(filepath)
+    except Exception as e:
+        print(f"Потоковий сканер не прочитав {filepath}: {e}")
+        return _scan_placeholders_in_template(filepath)
+
+
+def _scan_placeholders_in_template(filepath: str) -> list:
     """
     Читає файл шаблону .docm або .docx та знаходить усі унікальні плейсхолдери <...>.
     Ця версія надійно шукає плейсхолдери, що охоплюють кілька run-ів,
@@ -1,6 +1,7 @@
 # sportforall/number_to_text_ua.py
 
-import math
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import lru_cache
 
 # Словники для перетворення чисел в слова
 # Чоловічий рід
@@ -20,11 +21,39 @@ MAGNITUDES = {
     1: ("тисяча", "тисячі", "тисяч", "ж"), # Тисячі (жіночий рід)
     2: ("мільйон", "мільйони", "мільйонів", "ч"), # Мільйони (чоловічий рід)
     3: ("мільярд", "мільярди", "мільярдів", "ч"), # Мільярди (чоловічий рід)
-    # Можна додати трильйони тощо
+    4: ("трильйон", "трильйони", "трильйонів", "ч"), # Трильйони (чоловічий рід)
 }
 
 KOPEK_MAGNITUDE = ("копійка", "копійки", "копійок", "ж") # Копійки (жіночий рід)
 
+# Максимальна сума, яку можна записати прописом
+MAX_AMOUNT = 10**12
+
+# Скільки різних сум тримати в кеші (поле суми перераховується при кожній зміні)
+TEXT_CACHE_SIZE = 4096
+
+
+def _build_triplets(units: list) -> list:
+    """
+    Таблиця слів для чисел від 0 до 999 (індекс списку - число).
+    Будується один раз при імпорті, далі перетворення групи - це звертання до списку.
+    """
+    triplets = []
+    for number in range(1000):
+        hundreds, rest = divmod(number, 100)
+        text_parts = [HUNDREDS[hundreds]]
+        if 10 <= rest <= 19:
+            text_parts.append(MALE_TEENS[rest - 10])
+        else:
+            text_parts.append(MALE_TENS[rest // 10])
+            text_parts.append(units[rest % 10])
+        triplets.append(" ".join(part for part in text_parts if part))
+    return triplets
+
+
+MALE_TRIPLETS = _build_triplets(MALE_UNITS)
+FEMALE_TRIPLETS = _build_triplets(FEMALE_UNITS)
+
 
 def _num_to_text_hundreds(number: int, gender: str) -> str:
     """
@@ -33,31 +62,7 @@ def _num_to_text_hundreds(number: int, gender: str) -> str:
     """
     if not 0 <= number <= 999: # Дозволяємо 0 для внутрішнього використання
         return ""
-
-    text_parts = []
-
-    hundreds = number // 100
-    if hundreds > 0:
-        text_parts.append(HUNDREDS[hundreds])
-        number %= 100
-
-    if 10 <= number <= 19:
-        # Числа від 10 до 19
-        text_parts.append(MALE_TEENS[number - 10])
-    else:
-        # Десятки та одиниці
-        tens = number // 10
-        if tens > 0:
-            text_parts.append(MALE_TENS[tens])
-        units = number % 10
-        if units > 0:
-             # Особливі форми "одна", "дві" для жіночого роду і чисел 1, 2
-             if gender == "ж" and units in [1, 2]:
-                 text_parts.append(FEMALE_UNITS[units])
-             else:
-                 text_parts.append(MALE_UNITS[units])
-
-    return " ".join(text_parts).strip()
+    return (FEMALE_TRIPLETS if gender == "ж" else MALE_TRIPLETS)[number]
 
 
 def _get_magnitude_text(number: int, magnitude_info: tuple) -> str:
@@ -81,94 +86,92 @@ def _get_magnitude_text(number: int, magnitude_info: tuple) -> str:
         return five_many # Закінчення для 0, 5-9 та 10-19
 
 
-def number_to_currency_text(amount: float) -> str:
+def integer_to_words(number: int) -> str:
     """
-    Перетворює числове значення грошової суми (гривні)
-    у текстове представлення українською мовою.
-
-    Args:
-        amount: Сума у гривнях (напр., 1234.56).
-
-    Returns:
-        Текстове представлення суми (напр., "Одна тисяча двісті тридцять чотири гривні 56 копійок").
-        Повертає повідомлення про помилку, якщо сума від'ємна або надто велика.
+    Ціле невід'ємне число словами (як num2words(number, lang='uk')).
+    Напр., 21001 -> "двадцять одна тисяча один".
     """
-    if amount < 0:
-        return "Від'ємна сума"
-
-    # Обмежуємо розмір числа, щоб уникнути переповнення або нескінченного циклу
-    if amount > 10**12: # Приблизно трильйон
-         return "Сума надто велика"
-
-    # Розділяємо на цілу частину (гривні) та дробову (копійки)
-    # Округляємо до 2 знаків після коми перед розділенням
-    amount_rounded = round(amount, 2)
-    гривні = int(amount_rounded)
-    копійки = int(round((amount_rounded - гривні) * 100)) # Копійки як ціле число від 0 до 99
-
-    # Випадок точно 0 гривень 00 копійок
-    if гривні == 0 and копійки == 0:
-         return f"Нуль {_get_magnitude_text(0, MAGNITUDES[0])} 00 {KOPEK_MAGNITUDE[2]}".capitalize() # "Нуль гривень 00 копійок"
-
+    if number == 0:
+        return "нуль"
 
-    text_parts_гривні = []
-
-    # Перетворюємо цілу частину (гривні)
-    remaining_гривні = гривні
+    text_parts = []
     magnitude_level = 0 # 0 - одиниці, 1 - тисячі, 2 - мільйони...
+    while number > 0:
+        number, group_of_three = divmod(number, 1000)
+        if group_of_three > 0:
+            magnitude_info = MAGNITUDES[magnitude_level]
+            if magnitude_level > 0: # Назва розряду (тисяча, мільйон...) після числа групи
+                text_parts.append(_get_magnitude_text(group_of_three, magnitude_info))
+            text_parts.append(_num_to_text_hundreds(group_of_three, magnitude_info[3]))
+        magnitude_level += 1
 
-    while remaining_гривні > 0:
-         # Беремо останні 3 цифри (групу розряду)
-         group_of_three = remaining_гривні % 1000
-         remaining_гривні //= 1000
+    # Йшли від менших розрядів до більших
+    return " ".join(reversed(text_parts))
 
-         if group_of_three > 0:
-             # Перетворюємо групу з 3 цифр у текст
-             # Визначаємо рід для цього розряду (гривні, тисячі, мільйони...)
-             gender = MAGNITUDES.get(magnitude_level, ("","", "", "м"))[3] # За замовчуванням чоловічий, якщо розряд не визначено
-             text_group = _num_to_text_hundreds(group_of_three, gender)
 
-             # Додаємо назву розряду (тисяча, мільйон...) з правильним закінченням
-             if magnitude_level > 0: # Не додаємо назву розряду для одиниць (гривень)
-                  magnitude_info = MAGNITUDES.get(magnitude_level)
-                  if magnitude_info: # Якщо розряд визначено в словнику MAGNITUDES
-                       magnitude_text = _get_magnitude_text(group_of_three, magnitude_info)
-                       # Додаємо назву розряду після числа групи
-                       text_group = f"{text_group} {magnitude_text}"
-                  # else: # Якщо розряд не визначено (напр., трильйони, які не в словнику)
-                       # Можна додати логіку для обробки невизначених розрядів
-                       # print(f"Попередження: Розряд величини {magnitude_level} не визначено в словнику MAGNITUDES.")
+def amount_to_kopecks(amount) -> int | None:
+    """
+    Сума (число або рядок з комою/крапкою) в цілих копійках з бухгалтерським округленням.
+    Повертає None, якщо значення не є числом.
+    """
+    try:
+        value = Decimal(str(amount).replace(",", ".").replace(" ", "").strip())
+        if not value.is_finite():
+            return None
+        # quantize теж кидає InvalidOperation, якщо цілих цифр більше за точність контексту
+        return int((value * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except InvalidOperation:
+        return None
 
 
-             # Додаємо текст групи до загального списку (вставляємо на початок, бо йдемо від менших розрядів)
-             text_parts_гривні.insert(0, text_group)
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def _kopecks_to_text(kopecks: int, short_kopecks: bool) -> str:
+    """Текст суми за кількістю копійок (результат кешується)"""
+    гривні, копійки = divmod(kopecks, 100)
+    гривні_текст = f"{integer_to_words(гривні)} {_get_magnitude_text(гривні, MAGNITUDES[0])}"
 
-         magnitude_level += 1
+    if short_kopecks:
+        return f"{гривні_текст}, {копійки:02d} коп."
 
-    # Додаємо назву "гривня" до цілої частини, якщо гривень > 0
-    if гривні > 0:
-         magnitude_text_гривні = _get_magnitude_text(гривні, MAGNITUDES[0])
-         # Шукаємо останній елемент у списку text_parts_гривні, який є числом, і додаємо до нього "гривня"
-         # Або просто додаємо в кінець списку
-         text_parts_гривні.append(magnitude_text_гривні)
+    # Форматуємо копійки завжди двома цифрами (напр., "05", "50") з правильним закінченням
+    копійки_текст_повністю = f"{копійки:02d} {_get_magnitude_text(копійки, KOPEK_MAGNITUDE)}"
+    return f"{гривні_текст} {копійки_текст_повністю}".capitalize() # Починаємо з великої літери
 
 
-    # Об'єднуємо частини цілої суми
-    гривні_текст = " ".join(text_parts_гривні).strip()
+def number_to_currency_text(amount: float) -> str:
+    """
+    Перетворює числове значення грошової суми (гривні)
+    у текстове представлення українською мовою.
 
-    # Перетворюємо дробову частину (копійки)
-    копійки_текст = str(копійки).zfill(2) # Форматуємо копійки завжди двома цифрами (напр., "05", "50")
+    Args:
+        amount: Сума у гривнях (напр., 1234.56).
 
-    # Визначаємо правильне закінчення для "копійка"
-    копійки_назва = _get_magnitude_text(копійки, KOPEK_MAGNITUDE)
+    Returns:
+        Текстове представлення суми (напр., "Одна тисяча двісті тридцять чотири гривні 56 копійок").
+        Повертає повідомлення про помилку, якщо сума від'ємна, надто велика або не є числом.
+    """
+    kopecks = amount_to_kopecks(amount)
+    if kopecks is None:
+        return "Некоректна сума"
+    if kopecks < 0:
+        return "Від'ємна сума"
 
-    копійки_текст_повністю = f"{копійки_текст} {копійки_назва}"
+    # Обмежуємо розмір числа (розряди визначені до трильйонів)
+    if kopecks > MAX_AMOUNT * 100:
+         return "Сума надто велика"
 
-    # Формуємо кінцевий рядок
-    final_text = f"{гривні_текст} {копійки_текст_повністю}".strip()
+    return _kopecks_to_text(kopecks, False)
 
 
-    return final_text.capitalize() # Починаємо з великої літери
+def number_to_currency_text_short(amount: float) -> str:
+    """
+    Сума прописом для кошторису: "сто двадцять гривень, 05 коп." (з малої літери).
+    Некоректні, від'ємні та надто великі суми записуються як нуль.
+    """
+    kopecks = amount_to_kopecks(amount)
+    if kopecks is None or kopecks < 0 or kopecks > MAX_AMOUNT * 100:
+        kopecks = 0
+    return _kopecks_to_text(kopecks, True)
 
 
 # Приклади використання (для тестування)
@@ -180,7 +183,7 @@ if __name__ == "__main__":
         1021.00, 1100.00, 1234.56, 2000.00, 5000.00, 10000.00, 10001.00, 10021.00,
         21500.75, 100000.00, 123456.78, 1000000.00, 1000001.00, 2500000.00,
         1234567.89, 1000000000.00, 1000000001.00, 1234567890.12,
-        1000000000000.00, 1234567890123.45, # Приклад надто великої суми для словника розрядів
+        1000000000000.00, 1234567890123.45, # Приклад надто великої суми
         -100.00 # Приклад від'ємної суми
     ]
 
@@ -0,0 +1,142 @@
+# sportforall/placeholder_cache.py
+# -*- coding: utf-8 -*-
+"""
+Дисковий індекс плейсхолдерів шаблонів.
+
+Витягування плейсхолдерів з .docm/.docx повільне, а шаблони змінюються рідко.
+Індекс зберігається у JSON (constants.PLACEHOLDER_CACHE_FILE поруч з програмою, а не в
+поточній папці); запис шаблону ключується
+шляхом + розміром + mtime + SHA-256 вмісту:
+- збіг розміру і mtime - результат береться з індексу без читання файлу;
+- mtime змінився, але SHA-256 той самий (файл скопійовано/перезбережено) -
+  оновлюється тільки mtime, повторного витягування немає;
+- вміст змінився - плейсхолдери витягуються заново.
+"""
+
+import os
+import json
+import hashlib
+import threading
+import traceback
+
+from sportforall import constants
+from sportforall.utils import get_executable_dir
+
+# Версія формату індексу; зміна скидає старий кеш
+CACHE_VERSION = 1
+
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """Рахує SHA-256 файлу блоками"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PlaceholderCache:
+    """Потокобезпечний дисковий кеш плейсхолдерів шаблонів"""
+
+    def __init__(self, cache_file):
+        self.cache_file = cache_file
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """Ліниво завантажує індекс з диску"""
+        if self._entries is not None:
+            return
+        self._entries = {}
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == CACHE_VERSION:
+                    self._entries = data.get('entries', {})
+        except Exception as e:
+            print(f"[WARNING] Не вдалося прочитати кеш плейсхолдерів, буде створено новий: {e}")
+
+    def _save(self):
+        """Атомарно записує індекс на диск"""
+        try:
+            tmp_file = self.cache_file + ".tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'entries': self._entries}, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.cache_file)
+        except Exception as e:
+            print(f"[WARNING] Не вдалося зберегти кеш плейсхолдерів: {e}")
+
+    def get(self, template_path, extractor, kind="default"):
+        """
+        Повертає список плейсхолдерів шаблону з кешу або через extractor(template_path).
+        kind розділяє записи різних екстракторів для одного файлу.
+        """
+        template_path = os.path.abspath(template_path)
+        key = f"{kind}|{os.path.normcase(template_path)}"
+
+        try:
+            stat = os.stat(template_path)
+        except OSError:
+            return extractor(template_path)
+
+        with self._lock:
+            self._load()
+            entry = self._entries.get(key)
+
+            if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+                return list(entry['placeholders'])
+
+            try:
+                sha256 = file_sha256(template_path)
+            except OSError as e:
+                print(f"[WARNING] Не вдалося прочитати шаблон для кешу: {e}")
+                return extractor(template_path)
+
+            if entry and entry['sha256'] == sha256:
+                # Вміст не змінився - оновлюємо тільки метадані
+                entry['size'] = stat.st_size
+                entry['mtime'] = stat.st_mtime_ns
+                self._save()
+                return list(entry['placeholders'])
+
+        # Витягування виконується без блокування: воно може бути довгим (Word)
+        placeholders = extractor(template_path)
+
+        # Порожній результат не кешуємо: він часто означає помилку читання
+        if placeholders:
+            with self._lock:
+                self._entries[key] = {
+                    'size': stat.st_size,
+                    'mtime': stat.st_mtime_ns,
+                    'sha256': sha256,
+                    'placeholders': sorted(placeholders),
+                }
+                self._save()
+        return placeholders
+
+    def invalidate(self, template_path=None):
+        """Скидає кеш для одного шаблону або повністю"""
+        with self._lock:
+            self._load()
+            if template_path is None:
+                self._entries = {}
+            else:
+                suffix = f"|{os.path.normcase(os.path.abspath(template_path))}"
+                for key in [k for k in self._entries if k.endswith(suffix)]:
+                    del self._entries[key]
+            self._save()
+
+
+def get_cached_placeholders(template_path, extractor, kind="default"):
+    """Скорочення для глобального кешу"""
+    try:
+        return placeholder_cache.get(template_path, extractor, kind)
+    except Exception as e:
+        print(f"[ERROR] Помилка кешу плейсхолдерів для {template_path}: {e}")
+        traceback.print_exc()
+        return []
+
+
+# Глобальний екземпляр
+placeholder_cache = PlaceholderCache(os.path.join(get_executable_dir(), constants.PLACEHOLDER_CACHE_FILE))
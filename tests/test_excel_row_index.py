@@ -0,0 +1,73 @@
+# tests/test_excel_row_index.py
+# -*- coding: utf-8 -*-
+"""
+Индекс строк листа базы данных (excel_row_index) на небольшом листе:
+find_event_product_row сравнивает товары точно (без учета регистра),
+find_best_matching_row - после normalize_text ("A-4" и "A4" - один товар).
+"""
+
+import os
+import sys
+
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+
+APP_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "2.19.0 Умная табличка ворд")
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+from excel_row_index import build_row_index, get_row_index, notify_row_changed
+from excel_data_processor import find_event_product_row, find_all_event_rows
+from excel_update_logic import find_best_matching_row
+
+HEADERS = ["Номер заходу", "Назва заходу", "Товар", "Кількість"]
+
+
+@pytest.fixture
+def ws():
+    sheet = openpyxl.Workbook().active
+    sheet.append(HEADERS)
+    sheet.append([3, "Захід 3", "A4", 1])         # 2
+    sheet.append([3, "Захід 3", "Папір", 2])      # 3
+    sheet.append([5, "Захід 5", "A-4", 3])        # 4
+    sheet.append([3, "Захід 3", "папір", 4])      # 5
+    sheet.append(["5", "Захід 5", "Ручка", 5])    # 6
+    return sheet
+
+
+def test_event_rows(ws):
+    assert find_all_event_rows(ws, 3, HEADERS) == [2, 3, 5]
+    assert find_all_event_rows(ws, "5", HEADERS) == [4, 6]
+    assert find_all_event_rows(ws, 7, HEADERS) == []
+
+
+def test_find_event_product_row_is_exact(ws):
+    # Без учета регистра - первая строка с таким товаром
+    assert find_event_product_row(ws, 3, "ПАПІР", HEADERS) == 3
+    assert find_event_product_row(ws, 3, "A4", HEADERS) == 2
+    # Знаки препинания не отбрасываются: "A-4" и "A4" - разные товары
+    assert find_event_product_row(ws, 3, "A-4", HEADERS) is None
+    assert find_event_product_row(ws, 5, "A4", HEADERS) is None
+    assert find_event_product_row(ws, 5, "a-4", HEADERS) == 4
+
+
+def test_find_best_matching_row_normalizes(ws):
+    assert find_best_matching_row(ws, 3, "A-4", HEADERS) == (2, 100)
+    assert find_best_matching_row(ws, 5, "a4.", HEADERS) == (4, 100)
+
+
+def test_index_follows_row_changes(ws):
+    row_index = build_row_index(ws, HEADERS)
+    assert (row_index.row_count, row_index.event_count) == (5, 2)
+
+    ws.cell(row=3, column=3).value = "Олівець"
+    notify_row_changed(ws, 3)
+    assert find_event_product_row(ws, 3, "папір", HEADERS) == 5
+    assert find_event_product_row(ws, 3, "олівець", HEADERS) == 3
+
+    ws.append([3, "Захід 3", "A-4", 6])
+    notify_row_changed(ws, 7)
+    assert find_event_product_row(ws, 3, "A-4", HEADERS) == 7
+    assert find_all_event_rows(ws, 3, HEADERS) == [2, 3, 5, 7]
+    assert get_row_index(ws, HEADERS) is row_index
@@ -0,0 +1,63 @@
+# tests/test_koshtorys_totals.py
+# -*- coding: utf-8 -*-
+"""
+Суми товарів (koshtorys_totals): округлення до копійок і некоректні значення.
+"""
+
+import os
+import sys
+import importlib.util
+from decimal import Decimal
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_DIR = os.path.join(ROOT, "2.19.0 Умная табличка ворд")
+
+
+def load_module(name):
+    """Завантажує модуль програми 2.19.0 (залежності - з уже завантажених модулів)"""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(APP_DIR, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope="module")
+def koshtorys_totals():
+    # koshtorys_totals імпортує text_utils за іменем
+    previous = sys.modules.get("text_utils")
+    sys.modules["text_utils"] = load_module("text_utils")
+    try:
+        yield load_module("koshtorys_totals")
+    finally:
+        if previous is None:
+            sys.modules.pop("text_utils", None)
+        else:
+            sys.modules["text_utils"] = previous
+
+
+def test_calculate_totals(koshtorys_totals):
+    totals = koshtorys_totals.calculate_totals(["2", "1,5"], ["100", "33.33"])
+    assert totals["line_sums"] == [Decimal("200.00"), Decimal("50.00")]
+    assert totals["total_text"] == "250.00"
+    assert totals["words"] == "Двісті п'ятдесят гривень, 00 копійок."
+
+
+def test_calculate_products_totals(koshtorys_totals):
+    products = [{"кількість": "3", "ціна": "0.335"}, {"кількість": "", "ціна": "10"}]
+    totals = koshtorys_totals.calculate_products_totals(products, price_field="ціна")
+    assert totals["line_sums"] == [Decimal("1.01"), Decimal("0.00")]
+    assert totals["total"] == Decimal("1.01")
+
+
+@pytest.mark.parametrize("quantity, price", [
+    ("1e30", "1"),
+    ("1" * 30, "1"),
+    ("1" * 20, "1" * 20),
+])
+def test_oversized_amount_is_invalid(koshtorys_totals, quantity, price):
+    totals = koshtorys_totals.calculate_totals([quantity, "2"], [price, "3"])
+    assert totals["line_sums"] == [Decimal("0.00"), Decimal("6.00")]
+    assert totals["total_text"] == "6.00"
+    assert koshtorys_totals.to_kopecks("1e30") == Decimal("0.00")
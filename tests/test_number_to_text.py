@@ -0,0 +1,86 @@
+# tests/test_number_to_text.py
+# -*- coding: utf-8 -*-
+"""
+Сума прописом: text_utils (2.19.0) і sportforall/number_to_text_ua
+порівнюються з num2words(n, lang='uk') на межових і випадкових числах.
+
+Обидві програми - окремі корені імпорту, тому модулі завантажуються за шляхом файлу.
+"""
+
+import os
+import random
+import importlib.util
+
+import pytest
+
+num2words = pytest.importorskip("num2words").num2words
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_module(name, *path):
+    """Завантажує модуль з файлу, не змінюючи sys.path"""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, *path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+text_utils = load_module("text_utils", "2.19.0 Умная табличка ворд", "text_utils.py")
+number_to_text_ua = load_module("number_to_text_ua", "sportforall", "number_to_text_ua.py")
+
+
+def sample_numbers(samples=20000, seed=2019):
+    """0..2000, числа навколо кожного степеня 10 і випадкові числа до 10^9"""
+    rng = random.Random(seed)
+    numbers = set(range(0, 2001)) | {10 ** 9}
+    for power in range(1, 10):
+        base = 10 ** power
+        numbers.update(range(max(0, base - 25), base + 25))
+        numbers.update(rng.randrange(base // 10, base) for _ in range(200))
+    numbers.update(rng.randrange(0, 10 ** 9 + 1) for _ in range(samples))
+    return sorted(numbers)
+
+
+NUMBERS = sample_numbers()
+
+
+@pytest.mark.parametrize("module", [text_utils, number_to_text_ua], ids=["text_utils", "number_to_text_ua"])
+def test_integer_to_words_matches_num2words(module):
+    mismatches = [n for n in NUMBERS if module.integer_to_words(n) != num2words(n, lang='uk')]
+    assert not mismatches, mismatches[:20]
+
+
+@pytest.mark.parametrize("amount, expected", [
+    (0, "нуль гривень, 00 копійок."),
+    (1.01, "один гривня, 01 копійка."),
+    ("120,05", "сто двадцять гривень, 05 копійок."),
+    ("21001.22", "двадцять одна тисяча один гривня, 22 копійки."),
+    (999.995, "одна тисяча гривень, 00 копійок."),
+    (-5, "мінус п'ять гривень, 00 копійок."),
+])
+def test_number_to_ukrainian_text(amount, expected):
+    assert text_utils.number_to_ukrainian_text(amount) == expected
+
+
+@pytest.mark.parametrize("amount", ["abc", "", None, "nan", "inf", "1e25", -10 ** 30])
+def test_number_to_ukrainian_text_invalid(amount):
+    assert text_utils.number_to_ukrainian_text(amount) == text_utils.INVALID_AMOUNT_TEXT
+
+
+@pytest.mark.parametrize("amount, expected", [
+    (0, "Нуль гривень 00 копійок"),
+    (1234.56, "Одна тисяча двісті тридцять чотири гривні 56 копійок"),
+    (2000, "Дві тисячі гривень 00 копійок"),
+    ("0,01", "Нуль гривень 01 копійка"),
+])
+def test_number_to_currency_text(amount, expected):
+    assert number_to_text_ua.number_to_currency_text(amount) == expected
+
+
+def test_number_to_currency_text_limits():
+    assert number_to_text_ua.number_to_currency_text("abc") == "Некоректна сума"
+    assert number_to_text_ua.number_to_currency_text(-100) == "Від'ємна сума"
+    assert number_to_text_ua.number_to_currency_text(10 ** 13) == "Сума надто велика"
+    assert number_to_text_ua.number_to_currency_text_short(10 ** 13) == "нуль гривень, 00 коп."
+    assert number_to_text_ua.number_to_currency_text_short("120,05") == "сто двадцять гривень, 05 коп."